@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ApiMobileConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api_mobile'
+
+    def ready(self):
+        # Registra las señales que crean las lápidas de /sync/
+        from . import signals  # noqa: F401
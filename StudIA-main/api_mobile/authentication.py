@@ -1,10 +1,16 @@
 """
 Autenticación personalizada para JWT con el modelo Usuario.
 """
+import logging
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
 from loginApp.models import Usuario
 from django_tenants.utils import schema_context
+from .usuarios_cache import obtener_usuario, guardar_usuario, usuario_revocado, UsuarioToken
+
+logger = logging.getLogger(__name__)
 
 
 class CustomJWTAuthentication(JWTAuthentication):
@@ -29,54 +35,89 @@ class CustomJWTAuthentication(JWTAuthentication):
         # Guardar el request para usarlo en get_user
         self.request = request
         
+        # Los GET de vistas con usuario_desde_token no consultan el usuario
+        if self._usa_usuario_token(request, validated_token):
+            return (self.get_usuario_token(validated_token), validated_token)
+        
         # Obtener el usuario usando el token validado
         user = self.get_user(validated_token)
         
         return (user, validated_token)
     
-    def get_user(self, validated_token):
+    def _usa_usuario_token(self, request, validated_token):
         """
-        Intenta encontrar y retornar un usuario usando el token validado.
-        Debe ejecutarse dentro del schema_context del tenant.
+        El usuario liviano (sin query) solo se usa si está habilitado en
+        settings, la vista lo permite (usuario_desde_token = True), el método
+        es de solo lectura y el token trae el claim is_student.
         """
-        import sys
-        
-        try:
-            user_id = validated_token['user_id']
-        except KeyError:
-            raise InvalidToken('Token no contiene información de usuario válida.')
-        
+        if not getattr(settings, 'API_MOBILE_USUARIO_DESDE_TOKEN', False):
+            return False
+        if request.method not in SAFE_METHODS or 'is_student' not in validated_token:
+            return False
+        view = (getattr(request, 'parser_context', None) or {}).get('view')
+        return getattr(view, 'usuario_desde_token', False)
+    
+    def _tenant_schema(self):
         # Obtener el tenant del request si está disponible
         # El middleware ya debería haber establecido request.tenant
         request = getattr(self, 'request', None)
         
         if not request:
-            sys.stdout.write("[API Mobile Authentication] ERROR: No hay request disponible\n")
-            sys.stdout.flush()
+            logger.error("[API Mobile Authentication] ERROR: No hay request disponible")
             raise AuthenticationFailed('No se pudo identificar el tenant para la autenticación.')
         
         if not hasattr(request, 'tenant'):
-            sys.stdout.write("[API Mobile Authentication] ERROR: No hay tenant en el request\n")
-            sys.stdout.flush()
+            logger.error("[API Mobile Authentication] ERROR: No hay tenant en el request")
             raise AuthenticationFailed('No se pudo identificar el tenant para la autenticación.')
         
-        tenant_schema = request.tenant.schema_name
-        sys.stdout.write(f"[API Mobile Authentication] Buscando usuario {user_id} en schema: {tenant_schema}\n")
-        sys.stdout.flush()
+        return request.tenant.schema_name
+    
+    def get_usuario_token(self, validated_token):
+        """
+        Arma un UsuarioToken con los claims del token, sin consultar la base de
+        datos. Solo se rechaza si el usuario fue desactivado o eliminado
+        (marca de revocado en la caché).
+        """
+        if 'user_id' not in validated_token:
+            raise InvalidToken('Token no contiene información de usuario válida.')
+        
+        if usuario_revocado(self._tenant_schema(), validated_token['user_id']):
+            raise AuthenticationFailed('Usuario inactivo.')
+        
+        return UsuarioToken(validated_token)
+    
+    def get_user(self, validated_token):
+        """
+        Intenta encontrar y retornar un usuario usando el token validado.
+        Primero busca en la caché por (schema, id_usuario); si no está, lo
+        consulta dentro del schema_context del tenant y lo guarda.
+        """
+        
+        try:
+            user_id = validated_token['user_id']
+        except KeyError:
+            raise InvalidToken('Token no contiene información de usuario válida.')
+        
+        tenant_schema = self._tenant_schema()
+        
+        user = obtener_usuario(tenant_schema, user_id)
+        if user is not None:
+            return user
+        
+        logger.debug("[API Mobile Authentication] Buscando usuario %s en schema: %s", user_id, tenant_schema)
         
         # Usar schema_context para asegurar que la query se ejecute en el schema correcto
         with schema_context(tenant_schema):
             try:
                 user = Usuario.objects.get(id_usuario=user_id)
-                sys.stdout.write(f"[API Mobile Authentication] Usuario {user.email} encontrado en schema: {tenant_schema}\n")
-                sys.stdout.flush()
             except Usuario.DoesNotExist:
-                sys.stdout.write(f"[API Mobile Authentication] Usuario {user_id} NO encontrado en schema: {tenant_schema}\n")
-                sys.stdout.flush()
+                logger.warning("[API Mobile Authentication] Usuario %s NO encontrado en schema: %s", user_id, tenant_schema)
                 raise AuthenticationFailed('Usuario no encontrado.')
             
             if not user.is_active:
                 raise AuthenticationFailed('Usuario inactivo.')
-            
-            return user
+        
+        # Solo se guardan usuarios activos: uno inactivo vuelve a consultarse
+        guardar_usuario(tenant_schema, user)
+        return user
 
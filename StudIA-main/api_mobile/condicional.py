@@ -0,0 +1,85 @@
+"""
+GET condicionales (ETag / Last-Modified) para los listados de la API móvil.
+
+La app vuelve a pedir asignaturas, ayudantías, sedes e inscripciones cada vez
+que una pantalla toma el foco. Antes de armar la respuesta, la vista calcula
+un sello barato del listado:
+- las versiones de catalogo_cache e inscripciones_cache del tenant, que
+  cambian con cada escritura hecha desde la aplicación (admin, tutor,
+  inscripciones);
+- cantidad de filas y fecha de creación más reciente del queryset (una sola
+  query agregada), que cubre cambios hechos por fuera (scripts, shell);
+- la fecha de hoy: los listados ocultan las ayudantías pasadas, así que a
+  medianoche cambian aunque no haya escrituras;
+- el tenant, la URL completa y, si la respuesta depende del estudiante, su id.
+
+Si el ETag coincide con If-None-Match se responde 304 sin ejecutar la query
+del listado ni los serializers. Last-Modified es informativo: como las
+ediciones no cambian created_at, If-Modified-Since no se usa para responder 304.
+"""
+import hashlib
+from datetime import date
+
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from clientManager.tenant_cache import catalogo_cache, inscripciones_cache
+
+
+class ListadoCondicionalMixin:
+    """
+    Uso en list(), dentro del schema_context del tenant:
+
+        respuesta = self.no_modificado(request)
+        if respuesta is not None:
+            return respuesta
+    """
+    # La respuesta depende del estudiante (esta_inscrito, sus inscripciones)
+    etag_por_usuario = False
+    campo_fecha_etag = 'created_at'
+
+    def get_queryset_sello(self):
+        """Queryset cuyo (count, max fecha) entra en el ETag."""
+        return self.filter_queryset(self.get_queryset())
+
+    def _sello(self, request):
+        schema_name = request.tenant.schema_name
+        sello = self.get_queryset_sello().order_by().aggregate(
+            total=Count('pk'), ultima=Max(self.campo_fecha_etag)
+        )
+        partes = [
+            schema_name,
+            catalogo_cache.version(schema_name),
+            inscripciones_cache.version(schema_name),
+            date.today().isoformat(),
+            request.get_full_path(),
+            sello['total'],
+            sello['ultima'].isoformat() if sello['ultima'] else '',
+        ]
+        if self.etag_por_usuario:
+            partes.append(request.user.pk)
+        etag = quote_etag(hashlib.md5('|'.join(map(str, partes)).encode()).hexdigest())
+        return etag, sello['ultima']
+
+    def no_modificado(self, request):
+        """Retorna un Response 304 si el cliente ya tiene esta versión; si no, None."""
+        self._etag, self._ultima_modificacion = self._sello(request)
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            if '*' in etags or self._etag in etags:
+                return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return None
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, '_etag', None)
+        if etag and response.status_code in (200, 304):
+            response['ETag'] = etag
+            if self._ultima_modificacion:
+                response['Last-Modified'] = http_date(self._ultima_modificacion.timestamp())
+            # El navegador/proxy puede guardarla, pero siempre debe revalidar
+            response['Cache-Control'] = 'private, no-cache'
+        return response
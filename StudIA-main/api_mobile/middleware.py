@@ -2,10 +2,12 @@
 Middleware para manejar la identificación de tenant en la API móvil.
 Permite especificar el tenant mediante header HTTP o parámetro en la URL.
 """
-from django_tenants.utils import schema_context
+import logging
 from clientManager.models import Empresa
+from clientManager.tenant_registry import tenant_registry
 from django.http import JsonResponse
-import sys
+
+logger = logging.getLogger(__name__)
 
 
 class ApiMobileTenantMiddleware:
@@ -29,31 +31,21 @@ class ApiMobileTenantMiddleware:
         if not tenant_schema:
             hostname = request.get_host().split(':')[0]
             try:
-                with schema_context('public'):
-                    # Buscar tenant por dominio
-                    from clientManager.models import Dominio
-                    dominio = Dominio.objects.filter(domain=hostname).first()
-                    if dominio:
-                        tenant_schema = dominio.tenant.schema_name
+                tenant = tenant_registry.get_by_hostname(hostname)
+                if tenant:
+                    tenant_schema = tenant.schema_name
             except Exception:
                 pass
         
         # Opción 4: Si aún no hay tenant, usar el primer tenant activo (solo para desarrollo)
         if not tenant_schema:
             try:
-                with schema_context('public'):
-                    # Obtener el primer tenant activo
-                    first_tenant = Empresa.objects.filter(estado='A').first()
-                    if not first_tenant:
-                        # Si no hay con estado 'A', intentar con cualquier tenant (excepto public)
-                        first_tenant = Empresa.objects.exclude(schema_name='public').first()
-                    if first_tenant:
-                        tenant_schema = first_tenant.schema_name
-                        sys.stdout.write(f"[API Mobile] Usando tenant por defecto: {tenant_schema}\n")
-                        sys.stdout.flush()
+                first_tenant = tenant_registry.get_default()
+                if first_tenant:
+                    tenant_schema = first_tenant.schema_name
+                    logger.debug("[API Mobile] Usando tenant por defecto: %s", tenant_schema)
             except Exception as e:
-                sys.stdout.write(f"[API Mobile] Error al obtener tenant por defecto: {e}\n")
-                sys.stdout.flush()
+                logger.error("[API Mobile] Error al obtener tenant por defecto: %s", e)
                 pass
         
         return tenant_schema
@@ -61,40 +53,35 @@ class ApiMobileTenantMiddleware:
     def _set_tenant(self, request, tenant_schema):
         """Establece el tenant en el request. El schema se manejará con schema_context en las vistas."""
         if not tenant_schema:
-            sys.stdout.write("[API Mobile] WARNING: No se pudo identificar ningún tenant\n")
-            sys.stdout.flush()
+            logger.warning("[API Mobile] WARNING: No se pudo identificar ningún tenant")
             return False
         
         try:
-            with schema_context('public'):
-                tenant = Empresa.objects.get(schema_name=tenant_schema)
+            tenant = tenant_registry.get_by_schema(tenant_schema, case_sensitive=True)
+            if tenant is None:
+                raise Empresa.DoesNotExist
             
             # Establecer el tenant en el request
             # Las vistas usarán schema_context para todas las operaciones de BD
             request.tenant = tenant
             
-            sys.stdout.write(f"[API Mobile] Tenant establecido en request: {tenant_schema} ({tenant.nombre_empresa})\n")
-            sys.stdout.flush()
+            logger.debug("[API Mobile] Tenant establecido en request: %s (%s)", tenant_schema, tenant.nombre_empresa)
             
             return True
         except Empresa.DoesNotExist:
             # Si el tenant no existe, devolver error
-            sys.stdout.write(f"[API Mobile] ERROR: Tenant '{tenant_schema}' no encontrado\n")
-            sys.stdout.flush()
+            logger.error("[API Mobile] ERROR: Tenant '%s' no encontrado", tenant_schema)
             return False
         except Exception as e:
-            sys.stdout.write(f"[API Mobile] ERROR al establecer tenant: {e}\n")
-            sys.stdout.flush()
+            logger.error("[API Mobile] ERROR al establecer tenant: %s", e)
             return False
 
     def __call__(self, request):
         # Solo procesar si es una petición a la API móvil
         if request.path.startswith('/api/mobile/'):
             # Log para todas las peticiones (incluyendo OPTIONS) - FORZAR salida
-            sys.stdout.write(f"[API Mobile] Petición recibida: {request.method} {request.path}\n")
-            sys.stdout.flush()
-            sys.stdout.write(f"[API Mobile] Header X-Tenant-Schema: {request.headers.get('X-Tenant-Schema', 'NO ENVIADO')}\n")
-            sys.stdout.flush()
+            logger.debug("[API Mobile] Petición recibida: %s %s", request.method, request.path)
+            logger.debug("[API Mobile] Header X-Tenant-Schema: %s", request.headers.get('X-Tenant-Schema', 'NO ENVIADO'))
             
             # Obtener el tenant schema
             tenant_schema = self._get_tenant_schema(request)
@@ -1,3 +1,18 @@
 from django.db import models
 
-# Create your models here.
+
+class RegistroEliminado(models.Model):
+    """
+    Lápida de una fila eliminada (Asignatura, Ayudantia, Inscripcion o Sede)
+    para que /sync/ informe la eliminación a la app. Se crean desde las
+    señales post_delete de api_mobile/signals.py.
+    """
+    modelo = models.CharField(max_length=20)
+    objeto_id = models.IntegerField()
+    # Solo para inscripciones: la app de otros estudiantes no necesita enterarse
+    estudiante_id = models.IntegerField(null=True, blank=True)
+    eliminado_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Registro eliminado"
+        verbose_name_plural = "Registros eliminados"
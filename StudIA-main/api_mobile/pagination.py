@@ -0,0 +1,20 @@
+"""
+Paginadores de la API móvil.
+"""
+from rest_framework.pagination import CursorPagination
+from rest_framework.settings import api_settings
+
+
+class AsignaturaCursorPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) para el listado de asignaturas.
+    El LIMIT y la condición "nombre > último visto" van en el SQL, así que cada
+    página lee solo sus filas sin importar cuántas asignaturas haya.
+    El cursor de DRF guarda solo el primer campo del ordering (nombre): las
+    asignaturas con el mismo nombre que el último visto se saltan con el
+    offset del cursor. id_asignatura no entra en el cursor; solo fija el
+    orden entre ellas para que ese offset sea estable. El índice
+    (nombre, id_asignatura) sirve el ORDER BY completo.
+    """
+    page_size = api_settings.PAGE_SIZE or 20
+    ordering = ('nombre', 'id_asignatura')
@@ -0,0 +1,120 @@
+"""
+Índice en memoria para buscar las sedes más cercanas a un punto
+(/api/mobile/sedes/cercanas/).
+
+Cada sede se pasa a un vector unitario (x, y, z) sobre la esfera y se guarda
+en un KD-tree de 3 dimensiones. La distancia euclidiana entre vectores (la
+cuerda) crece junto con la distancia sobre la superficie, así que los k
+vecinos por cuerda son exactamente los k más cercanos por haversine, sin los
+problemas de un bounding box en lat/lng cerca del antimeridiano o de los
+polos. Con miles de sedes una consulta recorre unas decenas de nodos.
+
+Hay un índice por tenant y por proceso. Se rearma cuando cambia la versión
+de catalogo_cache del tenant (cualquier escritura de Sede la incrementa, ver
+api_mobile/signals.py) o pasados CATALOGO_CACHE_TTL segundos, para recoger
+cambios hechos por fuera del ORM.
+"""
+import heapq
+import math
+import threading
+import time
+
+from clientManager.tenant_cache import CATALOGO_CACHE_TTL, catalogo_cache
+from loginApp.models import Sede
+
+RADIO_TIERRA_KM = 6371.0088
+
+CAMPOS = ('id_sede', 'nombre', 'direccion', 'latitud', 'longitud')
+
+# schema -> (versión del catálogo, momento en que se armó, IndiceSedes)
+_indices = {}
+_lock = threading.Lock()
+
+
+def _vector(latitud, longitud):
+    lat, lng = math.radians(latitud), math.radians(longitud)
+    coseno = math.cos(lat)
+    return coseno * math.cos(lng), coseno * math.sin(lng), math.sin(lat)
+
+
+def _construir(puntos, profundidad=0):
+    """Nodo (punto, eje, izquierdo, derecho); cada punto es (x, y, z, posición)."""
+    if not puntos:
+        return None
+    eje = profundidad % 3
+    puntos.sort(key=lambda punto: punto[eje])
+    medio = len(puntos) // 2
+    return (
+        puntos[medio],
+        eje,
+        _construir(puntos[:medio], profundidad + 1),
+        _construir(puntos[medio + 1:], profundidad + 1),
+    )
+
+
+def _buscar(nodo, objetivo, k, heap):
+    """Deja en `heap` los k puntos más cercanos como (-cuerda², posición)."""
+    if nodo is None:
+        return
+    punto, eje, izquierdo, derecho = nodo
+    distancia = (
+        (punto[0] - objetivo[0]) ** 2
+        + (punto[1] - objetivo[1]) ** 2
+        + (punto[2] - objetivo[2]) ** 2
+    )
+    if len(heap) < k:
+        heapq.heappush(heap, (-distancia, punto[3]))
+    elif distancia < -heap[0][0]:
+        heapq.heapreplace(heap, (-distancia, punto[3]))
+
+    diferencia = objetivo[eje] - punto[eje]
+    cerca, lejos = (izquierdo, derecho) if diferencia < 0 else (derecho, izquierdo)
+    _buscar(cerca, objetivo, k, heap)
+    # El otro lado solo puede tener algo mejor si el plano de corte está más cerca que el peor encontrado
+    if len(heap) < k or diferencia * diferencia < -heap[0][0]:
+        _buscar(lejos, objetivo, k, heap)
+
+
+class IndiceSedes:
+    """KD-tree sobre una lista de sedes (diccionarios con CAMPOS)."""
+
+    def __init__(self, sedes):
+        self.sedes = sedes
+        self.raiz = _construir([
+            (*_vector(sede['latitud'], sede['longitud']), posicion)
+            for posicion, sede in enumerate(sedes)
+        ])
+
+    def __len__(self):
+        return len(self.sedes)
+
+    def cercanas(self, latitud, longitud, k):
+        """Las k sedes más cercanas, ordenadas, cada una con distancia_km."""
+        heap = []
+        _buscar(self.raiz, _vector(latitud, longitud), k, heap)
+        resultado = []
+        for menos_distancia, posicion in sorted(heap, reverse=True):
+            cuerda = math.sqrt(-menos_distancia)
+            distancia_km = 2 * RADIO_TIERRA_KM * math.asin(min(1.0, cuerda / 2))
+            resultado.append({**self.sedes[posicion], 'distancia_km': round(distancia_km, 3)})
+        return resultado
+
+
+def indice_sedes(schema_name):
+    """
+    Índice de las sedes activas del tenant. Debe llamarse dentro del
+    schema_context del tenant (la reconstrucción consulta Sede).
+    """
+    version = catalogo_cache.version(schema_name)
+    actual = _indices.get(schema_name)
+    if actual is not None and actual[0] == version and time.monotonic() - actual[1] < CATALOGO_CACHE_TTL:
+        return actual[2]
+
+    with _lock:
+        # Otro hilo pudo rearmarlo mientras se esperaba el lock
+        actual = _indices.get(schema_name)
+        if actual is not None and actual[0] == version and time.monotonic() - actual[1] < CATALOGO_CACHE_TTL:
+            return actual[2]
+        indice = IndiceSedes(list(Sede.objects.filter(is_active=True).order_by('pk').values(*CAMPOS)))
+        _indices[schema_name] = (version, time.monotonic(), indice)
+        return indice
@@ -1,10 +1,24 @@
 """
 Serializers para la API móvil de estudiantes.
 """
+import logging
 from rest_framework import serializers
 from loginApp.models import Usuario, Asignatura, Ayudantia, Inscripcion, Sede
 from datetime import date
 
+logger = logging.getLogger(__name__)
+
+
+def inscripciones_activas_ids(user):
+    """Set con los IDs de ayudantía de las inscripciones activas del usuario (una query)."""
+    if user is None or not user.is_authenticated:
+        return set()
+    # Por id: el usuario puede ser un UsuarioToken armado desde el JWT
+    return set(Inscripcion.objects.filter(
+        estudiante_id=user.pk,
+        estado='activa'
+    ).values_list('ayudantia_id', flat=True))
+
 
 class UsuarioSerializer(serializers.ModelSerializer):
     """Serializer para el modelo Usuario (solo lectura para estudiantes)"""
@@ -31,6 +45,10 @@ class AsignaturaSerializer(serializers.ModelSerializer):
     
     def get_total_ayudantias_disponibles(self, obj):
         """Cuenta las ayudantías activas y disponibles"""
+        # AsignaturaViewSet lo trae anotado desde la BD
+        if hasattr(obj, 'n_ayudantias_disponibles'):
+            return obj.n_ayudantias_disponibles
+        
         # Usar las ayudantías precargadas si están disponibles
         if hasattr(obj, '_prefetched_objects_cache') and 'ayudantias' in obj._prefetched_objects_cache:
             ayudantias = obj._prefetched_objects_cache['ayudantias']
@@ -94,6 +112,19 @@ class AyudantiaSerializer(serializers.ModelSerializer):
         """Formatea el horario como string"""
         return obj.horario.strftime('%H:%M') if obj.horario else None
     
+    def _ids_inscritas(self):
+        """
+        IDs de las ayudantías donde el estudiante tiene inscripción activa.
+        Las vistas de listado lo precargan en el contexto; si no viene, se
+        consulta una sola vez y queda en el contexto compartido por todas las
+        filas (y por los serializers anidados).
+        """
+        if 'inscripciones_activas_ids' not in self.context:
+            request = self.context.get('request')
+            user = request.user if request else None
+            self.context['inscripciones_activas_ids'] = inscripciones_activas_ids(user)
+        return self.context['inscripciones_activas_ids']
+    
     def get_puede_inscribirse(self, obj):
         """Verifica si el estudiante puede inscribirse"""
         request = self.context.get('request')
@@ -113,14 +144,7 @@ class AyudantiaSerializer(serializers.ModelSerializer):
             return False
         
         # Verificar que no esté ya inscrito
-        if Inscripcion.objects.filter(
-            estudiante=request.user,
-            ayudantia=obj,
-            estado='activa'
-        ).exists():
-            return False
-        
-        return True
+        return obj.id_ayudantia not in self._ids_inscritas()
     
     def get_esta_inscrito(self, obj):
         """Verifica si el estudiante está inscrito"""
@@ -128,11 +152,7 @@ class AyudantiaSerializer(serializers.ModelSerializer):
         if not request or not request.user.is_authenticated:
             return False
         
-        return Inscripcion.objects.filter(
-            estudiante=request.user,
-            ayudantia=obj,
-            estado='activa'
-        ).exists()
+        return obj.id_ayudantia in self._ids_inscritas()
 
 
 class InscripcionSerializer(serializers.ModelSerializer):
@@ -194,10 +214,10 @@ class LoginSerializer(serializers.Serializer):
             if request and hasattr(request, 'tenant'):
                 # Usar schema_context de django-tenants (método recomendado)
                 with schema_context(request.tenant.schema_name):
-                    print(f"[API Mobile Serializer] Usando schema_context: {request.tenant.schema_name}")
+                    logger.debug("[API Mobile Serializer] Usando schema_context: %s", request.tenant.schema_name)
                     try:
                         user = Usuario.objects.get(email=email)
-                        print(f"[API Mobile Serializer] Usuario encontrado: {user.email}")
+                        logger.debug("[API Mobile Serializer] Usuario encontrado: %s", user.email)
                     except Usuario.DoesNotExist:
                         raise serializers.ValidationError({
                             'non_field_errors': ['Email o contraseña incorrectos.']
@@ -215,16 +235,12 @@ class LoginSerializer(serializers.Serializer):
                             'non_field_errors': ['Tu cuenta está desactivada.']
                         })
                     
-                    # Verificar que sea estudiante (no staff ni tutor)
-                    if user.is_staff or user.is_tutor:
-                        raise serializers.ValidationError({
-                            'non_field_errors': ['Esta aplicación es solo para estudiantes.']
-                        })
+                    self.validar_rol(user)
                     
                     # Guardar el usuario en attrs (fuera del schema_context)
                     attrs['user'] = user
             else:
-                print(f"[API Mobile Serializer] WARNING: No hay tenant en el request")
+                logger.warning("[API Mobile Serializer] WARNING: No hay tenant en el request")
                 raise serializers.ValidationError({
                     'non_field_errors': ['No se pudo identificar el tenant.']
                 })
@@ -234,4 +250,44 @@ class LoginSerializer(serializers.Serializer):
             raise serializers.ValidationError({
                 'non_field_errors': ['Debe proporcionar email y contraseña.']
             })
+    
+    def validar_rol(self, user):
+        """Verificar que sea estudiante (no staff ni tutor)"""
+        if user.is_staff or user.is_tutor:
+            raise serializers.ValidationError({
+                'non_field_errors': ['Esta aplicación es solo para estudiantes.']
+            })
+
+
+class TutorLoginSerializer(LoginSerializer):
+    """Serializer para el login de tutores (registro de asistencia)"""
+    
+    def validar_rol(self, user):
+        if not user.is_tutor:
+            raise serializers.ValidationError({
+                'non_field_errors': ['Esta sección es solo para tutores.']
+            })
+
+
+class AsistenciaInscripcionSerializer(serializers.ModelSerializer):
+    """Inscripción activa en la lista de asistencia del tutor"""
+    estudiante_id = serializers.IntegerField(source='estudiante.id_usuario', read_only=True)
+    estudiante_nombre = serializers.CharField(source='estudiante.nombre_usuario', read_only=True)
+    estudiante_email = serializers.EmailField(source='estudiante.email', read_only=True)
+    
+    class Meta:
+        model = Inscripcion
+        fields = [
+            'id_inscripcion',
+            'estudiante_id',
+            'estudiante_nombre',
+            'estudiante_email',
+            'asistio',
+        ]
+        read_only_fields = fields
+
+
+class AsistenciaSerializer(serializers.Serializer):
+    """Lista completa de asistencia: ids de las inscripciones presentes (el resto queda ausente)"""
+    asistieron = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=True)
 
@@ -0,0 +1,43 @@
+"""
+Lápidas para la sincronización incremental (api_mobile/sync.py).
+
+Se usan señales post_delete y no llamadas explícitas en las vistas porque
+las eliminaciones llegan también en cascada (eliminar una asignatura borra
+sus ayudantías e inscripciones) y desde QuerySet.delete(). La lápida se crea
+en la misma transacción que la eliminación.
+
+Cualquier alta, edición o baja de Sede (también desde cargar_sedes o el
+shell) invalida además el catálogo del tenant, del que depende el índice de
+sedes cercanas (api_mobile/sedes_cercanas.py).
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from clientManager.tenant_cache import catalogo_cache
+from loginApp.models import Asignatura, Ayudantia, Inscripcion, Sede
+from .models import RegistroEliminado
+
+MODELOS_SYNC = {
+    Asignatura: 'asignaturas',
+    Ayudantia: 'ayudantias',
+    Inscripcion: 'inscripciones',
+    Sede: 'sedes',
+}
+
+
+@receiver(post_delete, sender=Asignatura)
+@receiver(post_delete, sender=Ayudantia)
+@receiver(post_delete, sender=Inscripcion)
+@receiver(post_delete, sender=Sede)
+def registrar_eliminacion(sender, instance, **kwargs):
+    RegistroEliminado.objects.create(
+        modelo=MODELOS_SYNC[sender],
+        objeto_id=instance.pk,
+        estudiante_id=getattr(instance, 'estudiante_id', None),
+    )
+
+
+@receiver(post_save, sender=Sede)
+@receiver(post_delete, sender=Sede)
+def invalidar_catalogo_sedes(sender, instance, **kwargs):
+    catalogo_cache.clear()
@@ -0,0 +1,94 @@
+"""
+Sincronización incremental para la app móvil: GET /api/mobile/sync/?since=<cursor>
+
+Sin `since` (o con un cursor más viejo que la retención de lápidas) responde
+la foto completa de lo que la app muestra y reset=true. Con un cursor válido
+responde solo las filas de Asignatura, Ayudantia, Sede y las Inscripciones del
+estudiante con updated_at posterior al cursor, más los ids eliminados
+(RegistroEliminado). En ambos casos entrega el cursor para la siguiente
+llamada.
+
+Las filas se envían planas (values()), sin campos derivados como
+total_ayudantias_disponibles o esta_inscrito: la app los calcula con su copia
+local, así un cambio de cupos no obliga a reenviar la asignatura.
+
+El cursor es el instante en que empezó la consulta. Para no perder filas de
+transacciones que confirmaron después de ese instante con un updated_at
+anterior, cada consulta incremental retrocede settings.SYNC_SOLAPE segundos;
+la app aplica los cambios por id, así que recibir una fila dos veces no
+tiene efecto.
+"""
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import F, Q
+
+from loginApp.models import Asignatura, Ayudantia, Inscripcion, Sede
+from .models import RegistroEliminado
+
+SYNC_SOLAPE = getattr(settings, 'SYNC_SOLAPE', 30)
+SYNC_RETENCION_DIAS = getattr(settings, 'SYNC_RETENCION_DIAS', 30)
+
+CAMPOS_ASIGNATURA = ('id_asignatura', 'nombre', 'codigo', 'carrera', 'descripcion', 'is_active')
+CAMPOS_AYUDANTIA = (
+    'id_ayudantia', 'asignatura_id', 'tutor_id', 'titulo', 'descripcion', 'sala', 'fecha',
+    'horario', 'duracion', 'cupos_totales', 'cupos_disponibles', 'is_active', 'is_cursada',
+)
+CAMPOS_INSCRIPCION = ('id_inscripcion', 'ayudantia_id', 'fecha_inscripcion', 'estado', 'asistio')
+CAMPOS_SEDE = ('id_sede', 'nombre', 'direccion', 'latitud', 'longitud', 'is_active')
+
+
+def cursor_a_fecha(cursor):
+    """El cursor son los microsegundos desde epoch (UTC) como texto; None si no es válido."""
+    try:
+        microsegundos = int(cursor)
+    except (TypeError, ValueError):
+        return None
+    return datetime(1970, 1, 1, tzinfo=dt_timezone.utc) + timedelta(microseconds=microsegundos)
+
+
+def fecha_a_cursor(fecha):
+    delta = fecha - datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+    return str((delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds)
+
+
+def datos_sync(estudiante_id, desde=None):
+    """
+    Arma el diccionario de /sync/. Con `desde` None es la foto completa; si no,
+    los cambios con updated_at > desde - SYNC_SOLAPE.
+    """
+    asignaturas = Asignatura.objects.all()
+    ayudantias = Ayudantia.objects.all()
+    inscripciones = Inscripcion.objects.filter(estudiante_id=estudiante_id)
+    sedes = Sede.objects.all()
+
+    if desde is None:
+        asignaturas = asignaturas.filter(is_active=True)
+        ayudantias = ayudantias.filter(is_active=True, is_cursada=False, fecha__gte=date.today())
+        inscripciones = inscripciones.filter(estado='activa')
+        sedes = sedes.filter(is_active=True)
+        eliminados = RegistroEliminado.objects.none()
+    else:
+        limite = desde - timedelta(seconds=SYNC_SOLAPE)
+        asignaturas = asignaturas.filter(updated_at__gt=limite)
+        ayudantias = ayudantias.filter(updated_at__gt=limite)
+        inscripciones = inscripciones.filter(updated_at__gt=limite)
+        sedes = sedes.filter(updated_at__gt=limite)
+        # Las inscripciones eliminadas de otros estudiantes no le importan a esta app
+        eliminados = RegistroEliminado.objects.filter(eliminado_at__gt=limite).filter(
+            ~Q(modelo='inscripciones') | Q(estudiante_id=estudiante_id)
+        )
+
+    ids_eliminados = {'asignaturas': [], 'ayudantias': [], 'inscripciones': [], 'sedes': []}
+    for modelo, objeto_id in eliminados.values_list('modelo', 'objeto_id'):
+        ids_eliminados[modelo].append(objeto_id)
+
+    return {
+        'asignaturas': list(asignaturas.order_by('id_asignatura').values(*CAMPOS_ASIGNATURA)),
+        'ayudantias': list(ayudantias.order_by('id_ayudantia').values(
+            *CAMPOS_AYUDANTIA, tutor_nombre=F('tutor__nombre_usuario'), tutor_email=F('tutor__email')
+        )),
+        'inscripciones': list(inscripciones.order_by('id_inscripcion').values(*CAMPOS_INSCRIPCION)),
+        'sedes': list(sedes.order_by('id_sede').values(*CAMPOS_SEDE)),
+        'eliminados': ids_eliminados,
+    }
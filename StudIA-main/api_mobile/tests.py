@@ -1,3 +1,103 @@
-from django.test import TestCase
+from datetime import date, time, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django_tenants.test.cases import TenantTestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from clientManager.tenant_registry import tenant_registry
+from loginApp.inscripciones import inscribir
+from loginApp.models import Usuario, Asignatura, Ayudantia
+
+
+def token_acceso(usuario):
+    """Access token con los mismos claims que arma LoginView."""
+    access = RefreshToken().access_token
+    access['user_id'] = usuario.id_usuario
+    access['email'] = usuario.email
+    access['is_student'] = not (usuario.is_staff or usuario.is_tutor)
+    return str(access)
+
+
+class ApiMobileTestCase(TenantTestCase):
+    """Tenant con un tutor y una asignatura; el cliente envía X-Tenant-Schema."""
+
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.nombre_empresa = 'Test API Mobile'
+        tenant.estado = 'A'
+        tenant.nombre_sn = 'test'
+
+    def setUp(self):
+        tenant_registry.invalidate()
+        self.tutor = Usuario.objects.create_user(
+            'tutor', 'tutor@test.cl', 'clave', telefono=1, cargo='Tutor', horario_atencion=1, is_tutor=True
+        )
+        self.asignatura = Asignatura.objects.create(nombre='Cálculo', codigo='MAT100', carrera='Ingeniería')
+        self.client = APIClient(HTTP_X_TENANT_SCHEMA=self.tenant.schema_name)
+
+    def crear_ayudantia(self, **kwargs):
+        datos = {
+            'tutor': self.tutor,
+            'asignatura': self.asignatura,
+            'titulo': 'Repaso',
+            'descripcion': 'Repaso prueba 1',
+            'sala': 'A-101',
+            'fecha': date.today() + timedelta(days=1),
+            'horario': time(10, 0),
+            'cupos_totales': 10,
+        }
+        datos.update(kwargs)
+        return Ayudantia.objects.create(**datos)
+
+    def crear_estudiante(self, nombre):
+        return Usuario.objects.create_user(
+            nombre, f'{nombre}@test.cl', 'clave', telefono=2, cargo='Estudiante', horario_atencion=0
+        )
+
+    def autenticar(self, usuario):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token_acceso(usuario)}')
+
+
+class AsignaturasCondicionalTest(ApiMobileTestCase):
+    """El ETag y la página (cacheada) de asignaturas deben salir del mismo estado."""
+
+    def setUp(self):
+        super().setUp()
+        self.ultimo_cupo = self.crear_ayudantia(cupos_totales=1)
+        self.crear_ayudantia(titulo='Ejercicios')
+        self.autenticar(self.crear_estudiante('est'))
+
+    def _listar(self, etag=None):
+        extra = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get('/api/mobile/asignaturas/', **extra)
+
+    def test_inscripcion_cambia_etag_y_pagina(self):
+        antes = self._listar()
+        self.assertEqual(antes.status_code, 200)
+        self.assertEqual(antes.data['results'][0]['total_ayudantias_disponibles'], 2)
+        self.assertEqual(self._listar(antes['ETag']).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inscribir(self.crear_estudiante('otro'), self.ultimo_cupo)
+
+        despues = self._listar(antes['ETag'])
+        self.assertEqual(despues.status_code, 200)
+        self.assertNotEqual(despues['ETag'], antes['ETag'])
+        self.assertEqual(despues.data['results'][0]['total_ayudantias_disponibles'], 1)
+        self.assertEqual(self._listar(despues['ETag']).status_code, 304)
+
+    def test_medianoche_cambia_etag_y_pagina(self):
+        antes = self._listar()
+        self.assertEqual(len(antes.data['results']), 1)
+
+        # Pasado mañana las dos ayudantías (mañana) ya pasaron
+        pasado_manana = date.today() + timedelta(days=2)
+        with mock.patch('api_mobile.views.date') as views_date, \
+                mock.patch('api_mobile.condicional.date') as condicional_date:
+            views_date.today.return_value = condicional_date.today.return_value = pasado_manana
+            despues = self._listar(antes['ETag'])
+
+        self.assertEqual(despues.status_code, 200)
+        self.assertNotEqual(despues['ETag'], antes['ETag'])
+        self.assertEqual(despues.data['results'], [])
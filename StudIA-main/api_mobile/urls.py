@@ -11,6 +11,9 @@ from .views import (
     AyudantiaViewSet,
     InscripcionViewSet,
     SedeViewSet,
+    SyncView,
+    TutorLoginView,
+    AsistenciaView,
 )
 
 # Crear router para los viewsets
@@ -25,6 +28,13 @@ urlpatterns = [
     path('auth/login/', LoginView.as_view(), name='api_login'),
     path('auth/perfil/', PerfilView.as_view(), name='api_perfil'),
     path('auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('auth/login-tutor/', TutorLoginView.as_view(), name='api_login_tutor'),
+    
+    # Sincronización incremental
+    path('sync/', SyncView.as_view(), name='api_sync'),
+    
+    # Tutores: asistencia de toda la clase en una llamada
+    path('tutor/ayudantias/<int:ayudantia_id>/asistencia/', AsistenciaView.as_view(), name='api_tutor_asistencia'),
     
     # Incluir rutas del router
     path('', include(router.urls)),
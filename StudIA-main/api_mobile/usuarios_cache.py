@@ -0,0 +1,91 @@
+"""
+Caché del usuario autenticado por JWT en la API móvil.
+
+Cada request autenticado abría un schema_context y hacía
+Usuario.objects.get(id_usuario=...). Aquí el usuario se guarda en la caché por
+tenant (clientManager.tenant_cache) con clave (schema, id_usuario) y un TTL
+corto (settings.API_MOBILE_USER_CACHE_TTL), así el tenant nunca comparte
+usuarios con otro aunque los id_usuario coincidan.
+
+Las vistas que modifican usuarios (editarUsuario, editarClaveAdmin,
+borrarUsuario) llaman a invalidar_usuario(). Cuando el usuario queda inactivo
+o se elimina además se marca como revocado durante la vida del access token:
+los endpoints que arman el usuario desde los claims del token (sin query) lo
+consultan para rechazarlo.
+
+Con la caché por defecto (LocMemCache) cada worker tiene su propia copia y la
+invalidación solo alcanza al proceso que la ejecuta; en los demás el cambio se
+ve cuando vence el TTL. La marca de revocado necesita una caché compartida
+para valer en todos los workers.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from clientManager.tenant_cache import TenantCache
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+USER_CACHE_TTL = getattr(settings, 'API_MOBILE_USER_CACHE_TTL', 60)
+
+usuarios_cache = TenantCache('api_mobile_usuarios', timeout=USER_CACHE_TTL)
+
+
+def _clave_revocado(schema_name, user_id):
+    # Fuera de TenantCache: invalidar el tenant no debe borrar las revocaciones
+    return f'api_mobile:usuario_revocado:{schema_name}:{user_id}'
+
+
+def obtener_usuario(schema_name, user_id):
+    """Retorna el Usuario guardado en caché o None."""
+    return usuarios_cache.get(user_id, schema_name=schema_name)
+
+
+def guardar_usuario(schema_name, usuario):
+    usuarios_cache.set(usuario.pk, usuario, schema_name=schema_name)
+
+
+def usuario_revocado(schema_name, user_id):
+    return cache.get(_clave_revocado(schema_name, user_id)) is not None
+
+
+def invalidar_usuario(user_id, revocar=False, schema_name=None):
+    """
+    Saca al usuario de la caché. Con revocar=True (usuario desactivado o
+    eliminado) los tokens ya emitidos dejan de valer también en los endpoints
+    que no consultan la base de datos; con revocar=False se quita la marca,
+    por si el usuario se volvió a activar.
+    """
+    schema_name = schema_name or connection.schema_name
+    usuarios_cache.delete(user_id, schema_name=schema_name)
+    if revocar:
+        timeout = int(jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+        cache.set(_clave_revocado(schema_name, user_id), True, timeout)
+    else:
+        cache.delete(_clave_revocado(schema_name, user_id))
+
+
+class UsuarioToken(TokenUser):
+    """
+    Usuario liviano armado solo con los claims del token (user_id, email,
+    is_student). No hace queries: sirve para los GET que solo necesitan el id
+    del estudiante y saber que no es staff ni tutor.
+    """
+    @property
+    def id_usuario(self):
+        return self.pk
+
+    @property
+    def email(self):
+        return self.token.get('email', '')
+
+    @property
+    def is_student(self):
+        return bool(self.token.get('is_student', False))
+
+    @property
+    def is_staff(self):
+        return not self.is_student
+
+    @property
+    def is_tutor(self):
+        return False
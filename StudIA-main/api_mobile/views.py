@@ -1,18 +1,24 @@
 """
 Views API para la aplicación móvil de estudiantes.
 """
+import hashlib
+import logging
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
 from rest_framework_simplejwt.tokens import RefreshToken
+from django.db.models import Count, Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from datetime import date
-import sys
+from datetime import date, timedelta
 
+from clientManager.tenant_cache import catalogo_cache, inscripciones_cache
 from loginApp.models import Usuario, Asignatura, Ayudantia, Inscripcion, Sede
+from loginApp.inscripciones import inscribir, cancelar as cancelar_inscripcion, InscripcionError, registrar_asistencia
 from .serializers import (
     UsuarioSerializer,
     AsignaturaSerializer,
@@ -20,7 +26,31 @@ from .serializers import (
     InscripcionSerializer,
     SedeSerializer,
     LoginSerializer,
+    TutorLoginSerializer,
+    AsistenciaInscripcionSerializer,
+    AsistenciaSerializer,
+    inscripciones_activas_ids,
 )
+from .pagination import AsignaturaCursorPagination
+from .condicional import ListadoCondicionalMixin
+from .usuarios_cache import UsuarioToken
+from .sync import SYNC_RETENCION_DIAS, cursor_a_fecha, datos_sync, fecha_a_cursor
+from .sedes_cercanas import indice_sedes
+
+logger = logging.getLogger(__name__)
+
+# Máximo de sedes que retorna /sedes/cercanas/
+SEDES_CERCANAS_MAX = 50
+
+
+def _clave_catalogo(request, nombre, *estado):
+    """
+    Clave de caché de una página del catálogo. Incluye host y query string
+    porque "next"/"previous" son URLs absolutas, y `estado` (versiones, fecha)
+    cuando la página depende de algo que no invalida catalogo_cache.
+    """
+    partes = [request.build_absolute_uri(), *map(str, estado)]
+    return f'{nombre}:' + hashlib.md5('|'.join(partes).encode()).hexdigest()
 
 
 class EstudianteOnlyPermission(IsAuthenticated):
@@ -31,9 +61,9 @@ class EstudianteOnlyPermission(IsAuthenticated):
         if not super().has_permission(request, view):
             return False
         
-        # Verificar que sea del tipo Usuario
-        from loginApp.models import Usuario
-        if not isinstance(request.user, Usuario):
+        # Verificar que sea del tipo Usuario (o el usuario liviano armado desde
+        # el token en los GET de vistas con usuario_desde_token)
+        if not isinstance(request.user, (Usuario, UsuarioToken)):
             return False
         
         # Verificar que sea estudiante (no staff ni tutor)
@@ -43,15 +73,26 @@ class EstudianteOnlyPermission(IsAuthenticated):
         return True
 
 
+class TutorOnlyPermission(IsAuthenticated):
+    """
+    Permiso personalizado que verifica que el usuario sea un tutor.
+    """
+    def has_permission(self, request, view):
+        if not super().has_permission(request, view):
+            return False
+        return isinstance(request.user, Usuario) and request.user.is_tutor
+
+
 class LoginView(APIView):
     """
     Endpoint para login de estudiantes.
     Retorna tokens JWT para autenticación.
     """
     permission_classes = []
+    serializer_class = LoginSerializer
     
     def post(self, request):
-        serializer = LoginSerializer(data=request.data, context={'request': request})
+        serializer = self.serializer_class(data=request.data, context={'request': request})
         if serializer.is_valid():
             user = serializer.validated_data['user']
             
@@ -99,6 +140,14 @@ class LoginView(APIView):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+class TutorLoginView(LoginView):
+    """
+    Endpoint para login de tutores (registro de asistencia desde la app).
+    Retorna tokens JWT con is_student=False.
+    """
+    serializer_class = TutorLoginSerializer
+
+
 class PerfilView(APIView):
     """
     Endpoint para obtener el perfil del estudiante autenticado.
@@ -123,26 +172,34 @@ class PerfilView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
 
-class AsignaturaViewSet(viewsets.ReadOnlyModelViewSet):
+class AsignaturaViewSet(ListadoCondicionalMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet para listar y ver detalles de asignaturas.
     Solo muestra asignaturas con ayudantías disponibles.
     """
     permission_classes = [EstudianteOnlyPermission]
+    usuario_desde_token = True
     serializer_class = AsignaturaSerializer
+    pagination_class = AsignaturaCursorPagination
     queryset = Asignatura.objects.none()  # Se sobrescribe en get_queryset
     
     def get_queryset(self):
-        """Retorna solo asignaturas con ayudantías activas disponibles"""
+        """
+        Retorna solo asignaturas con ayudantías activas disponibles.
+        El total de ayudantías disponibles se calcula como anotación (sin
+        JOIN + DISTINCT ni prefetch de todas las ayudantías).
+        """
         # El schema_context se maneja en list(), aquí solo construimos el queryset
         if hasattr(self.request, 'tenant'):
-            return Asignatura.objects.filter(
-                is_active=True,
+            disponibles = Q(
                 ayudantias__is_active=True,
                 ayudantias__is_cursada=False,
                 ayudantias__fecha__gte=date.today(),
                 ayudantias__cupos_disponibles__gt=0
-            ).distinct().prefetch_related('ayudantias').order_by('nombre')
+            )
+            return Asignatura.objects.filter(is_active=True).annotate(
+                n_ayudantias_disponibles=Count('ayudantias', filter=disponibles)
+            ).filter(n_ayudantias_disponibles__gt=0).order_by('nombre', 'id_asignatura')
         else:
             return Asignatura.objects.none()
     
@@ -151,114 +208,77 @@ class AsignaturaViewSet(viewsets.ReadOnlyModelViewSet):
         from django_tenants.utils import schema_context
         
         if not hasattr(request, 'tenant'):
-            sys.stdout.write("[API Mobile AsignaturaViewSet] ERROR: No hay tenant en request\n")
-            sys.stdout.flush()
+            logger.error("[API Mobile AsignaturaViewSet] ERROR: No hay tenant en request")
             return Response({
                 'success': False,
                 'error': 'No se pudo identificar el tenant'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        sys.stdout.write(f"[API Mobile AsignaturaViewSet] Tenant: {request.tenant.schema_name}\n")
-        sys.stdout.flush()
+        logger.debug("[API Mobile AsignaturaViewSet] Tenant: %s", request.tenant.schema_name)
         
         # Asegurar que el schema_context esté activo durante toda la operación
         # Esto es crítico: todas las operaciones de BD deben ejecutarse dentro del schema_context
         with schema_context(request.tenant.schema_name):
             try:
-                sys.stdout.write(f"[API Mobile AsignaturaViewSet] Construyendo queryset en schema: {request.tenant.schema_name}\n")
-                sys.stdout.flush()
+                respuesta = self.no_modificado(request)
+                if respuesta is not None:
+                    return respuesta
                 
-                # Construir el queryset dentro del schema_context
-                queryset = Asignatura.objects.filter(
-                    is_active=True,
-                    ayudantias__is_active=True,
-                    ayudantias__is_cursada=False,
-                    ayudantias__fecha__gte=date.today(),
-                    ayudantias__cupos_disponibles__gt=0
-                ).distinct().prefetch_related('ayudantias').order_by('nombre')
-                
-                sys.stdout.write(f"[API Mobile AsignaturaViewSet] Queryset construido, aplicando filtros\n")
-                sys.stdout.flush()
-                
-                # Aplicar filtros si existen
-                queryset = self.filter_queryset(queryset)
-                
-                sys.stdout.write(f"[API Mobile AsignaturaViewSet] Aplicando paginación\n")
-                sys.stdout.flush()
-                
-                # Evaluar el queryset dentro del schema_context antes de paginar
-                sys.stdout.write(f"[API Mobile AsignaturaViewSet] Evaluando queryset dentro del schema_context\n")
-                sys.stdout.flush()
-                
-                # Convertir a lista para forzar evaluación dentro del schema_context
-                queryset_list = list(queryset)
-                sys.stdout.write(f"[API Mobile AsignaturaViewSet] Queryset evaluado: {len(queryset_list)} elementos\n")
-                sys.stdout.flush()
-                
-                # Usar paginación de DRF pero con el queryset ya evaluado
-                # Crear un queryset falso para la paginación
-                from django.core.paginator import Paginator
-                from rest_framework.pagination import PageNumberPagination
-                
-                page_size = 10  # Tamaño de página por defecto
-                if hasattr(self, 'pagination_class') and self.pagination_class:
-                    page_size = getattr(self.pagination_class, 'page_size', 10)
-                
-                page_number = request.query_params.get('page', 1)
-                try:
-                    page_number = int(page_number)
-                except (ValueError, TypeError):
-                    page_number = 1
-                
-                # Paginar la lista
-                paginator = Paginator(queryset_list, page_size)
-                try:
-                    page_obj = paginator.page(page_number)
-                except:
-                    page_obj = paginator.page(1)
-                    page_number = 1
-                
-                sys.stdout.write(f"[API Mobile AsignaturaViewSet] Serializando página {page_number} ({len(page_obj.object_list)} elementos)\n")
-                sys.stdout.flush()
-                
-                # Serialización dentro del schema_context
-                serializer = self.get_serializer(page_obj.object_list, many=True)
-                
-                # Construir respuesta paginada
-                response_data = {
-                    'count': paginator.count,
-                    'next': page_obj.next_page_number() if page_obj.has_next() else None,
-                    'previous': page_obj.previous_page_number() if page_obj.has_previous() else None,
-                    'results': serializer.data
-                }
-                
-                # Construir URLs de next y previous
-                base_url = request.build_absolute_uri().split('?')[0]
-                if response_data['next']:
-                    response_data['next'] = f"{base_url}?page={response_data['next']}"
-                if response_data['previous']:
-                    response_data['previous'] = f"{base_url}?page={response_data['previous']}"
-                
-                sys.stdout.write(f"[API Mobile AsignaturaViewSet] Respuesta paginada construida\n")
-                sys.stdout.flush()
-                
-                return Response(response_data)
+                # El catálogo no depende del estudiante: cada página se cachea
+                # por tenant hasta que vence o un admin modifica asignaturas/ayudantías.
+                # Los cupos (total_ayudantias_disponibles, asignaturas sin cupos)
+                # cambian con las inscripciones, que no limpian catalogo_cache, y
+                # las ayudantías pasadas dejan de contar a medianoche: la versión
+                # de inscripciones y la fecha entran en la clave, igual que en el
+                # ETag. Se leen después del ETag, así que la página nunca es más
+                # vieja que el estado que anunció el ETag
+                data = catalogo_cache.get_or_set(
+                    _clave_catalogo(
+                        request, 'asignaturas',
+                        inscripciones_cache.version(request.tenant.schema_name), date.today(),
+                    ),
+                    lambda: self._pagina_asignaturas(request),
+                    schema_name=request.tenant.schema_name,
+                )
+                return Response(data)
+            except NotFound:
+                raise
             except Exception as e:
-                import traceback
-                sys.stdout.write(f"[API Mobile AsignaturaViewSet] ERROR en list: {e}\n")
-                sys.stdout.write(f"[API Mobile AsignaturaViewSet] Traceback: {traceback.format_exc()}\n")
-                sys.stdout.flush()
+                logger.exception("[API Mobile AsignaturaViewSet] ERROR en list: %s", e)
                 return Response({
                     'success': False,
                     'error': f'Error al obtener asignaturas: {str(e)}'
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    def get_queryset_sello(self):
+        # Sin la anotación: los cupos los cubre la versión de inscripciones_cache
+        # y las ayudantías pasadas la fecha del sello; ambas forman parte
+        # también de la clave de la página cacheada
+        return Asignatura.objects.filter(is_active=True)
+    
+    def _pagina_asignaturas(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        
+        # Versiones anteriores de la app piden ?page=N: se atienden con
+        # LIMIT/OFFSET en SQL; las nuevas siguen el cursor de "next"
+        if 'page' in request.query_params and 'cursor' not in request.query_params:
+            paginator = PageNumberPagination()
+        else:
+            paginator = self.paginator
+        
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        logger.debug("[API Mobile AsignaturaViewSet] Serializando %s asignaturas", len(page))
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data).data
 
 
-class AyudantiaViewSet(viewsets.ReadOnlyModelViewSet):
+class AyudantiaViewSet(ListadoCondicionalMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet para listar y ver detalles de ayudantías.
     """
     permission_classes = [EstudianteOnlyPermission]
+    usuario_desde_token = True
+    etag_por_usuario = True
     serializer_class = AyudantiaSerializer
     queryset = Ayudantia.objects.none()
     
@@ -293,6 +313,10 @@ class AyudantiaViewSet(viewsets.ReadOnlyModelViewSet):
         
         # Asegurar que el schema_context esté activo durante toda la operación
         with schema_context(request.tenant.schema_name):
+            respuesta = self.no_modificado(request)
+            if respuesta is not None:
+                return respuesta
+            
             # Llamar a get_queryset dentro del schema_context
             queryset = self.filter_queryset(self.get_queryset())
             
@@ -305,9 +329,12 @@ class AyudantiaViewSet(viewsets.ReadOnlyModelViewSet):
             return Response(serializer.data)
     
     def get_serializer_context(self):
-        """Agrega el request al contexto del serializer"""
+        """Agrega el request y las inscripciones activas del estudiante al contexto del serializer"""
         context = super().get_serializer_context()
         context['request'] = self.request
+        if self.action in ('list', 'retrieve'):
+            # Una sola query para esta_inscrito/puede_inscribirse de todas las filas
+            context['inscripciones_activas_ids'] = inscripciones_activas_ids(self.request.user)
         return context
     
     def get_object(self):
@@ -329,90 +356,40 @@ class AyudantiaViewSet(viewsets.ReadOnlyModelViewSet):
         """
         from django_tenants.utils import schema_context
         
-        sys.stdout.write(f"[API Mobile AyudantiaViewSet] inscribirse llamado para pk={pk}\n")
-        sys.stdout.flush()
+        logger.debug("[API Mobile AyudantiaViewSet] inscribirse llamado para pk=%s", pk)
         
         if not hasattr(request, 'tenant'):
-            sys.stdout.write("[API Mobile AyudantiaViewSet] ERROR: No hay tenant en request\n")
-            sys.stdout.flush()
+            logger.error("[API Mobile AyudantiaViewSet] ERROR: No hay tenant en request")
             return Response({
                 'success': False,
                 'message': 'No se pudo identificar el tenant.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        sys.stdout.write(f"[API Mobile AyudantiaViewSet] Tenant: {request.tenant.schema_name}\n")
-        sys.stdout.flush()
-        sys.stdout.write(f"[API Mobile AyudantiaViewSet] Usuario: {request.user.email if request.user.is_authenticated else 'NO AUTENTICADO'}\n")
-        sys.stdout.flush()
+        logger.debug("[API Mobile AyudantiaViewSet] Tenant: %s", request.tenant.schema_name)
+        logger.debug("[API Mobile AyudantiaViewSet] Usuario: %s", request.user.email if request.user.is_authenticated else 'NO AUTENTICADO')
         
         with schema_context(request.tenant.schema_name):
             try:
                 # get_object() ya usa schema_context internamente, pero lo llamamos dentro del contexto
                 # para asegurar que todas las operaciones estén en el schema correcto
                 ayudantia = self.get_object()
-                sys.stdout.write(f"[API Mobile AyudantiaViewSet] Ayudantía obtenida: {ayudantia.id_ayudantia} - {ayudantia.titulo}\n")
-                sys.stdout.flush()
+                logger.debug("[API Mobile AyudantiaViewSet] Ayudantía obtenida: %s - %s", ayudantia.id_ayudantia, ayudantia.titulo)
                 
                 estudiante = request.user
                 
-                # Validaciones
-                if ayudantia.is_cursada:
-                    sys.stdout.write("[API Mobile AyudantiaViewSet] Ayudantía ya fue cursada\n")
-                    sys.stdout.flush()
-                    return Response({
-                        'success': False,
-                        'message': 'Esta ayudantía ya fue cursada.'
-                    }, status=status.HTTP_400_BAD_REQUEST)
-                
-                if ayudantia.fecha < date.today():
-                    sys.stdout.write("[API Mobile AyudantiaViewSet] Ayudantía ya pasó\n")
-                    sys.stdout.flush()
-                    return Response({
-                        'success': False,
-                        'message': 'Esta ayudantía ya pasó.'
-                    }, status=status.HTTP_400_BAD_REQUEST)
-                
-                if ayudantia.cupos_disponibles <= 0:
-                    sys.stdout.write("[API Mobile AyudantiaViewSet] No hay cupos disponibles\n")
-                    sys.stdout.flush()
-                    return Response({
-                        'success': False,
-                        'message': 'No hay cupos disponibles para esta ayudantía.'
-                    }, status=status.HTTP_400_BAD_REQUEST)
-                
-                # Verificar si ya está inscrito
-                if Inscripcion.objects.filter(
-                    estudiante=estudiante,
-                    ayudantia=ayudantia,
-                    estado='activa'
-                ).exists():
-                    sys.stdout.write("[API Mobile AyudantiaViewSet] Ya está inscrito\n")
-                    sys.stdout.flush()
+                # El servicio valida y reserva el cupo con un UPDATE condicional
+                try:
+                    inscripcion = inscribir(estudiante, ayudantia)
+                except InscripcionError as e:
+                    logger.debug("[API Mobile AyudantiaViewSet] Inscripción rechazada: %s", e.codigo)
                     return Response({
                         'success': False,
-                        'message': 'Ya estás inscrito en esta ayudantía.'
+                        'message': e.mensaje
                     }, status=status.HTTP_400_BAD_REQUEST)
-                
-                # Crear la inscripción
-                sys.stdout.write("[API Mobile AyudantiaViewSet] Creando inscripción\n")
-                sys.stdout.flush()
-                inscripcion = Inscripcion.objects.create(
-                    estudiante=estudiante,
-                    ayudantia=ayudantia,
-                    estado='activa'
-                )
-                sys.stdout.write(f"[API Mobile AyudantiaViewSet] Inscripción creada: {inscripcion.id_inscripcion}\n")
-                sys.stdout.flush()
-                
-                # Actualizar cupos disponibles
-                ayudantia.cupos_disponibles -= 1
-                ayudantia.save(update_fields=['cupos_disponibles'])
-                sys.stdout.write(f"[API Mobile AyudantiaViewSet] Cupos actualizados: {ayudantia.cupos_disponibles}\n")
-                sys.stdout.flush()
+                logger.debug("[API Mobile AyudantiaViewSet] Inscripción creada: %s, cupos: %s", inscripcion.id_inscripcion, ayudantia.cupos_disponibles)
                 
                 serializer = InscripcionSerializer(inscripcion, context={'request': request})
-                sys.stdout.write("[API Mobile AyudantiaViewSet] Inscripción exitosa\n")
-                sys.stdout.flush()
+                logger.debug("[API Mobile AyudantiaViewSet] Inscripción exitosa")
                 
                 return Response({
                     'success': True,
@@ -420,21 +397,21 @@ class AyudantiaViewSet(viewsets.ReadOnlyModelViewSet):
                     'data': serializer.data
                 }, status=status.HTTP_201_CREATED)
             except Exception as e:
-                import traceback
-                sys.stdout.write(f"[API Mobile AyudantiaViewSet] ERROR en inscribirse: {e}\n")
-                sys.stdout.write(f"[API Mobile AyudantiaViewSet] Traceback: {traceback.format_exc()}\n")
-                sys.stdout.flush()
+                logger.exception("[API Mobile AyudantiaViewSet] ERROR en inscribirse: %s", e)
                 return Response({
                     'success': False,
                     'message': f'Error al inscribirse: {str(e)}'
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class InscripcionViewSet(viewsets.ModelViewSet):
+class InscripcionViewSet(ListadoCondicionalMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar las inscripciones del estudiante.
     """
     permission_classes = [EstudianteOnlyPermission]
+    usuario_desde_token = True
+    etag_por_usuario = True
+    campo_fecha_etag = 'fecha_inscripcion'
     serializer_class = InscripcionSerializer
     
     def get_queryset(self):
@@ -442,10 +419,10 @@ class InscripcionViewSet(viewsets.ModelViewSet):
         # El schema_context se maneja en list(), aquí solo construimos el queryset
         if hasattr(self.request, 'tenant'):
             return Inscripcion.objects.filter(
-                estudiante=self.request.user,
+                estudiante_id=self.request.user.pk,
                 estado='activa',
                 ayudantia__is_cursada=False
-            ).select_related('ayudantia', 'ayudantia__asignatura', 'ayudantia__tutor').order_by('-fecha_inscripcion')
+            ).select_related('estudiante', 'ayudantia', 'ayudantia__asignatura', 'ayudantia__tutor').order_by('-fecha_inscripcion')
         else:
             return Inscripcion.objects.none()
     
@@ -461,6 +438,10 @@ class InscripcionViewSet(viewsets.ModelViewSet):
         
         # Asegurar que el schema_context esté activo durante toda la operación
         with schema_context(request.tenant.schema_name):
+            respuesta = self.no_modificado(request)
+            if respuesta is not None:
+                return respuesta
+            
             # Llamar a get_queryset dentro del schema_context
             queryset = self.filter_queryset(self.get_queryset())
             
@@ -473,9 +454,12 @@ class InscripcionViewSet(viewsets.ModelViewSet):
             return Response(serializer.data)
     
     def get_serializer_context(self):
-        """Agrega el request al contexto del serializer"""
+        """Agrega el request y las inscripciones activas del estudiante al contexto del serializer"""
         context = super().get_serializer_context()
         context['request'] = self.request
+        if self.action in ('list', 'retrieve'):
+            # Una sola query para esta_inscrito/puede_inscribirse de todas las filas
+            context['inscripciones_activas_ids'] = inscripciones_activas_ids(self.request.user)
         return context
     
     def create(self, request, *args, **kwargs):
@@ -498,34 +482,14 @@ class InscripcionViewSet(viewsets.ModelViewSet):
         with schema_context(request.tenant.schema_name):
             ayudantia = get_object_or_404(Ayudantia, id_ayudantia=ayudantia_id, is_active=True, is_cursada=False)
             
-            # Validaciones (similares a inscribirse)
-            if ayudantia.fecha < date.today():
-                return Response({
-                    'success': False,
-                    'message': 'Esta ayudantía ya pasó.'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            if ayudantia.cupos_disponibles <= 0:
-                return Response({
-                    'success': False,
-                    'message': 'No hay cupos disponibles.'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            if Inscripcion.objects.filter(estudiante=request.user, ayudantia=ayudantia, estado='activa').exists():
+            try:
+                inscripcion = inscribir(request.user, ayudantia)
+            except InscripcionError as e:
                 return Response({
                     'success': False,
-                    'message': 'Ya estás inscrito en esta ayudantía.'
+                    'message': e.mensaje
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            inscripcion = Inscripcion.objects.create(
-                estudiante=request.user,
-                ayudantia=ayudantia,
-                estado='activa'
-            )
-            
-            ayudantia.cupos_disponibles -= 1
-            ayudantia.save(update_fields=['cupos_disponibles'])
-            
             serializer = self.get_serializer(inscripcion)
             return Response({
                 'success': True,
@@ -555,13 +519,8 @@ class InscripcionViewSet(viewsets.ModelViewSet):
                     'message': 'Solo se pueden cancelar inscripciones activas.'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Devolver cupo a la ayudantía
-            ayudantia = inscripcion.ayudantia
-            ayudantia.cupos_disponibles += 1
-            ayudantia.save(update_fields=['cupos_disponibles'])
-            
-            # Eliminar la inscripción
-            inscripcion.delete()
+            # Eliminar la inscripción y devolver el cupo en una sola transacción
+            cancelar_inscripcion(inscripcion)
             
             return Response({
                 'success': True,
@@ -569,11 +528,12 @@ class InscripcionViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_200_OK)
 
 
-class SedeViewSet(viewsets.ReadOnlyModelViewSet):
+class SedeViewSet(ListadoCondicionalMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet para listar sedes.
     """
     permission_classes = [EstudianteOnlyPermission]
+    usuario_desde_token = True
     serializer_class = SedeSerializer
     queryset = Sede.objects.none()
     
@@ -597,13 +557,176 @@ class SedeViewSet(viewsets.ReadOnlyModelViewSet):
         
         # Asegurar que el schema_context esté activo durante toda la operación
         with schema_context(request.tenant.schema_name):
-            # Llamar a get_queryset dentro del schema_context
-            queryset = self.filter_queryset(self.get_queryset())
-            
-            page = self.paginate_queryset(queryset)
-            if page is not None:
-                serializer = self.get_serializer(page, many=True)
-                return self.get_paginated_response(serializer.data)
+            respuesta = self.no_modificado(request)
+            if respuesta is not None:
+                return respuesta
             
-            serializer = self.get_serializer(queryset, many=True)
-            return Response(serializer.data)
+            data = catalogo_cache.get_or_set(
+                _clave_catalogo(request, 'sedes'),
+                self._pagina_sedes,
+                schema_name=request.tenant.schema_name,
+            )
+            return Response(data)
+    
+    def _pagina_sedes(self):
+        # Llamar a get_queryset dentro del schema_context
+        queryset = self.filter_queryset(self.get_queryset())
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data).data
+        
+        serializer = self.get_serializer(queryset, many=True)
+        return serializer.data
+    
+    @action(detail=False, methods=['get'])
+    def cercanas(self, request):
+        """
+        Las k sedes activas más cercanas a un punto, con su distancia:
+        GET /api/mobile/sedes/cercanas/?lat=<latitud>&lng=<longitud>&k=<k>
+        
+        Usa el índice en memoria del tenant (api_mobile/sedes_cercanas.py),
+        sin consultar la base de datos mientras las sedes no cambien.
+        """
+        from django_tenants.utils import schema_context
+        
+        if not hasattr(request, 'tenant'):
+            return Response({
+                'success': False,
+                'error': 'No se pudo identificar el tenant'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            latitud = float(request.query_params['lat'])
+            longitud = float(request.query_params['lng'])
+            k = int(request.query_params.get('k', 5))
+        except (KeyError, ValueError):
+            return Response({
+                'success': False,
+                'error': 'Los parámetros lat y lng son obligatorios y numéricos; k debe ser un entero.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not (-90 <= latitud <= 90 and -180 <= longitud <= 180):
+            return Response({
+                'success': False,
+                'error': 'Coordenadas fuera de rango.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        k = max(1, min(k, SEDES_CERCANAS_MAX))
+        
+        with schema_context(request.tenant.schema_name):
+            sedes = indice_sedes(request.tenant.schema_name).cercanas(latitud, longitud, k)
+        
+        return Response({
+            'success': True,
+            'count': len(sedes),
+            'results': sedes,
+        })
+
+
+class SyncView(APIView):
+    """
+    Sincronización incremental: GET /api/mobile/sync/?since=<cursor>
+    
+    Retorna solo lo creado, modificado o eliminado desde el cursor (ver
+    api_mobile/sync.py). Sin cursor, o con uno vencido, retorna todo y reset=true.
+    """
+    permission_classes = [EstudianteOnlyPermission]
+    usuario_desde_token = True
+    
+    def get(self, request):
+        from django_tenants.utils import schema_context
+        
+        if not hasattr(request, 'tenant'):
+            return Response({
+                'success': False,
+                'error': 'No se pudo identificar el tenant'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # El cursor siguiente se toma antes de consultar: lo que cambie
+        # durante la consulta llega en la próxima llamada
+        ahora = timezone.now()
+        desde = cursor_a_fecha(request.query_params.get('since'))
+        if desde is not None and desde < ahora - timedelta(days=SYNC_RETENCION_DIAS):
+            # Las lápidas anteriores ya se purgaron: hay que mandar todo
+            desde = None
+        
+        with schema_context(request.tenant.schema_name):
+            data = datos_sync(request.user.pk, desde)
+        
+        return Response({
+            'cursor': fecha_a_cursor(ahora),
+            'reset': desde is None,
+            **data,
+        })
+
+
+class AsistenciaView(APIView):
+    """
+    Lista de asistencia de una ayudantía del tutor autenticado:
+    GET  /api/mobile/tutor/ayudantias/<id>/asistencia/ -> inscripciones activas
+    POST /api/mobile/tutor/ayudantias/<id>/asistencia/ {"asistieron": [id_inscripcion, ...]}
+    
+    El POST recibe la clase completa: las inscripciones activas que no vienen
+    en "asistieron" quedan como ausentes. Se guarda con dos UPDATE en una
+    transacción (loginApp/inscripciones.py), no uno por estudiante.
+    """
+    permission_classes = [TutorOnlyPermission]
+    
+    def _ayudantia(self, request, ayudantia_id):
+        try:
+            return Ayudantia.objects.get(
+                id_ayudantia=ayudantia_id,
+                tutor=request.user,
+                is_active=True,
+                is_cursada=False  # Solo ayudantías no cursadas
+            )
+        except Ayudantia.DoesNotExist:
+            raise NotFound('Esta ayudantía ya no está disponible o fue cursada.')
+    
+    def get(self, request, ayudantia_id):
+        from django_tenants.utils import schema_context
+        
+        if not hasattr(request, 'tenant'):
+            return Response({
+                'success': False,
+                'error': 'No se pudo identificar el tenant'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        with schema_context(request.tenant.schema_name):
+            ayudantia = self._ayudantia(request, ayudantia_id)
+            inscripciones = Inscripcion.objects.filter(
+                ayudantia=ayudantia, estado='activa'
+            ).select_related('estudiante').order_by('estudiante__nombre_usuario')
+            return Response({
+                'success': True,
+                'data': AsistenciaInscripcionSerializer(inscripciones, many=True).data,
+            })
+    
+    def post(self, request, ayudantia_id):
+        from django_tenants.utils import schema_context
+        
+        if not hasattr(request, 'tenant'):
+            return Response({
+                'success': False,
+                'error': 'No se pudo identificar el tenant'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = AsistenciaSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'errors': serializer.errors,
+                'message': 'Se esperaba {"asistieron": [id_inscripcion, ...]}.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        with schema_context(request.tenant.schema_name):
+            ayudantia = self._ayudantia(request, ayudantia_id)
+            presentes, ausentes = registrar_asistencia(ayudantia, serializer.validated_data['asistieron'])
+        
+        return Response({
+            'success': True,
+            'message': 'Asistencia registrada exitosamente.',
+            'asistieron': presentes,
+            'no_asistieron': ausentes,
+        }, status=status.HTTP_200_OK)
@@ -1,11 +1,19 @@
-import apiClient from './client';
+import apiClient, { asignaturasLocales, getLocalStore, syncLocalStore } from './client';
 
-export const getAsignaturas = async (page = 1) => {
+// Extrae el parámetro cursor de la URL "next" que entrega la API
+const getCursor = (url) => {
+  if (!url) return null;
+  const match = url.match(/[?&]cursor=([^&]+)/);
+  return match ? decodeURIComponent(match[1]) : null;
+};
+
+// Paginación por cursor: sin cursor trae la primera página
+export const getAsignaturas = async (cursor = null) => {
   try {
     const response = await apiClient.get('/asignaturas/', {
-      params: { page },
+      params: cursor ? { cursor } : {},
     });
-    return { success: true, data: response.data };
+    return { success: true, data: response.data, nextCursor: getCursor(response.data.next) };
   } catch (error) {
     return { 
       success: false, 
@@ -26,3 +34,22 @@ export const getAsignatura = async (id) => {
   }
 };
 
+
+// Asignaturas con ayudantías disponibles, armadas desde la copia local: cada
+// llamada descarga solo lo cambiado desde la última sincronización (/sync/)
+export const getAsignaturasLocales = async () => {
+  try {
+    const store = await syncLocalStore();
+    return { success: true, data: asignaturasLocales(store) };
+  } catch (error) {
+    // Sin conexión se muestra la última copia sincronizada, si existe
+    const store = await getLocalStore();
+    if (store.cursor) {
+      return { success: true, data: asignaturasLocales(store) };
+    }
+    return { 
+      success: false, 
+      error: error.response?.data?.message || 'Error al cargar asignaturas' 
+    };
+  }
+};
@@ -1,4 +1,4 @@
-import apiClient from './client';
+import apiClient, { clearEtagCache, clearLocalStore } from './client';
 import AsyncStorage from '@react-native-async-storage/async-storage';
 
 export const login = async (email, password) => {
@@ -82,6 +82,8 @@ export const login = async (email, password) => {
 export const logout = async () => {
   try {
     await AsyncStorage.multiRemove(['access_token', 'refresh_token', 'user']);
+    clearEtagCache();
+    await clearLocalStore();
     return { success: true };
   } catch (error) {
     return { success: false, error: error.message };
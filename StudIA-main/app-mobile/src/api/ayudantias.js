@@ -1,4 +1,4 @@
-import apiClient from './client';
+import apiClient, { ayudantiasLocales, getLocalStore, syncLocalStore } from './client';
 
 export const getAyudantias = async (asignaturaId = null, page = 1) => {
   try {
@@ -17,6 +17,25 @@ export const getAyudantias = async (asignaturaId = null, page = 1) => {
   }
 };
 
+// Ayudantías disponibles (opcionalmente de una asignatura), armadas desde la
+// copia local sincronizada con /sync/
+export const getAyudantiasLocales = async (asignaturaId = null) => {
+  try {
+    const store = await syncLocalStore();
+    return { success: true, data: ayudantiasLocales(store, asignaturaId) };
+  } catch (error) {
+    // Sin conexión se muestra la última copia sincronizada, si existe
+    const store = await getLocalStore();
+    if (store.cursor) {
+      return { success: true, data: ayudantiasLocales(store, asignaturaId) };
+    }
+    return { 
+      success: false, 
+      error: error.response?.data?.message || 'Error al cargar ayudantías' 
+    };
+  }
+};
+
 export const getAyudantia = async (id) => {
   try {
     const response = await apiClient.get(`/ayudantias/${id}/`);
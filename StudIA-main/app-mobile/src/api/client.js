@@ -10,8 +10,22 @@ const apiClient = axios.create({
     'Accept': 'application/json',
   },
   timeout: 15000,
+  // 304 Not Modified se resuelve con la copia guardada (ver etagCache)
+  validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
 });
 
+// Respuestas GET con ETag: la próxima vez se envía If-None-Match y, si el
+// servidor responde 304, se reutilizan los datos guardados sin descargarlos
+const etagCache = new Map();
+
+const etagKey = (config) => {
+  const params = config.params ? JSON.stringify(config.params) : '';
+  const tenant = config.headers?.['X-Tenant-Schema'] || '';
+  return `${tenant}|${config.url}|${params}`;
+};
+
+export const clearEtagCache = () => etagCache.clear();
+
 // Interceptor para agregar token y tenant a todas las peticiones
 apiClient.interceptors.request.use(
   async (config) => {
@@ -30,6 +44,13 @@ apiClient.interceptors.request.use(
         console.log('[APP] WARNING: No se pudo obtener tenant');
       }
       
+      if ((config.method || 'get').toLowerCase() === 'get') {
+        const cached = etagCache.get(etagKey(config));
+        if (cached) {
+          config.headers['If-None-Match'] = cached.etag;
+        }
+      }
+      
       console.log('[APP] Petición configurada:', config.method?.toUpperCase(), config.url);
       console.log('[APP] Headers:', JSON.stringify(config.headers, null, 2));
     } catch (error) {
@@ -45,7 +66,24 @@ apiClient.interceptors.request.use(
 
 // Interceptor para manejar refresh token automáticamente
 apiClient.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    if ((response.config.method || 'get').toLowerCase() !== 'get') {
+      return response;
+    }
+    const key = etagKey(response.config);
+    if (response.status === 304) {
+      const cached = etagCache.get(key);
+      if (cached) {
+        return { ...response, status: 200, data: cached.data };
+      }
+      return response;
+    }
+    const etag = response.headers?.etag;
+    if (etag) {
+      etagCache.set(key, { etag, data: response.data });
+    }
+    return response;
+  },
   async (error) => {
     const originalRequest = error.config;
     
@@ -72,6 +110,8 @@ apiClient.interceptors.response.use(
       } catch (refreshError) {
         // Si el refresh falla, limpiar tokens y redirigir a login
         await AsyncStorage.multiRemove(['access_token', 'refresh_token', 'user']);
+        etagCache.clear();
+        await clearLocalStore();
         // Emitir evento para que el contexto de auth maneje el logout
         return Promise.reject(refreshError);
       }
@@ -81,5 +121,132 @@ apiClient.interceptors.response.use(
   }
 );
 
+// ========== Sincronización incremental (/sync/) ==========
+// Copia local de asignaturas, ayudantías, inscripciones y sedes por tenant.
+// Cada sincronización pide solo lo cambiado desde el último cursor y lo aplica
+// por id; los registros eliminados llegan en "eliminados".
+
+const SYNC_COLECCIONES = {
+  asignaturas: 'id_asignatura',
+  ayudantias: 'id_ayudantia',
+  inscripciones: 'id_inscripcion',
+  sedes: 'id_sede',
+};
+
+const syncStorageKey = (tenant) => `sync_store:${tenant || ''}`;
+
+const storeVacio = () => ({
+  cursor: null,
+  asignaturas: {},
+  ayudantias: {},
+  inscripciones: {},
+  sedes: {},
+});
+
+// Evita dos sincronizaciones simultáneas sobre el mismo store
+let syncEnCurso = null;
+
+export const getLocalStore = async () => {
+  const tenant = await getTenant();
+  const json = await AsyncStorage.getItem(syncStorageKey(tenant));
+  return json ? JSON.parse(json) : storeVacio();
+};
+
+export const clearLocalStore = async () => {
+  const keys = await AsyncStorage.getAllKeys();
+  await AsyncStorage.multiRemove(keys.filter((key) => key.startsWith('sync_store:')));
+};
+
+const aplicarDeltas = (store, data) => {
+  const nuevo = data.reset ? storeVacio() : store;
+  Object.entries(SYNC_COLECCIONES).forEach(([coleccion, campoId]) => {
+    (data[coleccion] || []).forEach((fila) => {
+      nuevo[coleccion][fila[campoId]] = fila;
+    });
+    (data.eliminados?.[coleccion] || []).forEach((id) => {
+      delete nuevo[coleccion][id];
+    });
+  });
+  nuevo.cursor = data.cursor;
+  return nuevo;
+};
+
+const sincronizar = async () => {
+  const tenant = await getTenant();
+  const store = await getLocalStore();
+  const response = await apiClient.get('/sync/', {
+    params: store.cursor ? { since: store.cursor } : {},
+  });
+  const nuevo = aplicarDeltas(store, response.data);
+  await AsyncStorage.setItem(syncStorageKey(tenant), JSON.stringify(nuevo));
+  return nuevo;
+};
+
+export const syncLocalStore = async () => {
+  if (!syncEnCurso) {
+    syncEnCurso = sincronizar().finally(() => {
+      syncEnCurso = null;
+    });
+  }
+  return syncEnCurso;
+};
+
+// Vistas derivadas del store, con los mismos campos calculados que los listados
+
+// Fecha local (YYYY-MM-DD): toISOString() da la fecha UTC, que en Chile ya es
+// mañana desde las 20:00/21:00
+const hoy = () => {
+  const ahora = new Date();
+  const mes = String(ahora.getMonth() + 1).padStart(2, '0');
+  const dia = String(ahora.getDate()).padStart(2, '0');
+  return `${ahora.getFullYear()}-${mes}-${dia}`;
+};
+
+const ayudantiaDisponible = (ayudantia) => (
+  ayudantia.is_active && !ayudantia.is_cursada && ayudantia.fecha >= hoy()
+);
+
+export const asignaturasLocales = (store) => {
+  const disponibles = {};
+  Object.values(store.ayudantias).forEach((ayudantia) => {
+    if (ayudantiaDisponible(ayudantia) && ayudantia.cupos_disponibles > 0) {
+      disponibles[ayudantia.asignatura_id] = (disponibles[ayudantia.asignatura_id] || 0) + 1;
+    }
+  });
+  // Como el listado del servidor: solo asignaturas con alguna ayudantía disponible
+  return Object.values(store.asignaturas)
+    .filter((asignatura) => asignatura.is_active && disponibles[asignatura.id_asignatura] > 0)
+    .map((asignatura) => ({
+      ...asignatura,
+      total_ayudantias_disponibles: disponibles[asignatura.id_asignatura],
+    }))
+    .sort((a, b) => a.nombre.localeCompare(b.nombre));
+};
+
+export const ayudantiasLocales = (store, asignaturaId = null) => {
+  const inscritas = new Set(
+    Object.values(store.inscripciones)
+      .filter((inscripcion) => inscripcion.estado === 'activa')
+      .map((inscripcion) => inscripcion.ayudantia_id)
+  );
+  return Object.values(store.ayudantias)
+    .filter(ayudantiaDisponible)
+    .filter((ayudantia) => asignaturaId == null || ayudantia.asignatura_id === asignaturaId)
+    .map((ayudantia) => {
+      const asignatura = store.asignaturas[ayudantia.asignatura_id];
+      const estaInscrito = inscritas.has(ayudantia.id_ayudantia);
+      return {
+        ...ayudantia,
+        asignatura_nombre: asignatura?.nombre || '',
+        asignatura_codigo: asignatura?.codigo || '',
+        fecha_str: ayudantia.fecha,
+        horario_str: ayudantia.horario?.slice(0, 5),
+        esta_inscrito: estaInscrito,
+        puede_inscribirse: !estaInscrito && ayudantia.cupos_disponibles > 0,
+      };
+    })
+    .sort((a, b) => `${a.fecha} ${a.horario}`.localeCompare(`${b.fecha} ${b.horario}`));
+};
+
 export default apiClient;
 
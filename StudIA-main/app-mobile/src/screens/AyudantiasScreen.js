@@ -10,7 +10,7 @@ import {
   Alert,
 } from 'react-native';
 import { useRoute, useNavigation, useFocusEffect } from '@react-navigation/native';
-import { getAyudantias } from '../api/ayudantias';
+import { getAyudantiasLocales } from '../api/ayudantias';
 import { COLORS, SPACING, FONT_SIZES } from '../utils/constants';
 import Icon from 'react-native-vector-icons/MaterialIcons';
 
@@ -39,11 +39,12 @@ const AyudantiasScreen = () => {
     }, [initialLoad, loading])
   );
 
+  // La lista sale de la copia local: la sincronización trae solo lo cambiado
   const loadAyudantias = async () => {
     try {
-      const result = await getAyudantias(asignaturaId);
+      const result = await getAyudantiasLocales(asignaturaId);
       if (result.success) {
-        setAyudantias(result.data.results || []);
+        setAyudantias(result.data);
       } else {
         Alert.alert('Error', result.error || 'Error al cargar ayudantías');
       }
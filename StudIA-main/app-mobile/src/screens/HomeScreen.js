@@ -10,7 +10,7 @@ import {
   Alert,
 } from 'react-native';
 import { useNavigation } from '@react-navigation/native';
-import { getAsignaturas } from '../api/asignaturas';
+import { getAsignaturasLocales } from '../api/asignaturas';
 import { COLORS, SPACING, FONT_SIZES } from '../utils/constants';
 import Icon from 'react-native-vector-icons/MaterialIcons';
 
@@ -19,19 +19,17 @@ const HomeScreen = () => {
   const [asignaturas, setAsignaturas] = useState([]);
   const [loading, setLoading] = useState(true);
   const [refreshing, setRefreshing] = useState(false);
-  const [nextPage, setNextPage] = useState(null);
 
   useEffect(() => {
     loadAsignaturas();
   }, []);
 
-  const loadAsignaturas = async (page = 1, append = false) => {
+  // La lista sale de la copia local: la sincronización trae solo lo cambiado
+  const loadAsignaturas = async () => {
     try {
-      const result = await getAsignaturas(page);
+      const result = await getAsignaturasLocales();
       if (result.success) {
-        const newAsignaturas = result.data.results || [];
-        setAsignaturas(append ? [...asignaturas, ...newAsignaturas] : newAsignaturas);
-        setNextPage(result.data.next ? page + 1 : null);
+        setAsignaturas(result.data);
       } else {
         Alert.alert('Error', result.error || 'Error al cargar asignaturas');
       }
@@ -45,13 +43,7 @@ const HomeScreen = () => {
 
   const onRefresh = () => {
     setRefreshing(true);
-    loadAsignaturas(1, false);
-  };
-
-  const loadMore = () => {
-    if (nextPage && !loading) {
-      loadAsignaturas(nextPage, true);
-    }
+    loadAsignaturas();
   };
 
   const renderAsignatura = ({ item }) => (
@@ -105,8 +97,6 @@ const HomeScreen = () => {
         refreshControl={
           <RefreshControl refreshing={refreshing} onRefresh={onRefresh} />
         }
-        onEndReached={loadMore}
-        onEndReachedThreshold={0.5}
         ListEmptyComponent={
           <View style={styles.emptyContainer}>
             <Icon name="menu-book" size={64} color={COLORS.secondary} />
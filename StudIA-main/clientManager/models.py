@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.postgres.fields import ArrayField
 from django_tenants.models import TenantMixin, DomainMixin
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+from clientManager.tenant_cache import TenantCache
 
 class Empresa(TenantMixin):
     id_empresa = models.AutoField(primary_key=True)
@@ -18,6 +19,12 @@ class Empresa(TenantMixin):
         verbose_name = "Empresa"
         verbose_name_plural = "Empresas"
 
+    def delete(self, force_drop=False, *args, **kwargs):
+        schema_name = self.schema_name
+        super().delete(force_drop, *args, **kwargs)
+        # Todo lo cacheado para el tenant queda inalcanzable
+        TenantCache.invalidate_tenant(schema_name)
+
 class Dominio(DomainMixin):
     pass
 
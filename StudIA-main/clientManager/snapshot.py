@@ -0,0 +1,203 @@
+"""
+Snapshot de los datos de un tenant con COPY de PostgreSQL.
+
+Formato (gzip, por defecto .sql.gz): una cabecera y, por cada tabla del
+schema, una sección en el formato de texto de COPY:
+
+    -- studia-snapshot {"version": 1, "schema": "duoc", "migraciones": [...]}
+    COPY "loginApp_usuario" ("id_usuario", "email", ...) FROM stdin;
+    <filas en formato texto de COPY>
+    \\.
+    ...
+
+Igual que pg_dump: en el formato de texto una barra invertida de los datos
+se escapa como \\\\, así que la línea \\. solo puede ser el fin de la tabla.
+
+exportar() escribe cada tabla con COPY ... TO STDOUT directo al archivo
+comprimido y restaurar() lee cada sección con COPY ... FROM STDIN sin cargar
+el archivo en memoria. La restauración corre en una sola transacción con
+SET CONSTRAINTS ALL DEFERRED (las FK que crea Django son DEFERRABLE), así que
+el orden de las tablas no importa; al final se ajustan las secuencias de las
+columnas serial/identity al máximo id restaurado.
+"""
+import gzip
+import json
+import re
+
+from django.db import connection, transaction
+
+VERSION = 1
+CABECERA = b'-- studia-snapshot '
+FIN_TABLA = b'\\.\n'
+
+# Tablas que el schema destino ya tiene al migrarlo
+TABLAS_EXCLUIDAS = {'django_migrations'}
+
+_COPY = re.compile(rb'^COPY "([^"]+)" \((.*)\) FROM stdin;\n$')
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _q(nombre):
+    return connection.ops.quote_name(nombre)
+
+
+def _tablas(cursor, schema_name):
+    """[(tabla, [columnas])] del schema, sin columnas generadas."""
+    cursor.execute(
+        """
+        SELECT c.table_name, c.column_name
+        FROM information_schema.columns c
+        JOIN information_schema.tables t
+          ON t.table_schema = c.table_schema AND t.table_name = c.table_name
+        WHERE c.table_schema = %s AND t.table_type = 'BASE TABLE' AND c.is_generated = 'NEVER'
+        ORDER BY c.table_name, c.ordinal_position
+        """,
+        [schema_name],
+    )
+    tablas = {}
+    for tabla, columna in cursor.fetchall():
+        if tabla not in TABLAS_EXCLUIDAS:
+            tablas.setdefault(tabla, []).append(columna)
+    return list(tablas.items())
+
+
+def _migraciones(cursor, schema_name):
+    cursor.execute(f'SELECT app, name FROM {_q(schema_name)}.django_migrations ORDER BY app, name')
+    return [list(fila) for fila in cursor.fetchall()]
+
+
+def exportar(schema_name, destino):
+    """
+    Escribe el snapshot del schema en `destino` (ruta o archivo binario, por
+    ejemplo sys.stdout.buffer). Retorna {tabla: filas}.
+    """
+    filas = {}
+    # El cursor se abre antes de la transacción para que SET TRANSACTION sea su
+    # primera sentencia (al abrirlo el backend puede fijar el search_path)
+    with connection.cursor() as cursor, transaction.atomic():
+        # Una sola foto consistente de todas las tablas
+        cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY')
+        tablas = _tablas(cursor, schema_name)
+        cabecera = {'version': VERSION, 'schema': schema_name, 'migraciones': _migraciones(cursor, schema_name)}
+
+        with gzip.open(destino, 'wb', compresslevel=6) as salida:
+            salida.write(CABECERA + json.dumps(cabecera).encode() + b'\n')
+            for tabla, columnas in tablas:
+                lista = ', '.join(_q(columna) for columna in columnas)
+                salida.write(f'COPY {_q(tabla)} ({lista}) FROM stdin;\n'.encode())
+                cursor.copy_expert(f'COPY {_q(schema_name)}.{_q(tabla)} ({lista}) TO STDOUT', salida)
+                salida.write(FIN_TABLA)
+                filas[tabla] = cursor.rowcount
+    return filas
+
+
+class _SeccionTabla:
+    """Archivo de solo lectura con las filas de una tabla, hasta la línea \\."""
+
+    def __init__(self, entrada):
+        self.entrada = entrada
+        self.terminada = False
+
+    def read(self, size=-1):
+        if self.terminada:
+            return b''
+        partes, leidos = [], 0
+        while size < 0 or leidos < size:
+            linea = self.entrada.readline()
+            if not linea:
+                raise SnapshotError('El snapshot terminó en medio de una tabla')
+            if linea == FIN_TABLA:
+                self.terminada = True
+                break
+            partes.append(linea)
+            leidos += len(linea)
+        return b''.join(partes)
+
+    def descartar(self):
+        while not self.terminada:
+            self.read(65536)
+
+
+def leer_cabecera(origen):
+    with gzip.open(origen, 'rb') as entrada:
+        return _cabecera(entrada)
+
+
+def _cabecera(entrada):
+    linea = entrada.readline()
+    if not linea.startswith(CABECERA):
+        raise SnapshotError('El archivo no es un snapshot de tenant')
+    cabecera = json.loads(linea[len(CABECERA):])
+    if cabecera.get('version') != VERSION:
+        raise SnapshotError(f'Versión de snapshot no soportada: {cabecera.get("version")}')
+    return cabecera
+
+
+def restaurar(schema_name, origen, vaciar=True):
+    """
+    Carga el snapshot `origen` (ruta o archivo binario) en el schema, que ya
+    debe estar migrado. Con vaciar=True primero se vacían las tablas del
+    snapshot (TRUNCATE). Todo en una transacción: si algo falla no queda nada
+    a medias. Retorna {tabla: filas}.
+    """
+    filas = {}
+    with gzip.open(origen, 'rb') as entrada:
+        cabecera = _cabecera(entrada)
+        with transaction.atomic(), connection.cursor() as cursor:
+            existentes = dict(_tablas(cursor, schema_name))
+            faltantes = {tuple(m) for m in cabecera['migraciones']} - {tuple(m) for m in _migraciones(cursor, schema_name)}
+            if faltantes:
+                raise SnapshotError(
+                    f'El schema "{schema_name}" no tiene aplicadas migraciones del snapshot: '
+                    f'{", ".join(".".join(m) for m in sorted(faltantes))}'
+                )
+
+            cursor.execute('SET CONSTRAINTS ALL DEFERRED')
+            if vaciar and existentes:
+                tablas = ', '.join(f'{_q(schema_name)}.{_q(tabla)}' for tabla in existentes)
+                cursor.execute(f'TRUNCATE {tablas}')
+
+            while True:
+                linea = entrada.readline()
+                if not linea:
+                    break
+                coincidencia = _COPY.match(linea)
+                if coincidencia is None:
+                    raise SnapshotError(f'Línea inesperada en el snapshot: {linea[:80]!r}')
+                tabla = coincidencia.group(1).decode()
+                seccion = _SeccionTabla(entrada)
+                if tabla not in existentes:
+                    seccion.descartar()
+                    continue
+                columnas = coincidencia.group(2).decode()
+                cursor.copy_expert(f'COPY {_q(schema_name)}.{_q(tabla)} ({columnas}) FROM STDIN', seccion)
+                filas[tabla] = cursor.rowcount
+
+            _ajustar_secuencias(cursor, schema_name)
+            # Verificar las FK diferidas antes del commit, con un error claro
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+    return filas
+
+
+def _ajustar_secuencias(cursor, schema_name):
+    """setval de cada secuencia serial/identity del schema al máximo valor de su columna."""
+    cursor.execute(
+        """
+        SELECT c.relname, a.attname, pg_get_serial_sequence(c.oid::regclass::text, a.attname)
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+        WHERE n.nspname = %s AND c.relkind = 'r'
+          AND pg_get_serial_sequence(c.oid::regclass::text, a.attname) IS NOT NULL
+        """,
+        [schema_name],
+    )
+    for tabla, columna, secuencia in cursor.fetchall():
+        cursor.execute(
+            f'SELECT setval(%s, COALESCE(MAX({_q(columna)}), 1), MAX({_q(columna)}) IS NOT NULL) '
+            f'FROM {_q(schema_name)}.{_q(tabla)}',
+            [secuencia],
+        )
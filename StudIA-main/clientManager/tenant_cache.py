@@ -0,0 +1,146 @@
+"""
+Caché con espacio de claves por tenant sobre el framework de caché de Django.
+
+Cada clave se guarda como
+
+    tenant:<schema>:<generación del tenant>:<namespace>:<generación del namespace>:<clave>
+
+El schema sale por defecto de connection.schema_name, que el
+TenantResolverMiddleware fija a partir de request.tenant, así que una vista no
+puede leer por error datos cacheados de otro tenant aunque use la misma clave.
+
+Invalidación masiva sin recorrer claves (el backend puede ser LocMem, Redis,
+Memcached, ...): se incrementa la generación del tenant (invalidate_tenant,
+al eliminarlo o suspenderlo) o la del namespace (clear, por ejemplo cuando
+cambia el catálogo). Las claves viejas quedan inalcanzables y vencen por TTL.
+Ambas generaciones se leen con un solo get_many.
+
+Las generaciones arrancan en un valor basado en la hora, no en 0: si el
+backend las pierde (reinicio, desalojo) no se repiten valores anteriores, así
+que version() también sirve como sello para ETags.
+
+El backend se configura en settings.CACHES (LocMemCache por defecto; con
+CACHE_BACKEND y CACHE_LOCATION se puede usar uno compartido entre workers).
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import connection
+from django_tenants.utils import get_public_schema_name
+
+# Las generaciones no vencen
+_SIN_VENCIMIENTO = None
+
+
+def _semilla():
+    """Valor inicial de una generación: milisegundos desde epoch."""
+    return int(time.time() * 1000)
+
+
+class TenantCache:
+    """
+    Uso:
+        catalogo_cache = TenantCache('catalogo', timeout=60)
+        sedes = catalogo_cache.get_or_set('sedes', lambda: list(...))
+        catalogo_cache.clear()                   # solo el tenant actual
+        TenantCache.invalidate_tenant('duoc')    # todo lo del tenant
+
+    Con schema_name fijo sirve para datos globales del schema público.
+    """
+    def __init__(self, namespace, timeout=DEFAULT_TIMEOUT, alias='default', schema_name=None):
+        self.namespace = namespace
+        self.timeout = timeout
+        self.alias = alias
+        # Schema fijo (p. ej. el público para datos globales); si es None se usa el de la conexión
+        self.schema_name = schema_name
+
+    @property
+    def _cache(self):
+        return caches[self.alias]
+
+    def _schema(self, schema_name):
+        return (schema_name or self.schema_name
+                or getattr(connection, 'schema_name', None) or get_public_schema_name())
+
+    @staticmethod
+    def _clave_generacion_tenant(schema_name):
+        return f'tenant:{schema_name}:gen'
+
+    def _clave_generacion_namespace(self, schema_name):
+        return f'tenant:{schema_name}:ns:{self.namespace}:gen'
+
+    def _generaciones(self, schema_name):
+        """(generación del tenant, generación del namespace), inicializándolas si faltan."""
+        claves = [self._clave_generacion_tenant(schema_name), self._clave_generacion_namespace(schema_name)]
+        generaciones = self._cache.get_many(claves)
+        if len(generaciones) < len(claves):
+            for clave in claves:
+                if clave not in generaciones:
+                    self._cache.add(clave, _semilla(), _SIN_VENCIMIENTO)
+            generaciones = self._cache.get_many(claves)
+        return generaciones.get(claves[0], 0), generaciones.get(claves[1], 0)
+
+    def _clave(self, key, schema_name):
+        generacion_tenant, generacion_namespace = self._generaciones(schema_name)
+        return f'tenant:{schema_name}:{generacion_tenant}:{self.namespace}:{generacion_namespace}:{key}'
+
+    def version(self, schema_name=None):
+        """
+        Sello que cambia cada vez que se invalida el tenant o el namespace
+        (para ETags y comparaciones baratas, sin leer los datos).
+        """
+        generacion_tenant, generacion_namespace = self._generaciones(self._schema(schema_name))
+        return f'{generacion_tenant}.{generacion_namespace}'
+
+    def get(self, key, default=None, schema_name=None):
+        return self._cache.get(self._clave(key, self._schema(schema_name)), default)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, schema_name=None):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.timeout
+        self._cache.set(self._clave(key, self._schema(schema_name)), value, timeout)
+
+    def delete(self, key, schema_name=None):
+        self._cache.delete(self._clave(key, self._schema(schema_name)))
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, schema_name=None):
+        """Como cache.get_or_set: `default` puede ser un callable que solo se llama si falta la clave."""
+        schema_name = self._schema(schema_name)
+        valor = self.get(key, schema_name=schema_name)
+        if valor is None:
+            valor = default() if callable(default) else default
+            if valor is not None:
+                self.set(key, valor, timeout, schema_name=schema_name)
+        return valor
+
+    def clear(self, schema_name=None):
+        """Invalida todas las claves de este namespace en un tenant."""
+        _incrementar(self._cache, self._clave_generacion_namespace(self._schema(schema_name)))
+
+    @classmethod
+    def invalidate_tenant(cls, schema_name, alias='default'):
+        """Invalida todas las claves de un tenant, en todos los namespaces."""
+        _incrementar(caches[alias], cls._clave_generacion_tenant(schema_name))
+
+
+def _incrementar(cache, clave):
+    # add() no pisa un valor existente; incr() es atómico en Redis/Memcached
+    cache.add(clave, _semilla(), _SIN_VENCIMIENTO)
+    try:
+        cache.incr(clave)
+    except ValueError:
+        # La clave se perdió entre add() e incr() (desalojo del backend)
+        cache.set(clave, _semilla() + 1, _SIN_VENCIMIENTO)
+
+
+# Tiempos por defecto (segundos); ver settings
+CATALOGO_CACHE_TTL = getattr(settings, 'CATALOGO_CACHE_TTL', 60)
+
+# Catálogo de la API móvil y del mapa de sedes (sedes, asignaturas)
+catalogo_cache = TenantCache('catalogo', timeout=CATALOGO_CACHE_TTL)
+
+# No guarda datos: su versión cambia con cada inscripción o cancelación
+# (cupos, inscritos) y la usan los ETags de la API móvil
+inscripciones_cache = TenantCache('inscripciones')
@@ -0,0 +1,171 @@
+"""
+Registro en memoria de tenants compartido por todos los middlewares.
+
+Antes cada middleware (API móvil, parámetro ?tenant=, impersonación y el
+propio TenantMainMiddleware) hacía su propia consulta a Empresa/Dominio en el
+schema público, lo que costaba entre 3 y 5 queries por request antes de llegar
+a la vista. El registro carga una sola vez la tabla de tenants y de dominios y
+responde todas las búsquedas desde memoria hasta que vence el TTL o hasta que
+alguna vista del panel global lo invalida.
+
+Cada proceso (worker de gunicorn) mantiene su propia copia, que al vencer se
+recarga primero desde la caché (clientManager.tenant_cache, namespace
+del schema público) y solo si no está ahí desde la BD. La invalidación
+explícita descarta la copia local y la de la caché; con una caché compartida
+los demás workers leen la foto nueva al vencer su TTL
+(settings.TENANT_REGISTRY_TTL) sin volver a consultar la BD.
+"""
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django_tenants.utils import schema_context, get_public_schema_name
+
+from clientManager.tenant_cache import TenantCache
+
+
+class TenantSnapshot:
+    """
+    Foto inmutable de los tenants y dominios del schema público.
+    """
+    def __init__(self, tenants, dominios):
+        self.by_id = {}
+        self.by_schema = {}
+        self.by_schema_lower = {}
+        self.by_hostname = {}
+        self.primary_domain = {}
+        self.default_tenant = None
+
+        for tenant in tenants:
+            self.by_id[tenant.id_empresa] = tenant
+            self.by_schema[tenant.schema_name] = tenant
+            self.by_schema_lower.setdefault(tenant.schema_name.lower(), tenant)
+
+        for domain, tenant_id, is_primary in dominios:
+            tenant = self.by_id.get(tenant_id)
+            if tenant is None:
+                continue
+            self.by_hostname[domain] = tenant
+            if is_primary:
+                self.primary_domain[tenant_id] = domain
+
+        # Mismo criterio que usaba ApiMobileTenantMiddleware: primer tenant activo
+        # y, si no hay ninguno, el primero que no sea el público
+        public_schema = get_public_schema_name()
+        activos = [t for t in tenants if t.estado == 'A']
+        if activos:
+            self.default_tenant = activos[0]
+        else:
+            no_publicos = [t for t in tenants if t.schema_name != public_schema]
+            self.default_tenant = no_publicos[0] if no_publicos else None
+
+
+class TenantRegistry:
+    """
+    Resuelve hostname, ?tenant=, /tenant/<slug>/ y X-Tenant-Schema a una Empresa.
+
+    Las búsquedas devuelven una copia superficial de la Empresa para que los
+    middlewares puedan asignarle atributos (por ejemplo domain_url) sin
+    modificar la instancia compartida.
+    """
+    def __init__(self, ttl=None):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._expires_at = 0.0
+
+    @property
+    def ttl(self):
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, 'TENANT_REGISTRY_TTL', 60)
+
+    @property
+    def _cache(self):
+        return TenantCache('tenant_registry', timeout=self.ttl, schema_name=get_public_schema_name())
+
+    def _load(self):
+        """Carga todos los tenants y dominios desde la caché o con dos queries al schema público."""
+        from clientManager.models import Empresa, Dominio
+
+        datos = self._cache.get('snapshot')
+        if datos is None:
+            with schema_context(get_public_schema_name()):
+                tenants = list(Empresa.objects.order_by('pk'))
+                dominios = list(Dominio.objects.values_list('domain', 'tenant_id', 'is_primary'))
+            datos = (tenants, dominios)
+            self._cache.set('snapshot', datos)
+        return TenantSnapshot(*datos)
+
+    def _get_snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._expires_at:
+            return snapshot
+
+        with self._lock:
+            # Otro hilo pudo haber recargado mientras esperábamos el lock
+            if self._snapshot is not None and time.monotonic() < self._expires_at:
+                return self._snapshot
+            snapshot = self._load()
+            self._snapshot = snapshot
+            self._expires_at = time.monotonic() + self.ttl
+            return snapshot
+
+    @staticmethod
+    def _copy(tenant):
+        return copy.copy(tenant) if tenant is not None else None
+
+    def invalidate(self):
+        """Descarta la foto actual; la siguiente búsqueda recarga desde la BD."""
+        with self._lock:
+            self._snapshot = None
+            self._expires_at = 0.0
+        self._cache.delete('snapshot')
+
+    def get_by_hostname(self, hostname):
+        """Busca el tenant por dominio exacto (mismo criterio que django-tenants)."""
+        if not hostname:
+            return None
+        return self._copy(self._get_snapshot().by_hostname.get(hostname))
+
+    def get_by_schema(self, schema_name, case_sensitive=False):
+        """
+        Busca el tenant por schema_name (header X-Tenant-Schema o ?tenant=).
+        Por defecto intenta primero la coincidencia exacta y luego sin distinguir
+        mayúsculas, igual que TenantParamMiddleware.
+        """
+        if not schema_name:
+            return None
+        snapshot = self._get_snapshot()
+        tenant = snapshot.by_schema.get(schema_name)
+        if tenant is None and not case_sensitive:
+            tenant = snapshot.by_schema_lower.get(schema_name.lower())
+        return self._copy(tenant)
+
+    def get_by_slug(self, slug):
+        """Busca el tenant a partir del segmento de /tenant/<slug>/."""
+        if not slug:
+            return None
+        return self.get_by_schema(slug.replace('-', ' '))
+
+    def get_by_id(self, id_empresa):
+        """Busca el tenant por id_empresa (usado en la impersonación)."""
+        try:
+            id_empresa = int(id_empresa)
+        except (TypeError, ValueError):
+            return None
+        return self._copy(self._get_snapshot().by_id.get(id_empresa))
+
+    def get_primary_domain(self, tenant):
+        """Retorna el dominio primario del tenant o None si no tiene."""
+        if tenant is None:
+            return None
+        return self._get_snapshot().primary_domain.get(tenant.id_empresa)
+
+    def get_default(self):
+        """Tenant por defecto para la API móvil cuando no se especifica ninguno."""
+        return self._copy(self._get_snapshot().default_tenant)
+
+
+tenant_registry = TenantRegistry()
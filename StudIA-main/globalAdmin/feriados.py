@@ -0,0 +1,191 @@
+"""
+Calendario de feriados servido desde memoria.
+
+La API de feriados (settings.FERIADOS_API_URL, por defecto Boostr) nunca se
+consulta durante un request. Un hilo en segundo plano por proceso la consulta
+cuando los feriados guardados tienen más de FERIADOS_INTERVALO_HORAS, los
+guarda en la tabla Feriado del schema público (compartida por los workers y
+los tenants) y recarga el calendario en memoria. Si la API falla se conserva
+lo que ya estaba guardado y se reintenta más tarde.
+
+El calendario en memoria es una foto inmutable que el hilo reemplaza entera:
+un conjunto de fechas para es_feriado() en O(1) y un diccionario fecha ->
+feriados. La primera consulta del proceso lo lee de la base y arranca el hilo.
+
+El comando actualizar_feriados fuerza la descarga (deploys, cron).
+"""
+import logging
+import threading
+import time
+from datetime import date
+
+import requests
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from .models import Feriado
+
+logger = logging.getLogger(__name__)
+
+FERIADOS_API_URL = getattr(settings, 'FERIADOS_API_URL', 'https://api.boostr.cl/holidays.json')
+FERIADOS_INTERVALO_HORAS = getattr(settings, 'FERIADOS_INTERVALO_HORAS', 24)
+FERIADOS_TIMEOUT = getattr(settings, 'FERIADOS_TIMEOUT', 10)
+
+# Segundos antes de reintentar tras un error de la API o de la base
+REINTENTO_SEGUNDOS = 15 * 60
+
+
+class FeriadosError(Exception):
+    pass
+
+
+class Calendario:
+    """Feriados en memoria. Cada feriado es {date, title, type, inalienable, extra}."""
+
+    def __init__(self, feriados, actualizado=None):
+        self.feriados = sorted(feriados, key=lambda feriado: feriado['date'])
+        self.por_fecha = {}
+        for feriado in self.feriados:
+            self.por_fecha.setdefault(feriado['date'], []).append(feriado)
+        self.fechas = frozenset(self.por_fecha)
+        # Momento de la última descarga exitosa (None si nunca se descargó)
+        self.actualizado = actualizado
+
+    def __len__(self):
+        return len(self.feriados)
+
+    def es_feriado(self, fecha):
+        return fecha in self.fechas
+
+    def del_dia(self, fecha):
+        return self.por_fecha.get(fecha, [])
+
+
+_calendario = Calendario([])
+_iniciado = False
+_lock = threading.Lock()
+
+
+def descargar(url=None, timeout=None):
+    """Consulta la API y retorna la lista de feriados validada. Lanza FeriadosError."""
+    try:
+        respuesta = requests.get(url or FERIADOS_API_URL, timeout=timeout or FERIADOS_TIMEOUT)
+        respuesta.raise_for_status()
+        data = respuesta.json()
+    except requests.exceptions.Timeout:
+        raise FeriadosError('La petición a la API de feriados tardó demasiado tiempo.')
+    except ValueError:
+        # Antes que RequestException: el JSONDecodeError de requests hereda de ambas
+        raise FeriadosError('Error al parsear la respuesta JSON de la API de feriados.')
+    except requests.exceptions.RequestException as e:
+        raise FeriadosError(f'Error al conectar con la API de feriados: {e}')
+
+    estado = data.get('status', 'unknown') if isinstance(data, dict) else 'unknown'
+    if estado != 'success' or not isinstance(data.get('data'), list) or not data['data']:
+        raise FeriadosError(f'La API de feriados retornó un estado inesperado: {estado}')
+
+    feriados = []
+    for item in data['data']:
+        try:
+            fecha = date.fromisoformat(item['date'])
+        except (KeyError, TypeError, ValueError):
+            raise FeriadosError(f'Feriado con fecha inválida: {item!r}')
+        feriados.append({
+            'date': fecha,
+            'title': str(item.get('title') or ''),
+            'type': str(item.get('type') or ''),
+            'inalienable': bool(item.get('inalienable')),
+            'extra': str(item.get('extra') or ''),
+        })
+    return feriados
+
+
+def cargar():
+    """Lee los feriados guardados y reemplaza el calendario en memoria."""
+    global _calendario
+    with schema_context(get_public_schema_name()):
+        filas = list(Feriado.objects.order_by('fecha'))
+    _calendario = Calendario(
+        [
+            {'date': f.fecha, 'title': f.nombre, 'type': f.tipo, 'inalienable': f.inalienable, 'extra': f.extra}
+            for f in filas
+        ],
+        max((f.actualizado_at for f in filas), default=None),
+    )
+    return _calendario
+
+
+def actualizar(url=None):
+    """Descarga los feriados, reemplaza los guardados y recarga la memoria."""
+    feriados = descargar(url)
+    with schema_context(get_public_schema_name()), transaction.atomic():
+        Feriado.objects.all().delete()
+        Feriado.objects.bulk_create([
+            Feriado(fecha=f['date'], nombre=f['title'][:200], tipo=f['type'][:50],
+                    inalienable=f['inalienable'], extra=f['extra'][:200])
+            for f in feriados
+        ])
+    logger.info("Feriados actualizados: %s", len(feriados))
+    return cargar()
+
+
+def _segundos_para_actualizar():
+    """Segundos hasta que vencen los feriados guardados (0 si ya vencieron o no hay)."""
+    with schema_context(get_public_schema_name()):
+        ultimo = Feriado.objects.aggregate(ultimo=Max('actualizado_at'))['ultimo']
+    if ultimo is None:
+        return 0
+    return max(0, FERIADOS_INTERVALO_HORAS * 3600 - (timezone.now() - ultimo).total_seconds())
+
+
+def _actualizar_periodicamente():
+    while True:
+        try:
+            espera = _segundos_para_actualizar()
+            if espera == 0:
+                actualizar()
+                espera = FERIADOS_INTERVALO_HORAS * 3600
+            else:
+                # Otro worker ya los actualizó
+                cargar()
+        except FeriadosError as e:
+            logger.warning("No se pudieron actualizar los feriados: %s", e)
+            espera = REINTENTO_SEGUNDOS
+        except Exception:
+            logger.exception("Error al actualizar los feriados")
+            espera = REINTENTO_SEGUNDOS
+        finally:
+            # La conexión de este hilo no la cierra ningún request
+            connection.close()
+        time.sleep(max(60, espera))
+
+
+def _iniciar():
+    global _iniciado
+    with _lock:
+        if _iniciado:
+            return
+        try:
+            cargar()
+        except Exception:
+            logger.exception("No se pudieron leer los feriados guardados")
+        threading.Thread(target=_actualizar_periodicamente, name='feriados', daemon=True).start()
+        _iniciado = True
+
+
+def calendario():
+    """Calendario actual, sin I/O de red. La primera llamada del proceso lo carga."""
+    if not _iniciado:
+        _iniciar()
+    return _calendario
+
+
+def es_feriado(fecha):
+    return fecha in calendario().fechas
+
+
+def feriados_del_dia(fecha):
+    return calendario().del_dia(fecha)
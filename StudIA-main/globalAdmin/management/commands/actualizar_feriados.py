@@ -0,0 +1,24 @@
+"""
+Comando de gestión para descargar los feriados de la API y guardarlos en el
+schema público (globalAdmin/feriados.py). Los procesos web los actualizan
+solos en segundo plano; esto sirve para cargarlos en un deploy o desde cron.
+
+Uso: python manage.py actualizar_feriados [--url URL]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from globalAdmin.feriados import FERIADOS_API_URL, FeriadosError, actualizar
+
+
+class Command(BaseCommand):
+    help = 'Descarga los feriados de la API y los guarda para el calendario en memoria'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', type=str, default=FERIADOS_API_URL, help=f'URL de la API (default: {FERIADOS_API_URL})')
+
+    def handle(self, *args, **options):
+        try:
+            calendario = actualizar(options['url'])
+        except FeriadosError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f'{len(calendario)} feriados guardados'))
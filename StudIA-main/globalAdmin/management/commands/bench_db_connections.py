@@ -0,0 +1,152 @@
+"""
+Comando de gestión para medir la latencia por request con y sin reutilización
+de conexiones a PostgreSQL.
+
+Cada request simulado reproduce el ciclo real de Django: request_started
+(close_old_connections), el middleware fija el schema público y luego el del
+tenant, la vista hace un par de queries y request_finished vuelve a llamar a
+close_old_connections. Con CONN_MAX_AGE = 0 eso abre y cierra una conexión por
+request (TCP + TLS + autenticación); con CONN_MAX_AGE > 0 la conexión se
+reutiliza tras el health check.
+
+Los requests rotan entre los tenants, así las conexiones reutilizadas pasan de
+un schema a otro. Cada request verifica current_schema() y, cada
+--rollback-every requests, hace una query dentro de una transacción que
+termina en rollback (el caso en que PostgreSQL revierte el search_path). La
+columna "errores" cuenta los requests que vieron un schema distinto al de su
+tenant: debe ser 0.
+
+Uso: python manage.py bench_db_connections [--requests N] [--concurrency C]
+     [--max-age S] [--tenants schema1,schema2] [--rollback-every K]
+"""
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connection, connections, transaction
+from django.db.backends.signals import connection_created
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from clientManager.models import Empresa
+from loginApp.models import Asignatura, Usuario
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compara p50/p99 por request con conexiones nuevas (CONN_MAX_AGE=0) y reutilizadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests simulados por modo (default: 2000)')
+        parser.add_argument('--concurrency', type=int, default=8, help='Hilos en paralelo, uno por conexión (default: 8)')
+        parser.add_argument('--max-age', type=int, default=600, help='CONN_MAX_AGE del modo con reutilización (default: 600)')
+        parser.add_argument('--tenants', type=str, default=None, help='Schemas separados por coma (default: todos los activos)')
+        parser.add_argument('--rollback-every', type=int, default=10, help='Cada cuántos requests se hace un rollback (default: 10)')
+
+    def _tenants(self, schemas):
+        with schema_context(get_public_schema_name()):
+            tenants = Empresa.objects.exclude(schema_name=get_public_schema_name()).order_by('pk')
+            if schemas:
+                tenants = tenants.filter(schema_name__in=schemas.split(','))
+            else:
+                tenants = tenants.filter(estado='A')
+            return list(tenants)
+
+    def _request(self, tenant, rollback):
+        """Un request: devuelve True si todas las queries corrieron en el schema del tenant."""
+        request_started.send(sender=self.__class__)
+        try:
+            connection.set_schema_to_public()
+            connection.set_tenant(tenant)
+            if rollback:
+                try:
+                    with transaction.atomic():
+                        Usuario.objects.filter(is_active=True).exists()
+                        raise _Rollback
+                except _Rollback:
+                    pass
+            list(Asignatura.objects.filter(is_active=True).order_by('nombre')[:20])
+            Usuario.objects.filter(is_active=True).exists()
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT current_schema()')
+                return cursor.fetchone()[0] == tenant.schema_name
+        finally:
+            request_finished.send(sender=self.__class__)
+
+    def _run(self, tenants, max_age, total, concurrency, rollback_every):
+        connections['default'].close()
+        connections.settings['default']['CONN_MAX_AGE'] = max_age
+        connections.settings['default']['CONN_HEALTH_CHECKS'] = True
+
+        timings = []
+        errores = [0]
+        abiertas = [0]
+        lock = threading.Lock()
+
+        def contar_conexion(sender, **kwargs):
+            with lock:
+                abiertas[0] += 1
+
+        def worker(indice):
+            propios, fallidos = [], 0
+            for n in range(indice, total, concurrency):
+                tenant = tenants[n % len(tenants)]
+                start = time.perf_counter()
+                ok = self._request(tenant, rollback_every and n % rollback_every == 0)
+                propios.append((time.perf_counter() - start) * 1000)
+                fallidos += not ok
+            connections.close_all()
+            with lock:
+                timings.extend(propios)
+                errores[0] += fallidos
+
+        connection_created.connect(contar_conexion)
+        try:
+            hilos = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+            inicio = time.perf_counter()
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+            duracion = time.perf_counter() - inicio
+        finally:
+            connection_created.disconnect(contar_conexion)
+
+        timings.sort()
+        return {
+            'p50': timings[len(timings) // 2],
+            'p99': timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+            'mean': statistics.fmean(timings),
+            'rps': len(timings) / duracion,
+            'conexiones': abiertas[0],
+            'errores': errores[0],
+        }
+
+    def handle(self, *args, **options):
+        tenants = self._tenants(options['tenants'])
+        if not tenants:
+            raise CommandError('No hay tenants para el benchmark')
+
+        max_age_original = connections.settings['default'].get('CONN_MAX_AGE', 0)
+        modos = [('sin reutilizar', 0), (f'max_age={options["max_age"]}', options['max_age'])]
+
+        self.stdout.write(
+            f'Tenants: {", ".join(t.schema_name for t in tenants)} | '
+            f'Requests por modo: {options["requests"]} | Hilos: {options["concurrency"]}\n'
+        )
+        self.stdout.write(f'{"modo":<18}{"p50 ms":>9}{"p99 ms":>9}{"media ms":>10}{"req/s":>9}{"conexiones":>12}{"errores":>9}')
+        try:
+            for nombre, max_age in modos:
+                r = self._run(tenants, max_age, options['requests'], options['concurrency'], options['rollback_every'])
+                self.stdout.write(
+                    f'{nombre:<18}{r["p50"]:>9.2f}{r["p99"]:>9.2f}{r["mean"]:>10.2f}'
+                    f'{r["rps"]:>9.0f}{r["conexiones"]:>12}{r["errores"]:>9}'
+                )
+        finally:
+            connections.settings['default']['CONN_MAX_AGE'] = max_age_original
+            connections['default'].close()
+            connection.set_schema_to_public()
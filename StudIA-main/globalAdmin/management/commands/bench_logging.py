@@ -0,0 +1,90 @@
+"""
+Comando de gestión para medir cuánto le cuesta al request el logging de depuración.
+
+Simula la ráfaga de mensajes que emite un request de la API móvil (middleware,
+autenticación y vista) con tres estrategias:
+- stdout: sys.stdout.write() + sys.stdout.flush() por mensaje, como antes
+- cola: logger con NonBlockingQueueHandler (el request solo encola)
+- apagado: logger con nivel WARNING, como queda en producción por defecto
+
+La salida de stdout y del listener se redirige a /dev/null para medir solo el
+costo dentro del request y no el de la terminal. Entre requests se duerme
+--gap-us (sin cronometrar) para imitar la espera de BD/red, que es cuando el
+hilo del listener vacía la cola en un worker real.
+
+Uso: python manage.py bench_logging [--iterations N] [--messages M] [--gap-us US]
+"""
+import logging
+import os
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from portalAutoatencion.logging_pipeline import NonBlockingQueueHandler
+
+
+class Command(BaseCommand):
+    help = 'Mide la latencia por request que agrega el logging de depuración (stdout vs cola vs apagado)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000, help='Requests simulados por estrategia (default: 2000)')
+        parser.add_argument('--messages', type=int, default=12, help='Mensajes de log por request (default: 12)')
+        parser.add_argument('--gap-us', type=int, default=1000, help='Pausa sin cronometrar entre requests en µs (default: 1000)')
+
+    def _measure(self, emit, iterations, messages, gap):
+        timings = []
+        for i in range(iterations):
+            start = time.perf_counter()
+            for j in range(messages):
+                emit(i, j)
+            timings.append((time.perf_counter() - start) * 1_000_000)
+            if gap:
+                time.sleep(gap)
+        timings.sort()
+        return {
+            'mean': statistics.fmean(timings),
+            'p50': timings[len(timings) // 2],
+            'p99': timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+        }
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        messages = options['messages']
+        gap = options['gap_us'] / 1_000_000
+        results = {}
+
+        with open(os.devnull, 'w') as devnull:
+            def emit_stdout(i, j):
+                devnull.write(f'[API Mobile] Tenant establecido en request: tenant_{i} (mensaje {j})\n')
+                devnull.flush()
+            results['stdout'] = self._measure(emit_stdout, iterations, messages, gap)
+
+            handler = NonBlockingQueueHandler(stream=devnull)
+            queued = logging.getLogger('bench_logging.queue')
+            queued.handlers = [handler]
+            queued.setLevel(logging.DEBUG)
+            queued.propagate = False
+
+            def emit_queue(i, j):
+                queued.debug('[API Mobile] Tenant establecido en request: tenant_%s (mensaje %s)', i, j)
+            results['cola'] = self._measure(emit_queue, iterations, messages, gap)
+            handler.stop()
+
+            disabled = logging.getLogger('bench_logging.disabled')
+            disabled.handlers = [NonBlockingQueueHandler(stream=devnull)]
+            disabled.setLevel(logging.WARNING)
+            disabled.propagate = False
+
+            def emit_disabled(i, j):
+                disabled.debug('[API Mobile] Tenant establecido en request: tenant_%s (mensaje %s)', i, j)
+            results['apagado'] = self._measure(emit_disabled, iterations, messages, gap)
+
+        self.stdout.write(f'Iteraciones: {iterations} | Mensajes por request: {messages}\n')
+        self.stdout.write(f'{"estrategia":<12}{"media µs":>10}{"p50 µs":>10}{"p99 µs":>10}')
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<12}{result["mean"]:>10.1f}{result["p50"]:>10.1f}{result["p99"]:>10.1f}'
+            )
+        if handler.dropped:
+            self.stdout.write(f'\nRegistros descartados por cola llena: {handler.dropped}')
@@ -0,0 +1,99 @@
+"""
+Comando de gestión para medir la búsqueda de sedes cercanas
+(api_mobile/sedes_cercanas.py) sin base de datos.
+
+Genera --sedes puntos al azar dentro de un rectángulo (por defecto la Región
+Metropolitana) y compara, para --consultas puntos al azar:
+  recorrido: haversine contra todas las sedes y ordenar (lo que haría una
+             vista que recorre Sede.objects.filter(is_active=True))
+  kdtree:    IndiceSedes.cercanas
+Verifica además que ambos modos retornen las mismas sedes ("diferencias"
+debe ser 0) e informa el tiempo de armar el índice.
+
+Uso: python manage.py bench_sedes_cercanas [--sedes N] [--consultas Q] [--k K]
+"""
+import math
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api_mobile.sedes_cercanas import RADIO_TIERRA_KM, IndiceSedes
+
+# Región Metropolitana: (lat mín, lat máx, lng mín, lng máx)
+RECTANGULO = (-34.0, -33.0, -71.3, -70.3)
+
+
+def _haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * math.asin(math.sqrt(a))
+
+
+def _recorrido(sedes, latitud, longitud, k):
+    distancias = sorted(
+        (_haversine_km(latitud, longitud, sede['latitud'], sede['longitud']), sede['id_sede'])
+        for sede in sedes
+    )
+    return [id_sede for _, id_sede in distancias[:k]]
+
+
+class Command(BaseCommand):
+    help = 'Compara la búsqueda de sedes cercanas recorriendo todas las sedes y con el KD-tree'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sedes', type=int, default=5000, help='Sedes generadas (default: 5000)')
+        parser.add_argument('--consultas', type=int, default=2000, help='Consultas por modo (default: 2000)')
+        parser.add_argument('--k', type=int, default=5, help='Sedes por consulta (default: 5)')
+        parser.add_argument('--semilla', type=int, default=1, help='Semilla del generador (default: 1)')
+
+    def handle(self, *args, **options):
+        if options['sedes'] < 1 or options['consultas'] < 1 or options['k'] < 1:
+            raise CommandError('--sedes, --consultas y --k deben ser al menos 1')
+        aleatorio = random.Random(options['semilla'])
+        lat_min, lat_max, lng_min, lng_max = RECTANGULO
+
+        def punto():
+            return aleatorio.uniform(lat_min, lat_max), aleatorio.uniform(lng_min, lng_max)
+
+        sedes = []
+        for n in range(options['sedes']):
+            latitud, longitud = punto()
+            sedes.append({'id_sede': n, 'nombre': f'Sede {n}', 'direccion': '', 'latitud': latitud, 'longitud': longitud})
+        consultas = [punto() for _ in range(options['consultas'])]
+        k = options['k']
+
+        inicio = time.perf_counter()
+        indice = IndiceSedes(sedes)
+        construccion = (time.perf_counter() - inicio) * 1000
+
+        self.stdout.write(
+            f'Sedes: {len(sedes)} | Consultas: {len(consultas)} | k: {k} | '
+            f'Índice armado en {construccion:.1f} ms\n'
+        )
+        self.stdout.write(f'{"modo":<12}{"p50 µs":>10}{"p99 µs":>10}{"media µs":>10}')
+
+        esperados = []
+        modos = [
+            ('recorrido', lambda latitud, longitud: _recorrido(sedes, latitud, longitud, k)),
+            ('kdtree', lambda latitud, longitud: [s['id_sede'] for s in indice.cercanas(latitud, longitud, k)]),
+        ]
+        diferencias = 0
+        for nombre, buscar in modos:
+            tiempos = []
+            for n, (latitud, longitud) in enumerate(consultas):
+                inicio = time.perf_counter()
+                ids = buscar(latitud, longitud)
+                tiempos.append((time.perf_counter() - inicio) * 1e6)
+                if nombre == 'recorrido':
+                    esperados.append(ids)
+                elif ids != esperados[n]:
+                    diferencias += 1
+            tiempos.sort()
+            self.stdout.write(
+                f'{nombre:<12}{tiempos[len(tiempos) // 2]:>10.1f}'
+                f'{tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.99))]:>10.1f}'
+                f'{statistics.fmean(tiempos):>10.1f}'
+            )
+        self.stdout.write(f'Diferencias entre modos: {diferencias}')
@@ -0,0 +1,161 @@
+"""
+Comando de gestión para medir el costo de resolver, compilar y renderizar
+templates con los loaders por tema.
+
+Compara tres configuraciones del engine:
+- anterior: TenantThemeLoader tal como era (os.path.exists por directorio en
+  cada búsqueda y open() de prueba por candidato, sin caché);
+- indice: TenantThemeLoader con el índice en memoria, sin caché;
+- cache: TenantThemeCachedLoader envolviendo los loaders (configuración de
+  settings), que compila cada template una vez por (tema, nombre).
+
+Los renders alternan entre los temas. La columna "fs/render" cuenta las
+llamadas a os.stat y open() por render, medidas en una pasada aparte.
+
+Uso: python manage.py bench_templates [--iterations N] [--themes default,tema1]
+     [--templates base.html,login.html]
+"""
+import builtins
+import os
+import statistics
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.filesystem import Loader as FilesystemLoader
+
+from globalAdmin.tema import tema_actual, usar_tema
+
+TEMPLATES = [
+    'base.html',
+    'login.html',
+    'home.html',
+    'estudiante/asignaturas.html',
+    'admin/ayudantias.html',
+    'tutor/dashboard.html',
+]
+
+APP_DIRECTORIES = 'django.template.loaders.app_directories.Loader'
+
+CONFIGURACIONES = {
+    'anterior': [
+        'globalAdmin.management.commands.bench_templates.LegacyThemeLoader',
+        APP_DIRECTORIES,
+    ],
+    'indice': [
+        'globalAdmin.template_loaders.TenantThemeLoader',
+        APP_DIRECTORIES,
+    ],
+    'cache': [
+        ('globalAdmin.template_loaders.TenantThemeCachedLoader', [
+            'globalAdmin.template_loaders.TenantThemeLoader',
+            APP_DIRECTORIES,
+        ]),
+    ],
+}
+
+
+class LegacyThemeLoader(FilesystemLoader):
+    """Referencia: el TenantThemeLoader anterior, que resolvía los directorios en cada búsqueda."""
+
+    def get_dirs(self):
+        tenant_theme = tema_actual()
+        base_template_dir = os.path.join(settings.BASE_DIR, 'loginApp', 'templates')
+        dirs = []
+        theme_dir = os.path.join(base_template_dir, 'tenants', tenant_theme)
+        if os.path.exists(theme_dir):
+            dirs.append(theme_dir)
+        default_dir = os.path.join(base_template_dir, 'tenants', 'default')
+        if os.path.exists(default_dir) and tenant_theme != 'default':
+            dirs.append(default_dir)
+        if os.path.exists(base_template_dir):
+            dirs.append(base_template_dir)
+        return dirs or [base_template_dir]
+
+
+class Command(BaseCommand):
+    help = 'Compara resolución y render de templates por tema con y sin caché de loaders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=300, help='Renders por template y configuración (default: 300)')
+        parser.add_argument('--themes', type=str, default=None, help='Temas separados por coma (default: default + los de tenants/)')
+        parser.add_argument('--templates', type=str, default=None, help='Templates separados por coma')
+
+    def _engine(self, loaders):
+        opciones = dict(settings.TEMPLATES[0]['OPTIONS'], loaders=loaders)
+        return DjangoTemplates({
+            'NAME': 'bench',
+            'DIRS': [],
+            'APP_DIRS': False,
+            'OPTIONS': opciones,
+        })
+
+    def _render(self, engine, nombre, tema):
+        with usar_tema(tema):
+            engine.get_template(nombre).render({})
+
+    def _contar_fs(self, engine, nombres, temas):
+        llamadas = [0]
+        stat_original, open_original = os.stat, builtins.open
+
+        def contar_stat(*args, **kwargs):
+            llamadas[0] += 1
+            return stat_original(*args, **kwargs)
+
+        def contar_open(*args, **kwargs):
+            llamadas[0] += 1
+            return open_original(*args, **kwargs)
+
+        renders = 0
+        with mock.patch('os.stat', contar_stat), mock.patch('builtins.open', contar_open):
+            for tema in temas:
+                for nombre in nombres:
+                    self._render(engine, nombre, tema)
+                    renders += 1
+        return llamadas[0] / renders
+
+    def _run(self, engine, nombres, temas, iterations):
+        # Calentar: en la configuración con caché la primera pasada compila
+        for tema in temas:
+            for nombre in nombres:
+                self._render(engine, nombre, tema)
+        fs = self._contar_fs(engine, nombres, temas)
+
+        timings = []
+        for n in range(iterations):
+            tema = temas[n % len(temas)]
+            for nombre in nombres:
+                start = time.perf_counter()
+                self._render(engine, nombre, tema)
+                timings.append((time.perf_counter() - start) * 1_000_000)
+
+        timings.sort()
+        return {
+            'mean': statistics.fmean(timings),
+            'p50': timings[len(timings) // 2],
+            'p99': timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+            'fs': fs,
+        }
+
+    def handle(self, *args, **options):
+        nombres = options['templates'].split(',') if options['templates'] else TEMPLATES
+        if options['themes']:
+            temas = options['themes'].split(',')
+        else:
+            tenants_dir = os.path.join(settings.BASE_DIR, 'loginApp', 'templates', 'tenants')
+            temas = ['default'] + sorted(
+                d for d in os.listdir(tenants_dir) if os.path.isdir(os.path.join(tenants_dir, d))
+            )
+
+        self.stdout.write(
+            f'Temas: {", ".join(temas)} | Templates: {len(nombres)} | '
+            f'Iteraciones: {options["iterations"]}\n'
+        )
+        self.stdout.write(f'{"loaders":<10}{"media µs":>10}{"p50 µs":>10}{"p99 µs":>10}{"fs/render":>11}')
+        for nombre, loaders in CONFIGURACIONES.items():
+            r = self._run(self._engine(loaders), nombres, temas, options['iterations'])
+            self.stdout.write(
+                f'{nombre:<10}{r["mean"]:>10.1f}{r["p50"]:>10.1f}{r["p99"]:>10.1f}{r["fs"]:>11.1f}'
+            )
@@ -0,0 +1,87 @@
+"""
+Comando de gestión para medir la latencia de crear el schema de un tenant.
+
+Compara los dos caminos de globalAdmin/plantilla.py:
+  migrar: CREATE SCHEMA + migrate_schemas --run-syncdb (todas las migraciones)
+  clonar: clone_schema desde settings.TENANT_PLANTILLA_SCHEMA, ya migrada
+
+Cada repetición crea un schema temporal bench_<id>_<n> y lo borra al final;
+no se crean filas de Empresa ni Dominio (son iguales en ambos modos). Antes de
+medir se deja la plantilla al día, fuera del tiempo medido. El costo de migrar
+crece con la cantidad de migraciones de TENANT_APPS (se muestra en el
+encabezado); el de clonar depende solo de la cantidad de tablas.
+
+Uso: python manage.py bench_tenant_create [--repeticiones N] [--modos migrar,clonar]
+"""
+import statistics
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from globalAdmin.migraciones import PLANTILLA_SCHEMA, migraciones_esperadas, migrar_schema
+from globalAdmin.plantilla import actualizar_plantilla, crear_schema_tenant
+
+MODOS = ('migrar', 'clonar')
+
+
+class Command(BaseCommand):
+    help = 'Compara la latencia de crear un tenant migrando desde cero y clonando la plantilla'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=5, help='Schemas creados por modo (default: 5)')
+        parser.add_argument('--modos', type=str, default=','.join(MODOS), help='Modos separados por coma (default: migrar,clonar)')
+
+    def _crear(self, modo, schema_name):
+        lineas = []
+        inicio = time.perf_counter()
+        if modo == 'migrar':
+            migrar_schema(schema_name, lineas)
+        else:
+            crear_schema_tenant(schema_name, lineas)
+        return (time.perf_counter() - inicio) * 1000
+
+    def _borrar(self, schema_name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP SCHEMA IF EXISTS {connection.ops.quote_name(schema_name)} CASCADE')
+
+    def handle(self, *args, **options):
+        modos = options['modos'].split(',')
+        if any(modo not in MODOS for modo in modos):
+            raise CommandError(f'Modos válidos: {", ".join(MODOS)}')
+        if options['repeticiones'] < 1:
+            raise CommandError('--repeticiones debe ser al menos 1')
+        if 'clonar' in modos:
+            if not PLANTILLA_SCHEMA:
+                raise CommandError('TENANT_PLANTILLA_SCHEMA está vacío: no hay plantilla que clonar')
+            inicio = time.perf_counter()
+            pendientes = actualizar_plantilla([])
+            self.stdout.write(
+                f'Plantilla "{PLANTILLA_SCHEMA}": {pendientes} migraciones aplicadas '
+                f'en {time.perf_counter() - inicio:.1f} s (no se mide)'
+            )
+
+        esperadas, _ = migraciones_esperadas(settings.TENANT_APPS)
+        self.stdout.write(f'Migraciones de TENANT_APPS: {len(esperadas)} | Repeticiones por modo: {options["repeticiones"]}\n')
+        self.stdout.write(f'{"modo":<10}{"p50 ms":>10}{"media ms":>10}{"min ms":>10}{"max ms":>10}')
+
+        prefijo = f'bench_{uuid.uuid4().hex[:8]}'
+        creados = []
+        try:
+            for modo in modos:
+                tiempos = []
+                for n in range(options['repeticiones']):
+                    schema_name = f'{prefijo}_{modo}_{n}'
+                    creados.append(schema_name)
+                    tiempos.append(self._crear(modo, schema_name))
+                tiempos.sort()
+                self.stdout.write(
+                    f'{modo:<10}{tiempos[len(tiempos) // 2]:>10.0f}{statistics.fmean(tiempos):>10.0f}'
+                    f'{tiempos[0]:>10.0f}{tiempos[-1]:>10.0f}'
+                )
+        finally:
+            connection.set_schema_to_public()
+            for schema_name in creados:
+                self._borrar(schema_name)
@@ -0,0 +1,114 @@
+"""
+Comando de gestión para medir el overhead de resolución de tenant por request.
+
+Compara la cadena anterior de middlewares (ApiMobileTenantMiddleware,
+ForcePublicSchemaMiddleware, TenantParamMiddleware, TenantMainMiddleware,
+PublicRootMiddleware, PublicSchemaMiddleware, TenantThemeMiddleware y
+PublicSchemaAuthMiddleware) contra TenantResolverMiddleware, sin ejecutar
+ninguna vista: la respuesta la genera un get_response vacío.
+
+Uso: python manage.py bench_tenant_middleware [--iterations N] [--host HOST] [--tenant SCHEMA]
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils.module_loading import import_string
+
+
+SESSION_MIDDLEWARE = 'django.contrib.sessions.middleware.SessionMiddleware'
+
+LEGACY_CHAIN = [
+    'api_mobile.middleware.ApiMobileTenantMiddleware',
+    'globalAdmin.middleware.ForcePublicSchemaMiddleware',
+    SESSION_MIDDLEWARE,
+    'globalAdmin.middleware_tenant_param.TenantParamMiddleware',
+    'django_tenants.middleware.main.TenantMainMiddleware',
+    'globalAdmin.middleware_public.PublicRootMiddleware',
+    'globalAdmin.middleware.PublicSchemaMiddleware',
+    'globalAdmin.middleware.TenantThemeMiddleware',
+    'globalAdmin.middleware.PublicSchemaAuthMiddleware',
+]
+
+RESOLVER_CHAIN = [
+    SESSION_MIDDLEWARE,
+    'globalAdmin.middleware_resolver.TenantResolverMiddleware',
+]
+
+PATHS = [
+    '/',
+    '/global/login/',
+    '/global/dashboard/',
+    '/api/mobile/asignaturas/',
+    '/api/mobile/ayudantias/',
+]
+
+
+def build_chain(middleware_paths):
+    """Arma la cadena igual que BaseHandler.load_middleware (de adentro hacia afuera)."""
+    def view(request):
+        return HttpResponse('ok')
+
+    handler = view
+    for path in reversed(middleware_paths):
+        handler = import_string(path)(handler)
+    return handler
+
+
+class Command(BaseCommand):
+    help = 'Compara el overhead por request de la cadena de middlewares de tenant antigua y del resolver único'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500, help='Requests por ruta y cadena (default: 500)')
+        parser.add_argument('--host', type=str, default='localhost', help='Host de las peticiones (default: localhost)')
+        parser.add_argument('--tenant', type=str, default=None, help='Schema enviado en X-Tenant-Schema a /api/mobile/')
+
+    def _run(self, chain, path, host, tenant, iterations):
+        factory = RequestFactory()
+        extra = {'HTTP_HOST': host}
+        if tenant and path.startswith('/api/mobile/'):
+            extra['HTTP_X_TENANT_SCHEMA'] = tenant
+
+        # Calentar el registro de tenants y los imports
+        chain(factory.get(path, **extra))
+
+        timings = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(iterations):
+                request = factory.get(path, **extra)
+                start = time.perf_counter()
+                chain(request)
+                timings.append((time.perf_counter() - start) * 1_000_000)
+
+        timings.sort()
+        return {
+            'mean': statistics.fmean(timings),
+            'p50': timings[len(timings) // 2],
+            'p99': timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+            'queries': len(queries) / iterations,
+        }
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        host = options['host']
+        tenant = options['tenant']
+
+        chains = {
+            'legacy': build_chain(LEGACY_CHAIN),
+            'resolver': build_chain(RESOLVER_CHAIN),
+        }
+
+        self.stdout.write(f'Host: {host} | Iteraciones por ruta: {iterations}\n')
+        self.stdout.write(f'{"ruta":<28}{"cadena":<10}{"media µs":>10}{"p50 µs":>10}{"p99 µs":>10}{"queries":>9}')
+        for path in PATHS:
+            for name, chain in chains.items():
+                result = self._run(chain, path, host, tenant, iterations)
+                self.stdout.write(
+                    f'{path:<28}{name:<10}{result["mean"]:>10.1f}{result["p50"]:>10.1f}'
+                    f'{result["p99"]:>10.1f}{result["queries"]:>9.2f}'
+                )
+        connection.set_schema_to_public()
@@ -0,0 +1,136 @@
+"""
+Comando de gestión para migrar todos los schemas en paralelo (deploys).
+
+Descubre los schemas de Empresa y, con una query por schema a su tabla
+django_migrations, descarta los que ya tienen aplicadas todas las migraciones
+de sus apps (SHARED_APPS para el público, TENANT_APPS para los tenants). El
+schema público se migra primero; los tenants pendientes se migran en un pool
+de --concurrency procesos, cada uno con su propia conexión. Al final imprime
+el tiempo de cada schema. El schema plantilla (settings.TENANT_PLANTILLA_SCHEMA,
+ver globalAdmin/plantilla.py) se migra como un tenant más.
+
+Uso: python manage.py migrate_all_tenants [--concurrency N] [--schemas s1,s2]
+     [--sin-publico] [--forzar] [--plan]
+"""
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from clientManager.models import Empresa
+from globalAdmin.migraciones import PLANTILLA_SCHEMA, migraciones_esperadas, migraciones_pendientes
+
+
+def _inicializar_worker():
+    # Los procesos del pool arrancan con 'spawn': configuran Django desde cero
+    django.setup()
+
+
+def _migrar(schema_name):
+    """Se ejecuta en un proceso del pool. Retorna (schema, ok, segundos, salida)."""
+    from globalAdmin.migraciones import migrar_schema
+
+    lineas = []
+    inicio = time.perf_counter()
+    try:
+        migrar_schema(schema_name, lineas)
+        ok = True
+    except Exception as e:
+        lineas.append(f'ERROR: {e}')
+        ok = False
+    finally:
+        connections.close_all()
+    return schema_name, ok, time.perf_counter() - inicio, '\n'.join(lineas)
+
+
+class Command(BaseCommand):
+    help = 'Migra el schema público y luego todos los tenants en paralelo, saltando los que están al día'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help='Procesos en paralelo para los tenants (default: 4)')
+        parser.add_argument('--schemas', type=str, default=None, help='Solo estos schemas, separados por coma')
+        parser.add_argument('--sin-publico', action='store_true', help='No migrar el schema público')
+        parser.add_argument('--forzar', action='store_true', help='Migrar también los schemas que están al día')
+        parser.add_argument('--plan', action='store_true', help='Solo mostrar qué schemas tienen migraciones pendientes')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency debe ser al menos 1')
+
+        public_schema = get_public_schema_name()
+        with schema_context(public_schema):
+            schemas = list(
+                Empresa.objects.exclude(schema_name=public_schema)
+                .order_by('pk').values_list('schema_name', flat=True)
+            )
+        if PLANTILLA_SCHEMA:
+            schemas.insert(0, PLANTILLA_SCHEMA)
+        if options['schemas']:
+            pedidos = options['schemas'].split(',')
+            schemas = [schema for schema in schemas if schema in pedidos]
+
+        esperadas_publico = migraciones_esperadas(settings.SHARED_APPS)
+        esperadas_tenant = migraciones_esperadas(settings.TENANT_APPS)
+
+        reporte = []
+        inicio_total = time.perf_counter()
+
+        if not options['sin_publico']:
+            pendientes = migraciones_pendientes(public_schema, *esperadas_publico)
+            if pendientes or options['forzar']:
+                self.stdout.write(f'{public_schema}: {pendientes} migraciones pendientes')
+                if not options['plan']:
+                    resultado = _migrar(public_schema)
+                    reporte.append(resultado)
+                    if not resultado[1]:
+                        self._imprimir_reporte(reporte, [], time.perf_counter() - inicio_total)
+                        raise CommandError(f'Falló la migración del schema público:\n{resultado[3]}')
+            else:
+                reporte.append((public_schema, None, 0.0, ''))
+
+        a_migrar, al_dia = [], []
+        for schema_name in schemas:
+            pendientes = migraciones_pendientes(schema_name, *esperadas_tenant)
+            if pendientes or options['forzar']:
+                self.stdout.write(f'{schema_name}: {pendientes} migraciones pendientes')
+                a_migrar.append(schema_name)
+            else:
+                al_dia.append(schema_name)
+
+        if options['plan']:
+            self.stdout.write(f'{len(a_migrar)} tenants por migrar, {len(al_dia)} al día')
+            return
+
+        if a_migrar:
+            # El pool abre sus propias conexiones; spawn evita heredar la del padre
+            connections.close_all()
+            contexto = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=min(options['concurrency'], len(a_migrar)),
+                                     mp_context=contexto, initializer=_inicializar_worker) as pool:
+                futuros = [pool.submit(_migrar, schema_name) for schema_name in a_migrar]
+                for futuro in as_completed(futuros):
+                    resultado = futuro.result()
+                    reporte.append(resultado)
+                    schema_name, ok, segundos, _ = resultado
+                    estilo = self.style.SUCCESS if ok else self.style.ERROR
+                    self.stdout.write(estilo(f'{schema_name}: {"ok" if ok else "error"} en {segundos:.1f} s'))
+
+        reporte.extend((schema_name, None, 0.0, '') for schema_name in al_dia)
+        errores = [r for r in reporte if r[1] is False]
+        self._imprimir_reporte(reporte, errores, time.perf_counter() - inicio_total)
+        if errores:
+            raise CommandError(f'{len(errores)} schemas con error')
+
+    def _imprimir_reporte(self, reporte, errores, total):
+        self.stdout.write(f'\n{"schema":<30}{"estado":<12}{"segundos":>10}')
+        for schema_name, ok, segundos, _ in sorted(reporte, key=lambda r: -r[2]):
+            estado = 'al día' if ok is None else ('migrado' if ok else 'error')
+            self.stdout.write(f'{schema_name:<30}{estado:<12}{segundos:>10.1f}')
+        self.stdout.write(f'Tiempo total: {total:.1f} s')
+        for schema_name, _, _, salida in errores:
+            self.stdout.write(self.style.ERROR(f'\n[{schema_name}]\n{salida}'))
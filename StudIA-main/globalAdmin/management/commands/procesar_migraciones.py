@@ -0,0 +1,72 @@
+"""
+Worker de la cola de migraciones de tenants (globalAdmin/migraciones.py).
+
+Toma las TareaMigracion pendientes que encola el panel global y las ejecuta
+una por una. Con --procesos N lanza N workers como subprocesos: migran N
+schemas en paralelo como máximo, cada uno con su propia conexión.
+
+Uso: python manage.py procesar_migraciones [--procesos N] [--una-vez] [--intervalo S]
+  --una-vez: termina cuando la cola queda vacía (deploys, cron)
+"""
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from globalAdmin.migraciones import ejecutar_tarea, nombre_worker, tomar_tarea
+from globalAdmin.models import TareaMigracion
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta las migraciones de tenants encoladas desde el panel global'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=1, help='Workers en paralelo (default: 1)')
+        parser.add_argument('--una-vez', action='store_true', help='Terminar cuando no queden tareas pendientes')
+        parser.add_argument('--intervalo', type=float, default=2.0, help='Segundos entre consultas con la cola vacía (default: 2)')
+
+    def handle(self, *args, **options):
+        if options['procesos'] < 1:
+            raise CommandError('--procesos debe ser al menos 1')
+        if options['procesos'] > 1:
+            return self._lanzar_procesos(options)
+        self._trabajar(options['una_vez'], options['intervalo'])
+
+    def _lanzar_procesos(self, options):
+        comando = [sys.executable, sys.argv[0], 'procesar_migraciones',
+                   '--procesos', '1', '--intervalo', str(options['intervalo'])]
+        if options['una_vez']:
+            comando.append('--una-vez')
+        # Cada worker abre su propia conexión
+        connections.close_all()
+        procesos = [subprocess.Popen(comando) for _ in range(options['procesos'])]
+        try:
+            codigos = [proceso.wait() for proceso in procesos]
+        except KeyboardInterrupt:
+            for proceso in procesos:
+                proceso.terminate()
+            raise
+        if any(codigos):
+            raise CommandError(f'Algún worker terminó con error: {codigos}')
+
+    def _trabajar(self, una_vez, intervalo):
+        worker = nombre_worker()
+        self.stdout.write(f'Worker {worker} esperando migraciones')
+        while True:
+            tarea = tomar_tarea(worker)
+            if tarea is None:
+                if una_vez:
+                    return
+                time.sleep(intervalo)
+                continue
+
+            inicio = time.perf_counter()
+            tarea = ejecutar_tarea(tarea)
+            duracion = time.perf_counter() - inicio
+            mensaje = f'{tarea.schema_name}: {tarea.get_estado_display()} en {duracion:.1f} s'
+            if tarea.estado == TareaMigracion.COMPLETADA:
+                self.stdout.write(self.style.SUCCESS(mensaje))
+            else:
+                self.stdout.write(self.style.ERROR(mensaje))
@@ -0,0 +1,45 @@
+"""
+Comando de gestión para borrar las lápidas de la sincronización móvil
+(api_mobile.RegistroEliminado) más viejas que settings.SYNC_RETENCION_DIAS.
+
+Un cliente con un cursor anterior a la retención recibe la foto completa
+(reset), así que estas filas ya no se necesitan. Pensado para un cron diario.
+
+Uso: python manage.py purgar_registros_eliminados [--dias N]
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from api_mobile.models import RegistroEliminado
+from api_mobile.sync import SYNC_RETENCION_DIAS
+from clientManager.models import Empresa
+
+
+class Command(BaseCommand):
+    help = 'Borra en cada tenant las lápidas de sincronización más viejas que la retención'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias', type=int, default=SYNC_RETENCION_DIAS,
+            help=f'Días de retención (default: {SYNC_RETENCION_DIAS})',
+        )
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(days=options['dias'])
+        with schema_context(get_public_schema_name()):
+            schemas = list(
+                Empresa.objects.exclude(schema_name=get_public_schema_name())
+                .order_by('pk').values_list('schema_name', flat=True)
+            )
+
+        total = 0
+        for schema_name in schemas:
+            with schema_context(schema_name):
+                borrados, _ = RegistroEliminado.objects.filter(eliminado_at__lt=limite).delete()
+            total += borrados
+            self.stdout.write(f'{schema_name}: {borrados} lápidas borradas')
+
+        self.stdout.write(self.style.SUCCESS(f'Total: {total} lápidas borradas'))
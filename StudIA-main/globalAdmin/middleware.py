@@ -1,11 +1,15 @@
 """
 Middleware personalizado para manejar el schema público y la impersonación de tenants.
 """
+import logging
 from django.utils.deprecation import MiddlewareMixin
-from django_tenants.utils import schema_context, get_public_schema_name
+from django_tenants.utils import get_public_schema_name
 from django_tenants.middleware import TenantMainMiddleware
 from django_tenants.models import TenantMixin
-from clientManager.models import Empresa
+from clientManager.tenant_registry import tenant_registry
+from .tema import activar_tema
+
+logger = logging.getLogger(__name__)
 
 
 class ForcePublicSchemaMiddleware(MiddlewareMixin):
@@ -18,9 +22,7 @@ class ForcePublicSchemaMiddleware(MiddlewareMixin):
     También establece el schema público en la conexión de base de datos.
     """
     def process_request(self, request):
-        import sys
-        sys.stdout.write(f'[FORCE PUBLIC] Procesando: {request.path}\n')
-        sys.stdout.flush()
+        logger.debug('[FORCE PUBLIC] Procesando: %s', request.path)
         # Si la URL empieza con /global/, forzar el schema público
         if request.path.startswith('/global/'):
             # Primero, establecer el schema público en la conexión de base de datos
@@ -78,15 +80,25 @@ class ForcePublicSchemaMiddleware(MiddlewareMixin):
         
         # Si la respuesta es 404 en la raíz y no hay tenant, redirigir al panel global
         if response.status_code == 404 and request.path == '/':
-            import sys
-            sys.stdout.write('[FORCE PUBLIC] Detectado 404 en raíz, redirigiendo a /global/login/\n')
-            sys.stdout.flush()
+            logger.debug('[FORCE PUBLIC] Detectado 404 en raíz, redirigiendo a /global/login/')
             from django.http import HttpResponseRedirect
             return HttpResponseRedirect('/global/login/')
         
         return response
 
 
+class CachedTenantMainMiddleware(TenantMainMiddleware):
+    """
+    TenantMainMiddleware que resuelve el hostname desde el registro en memoria
+    en lugar de consultar Dominio en cada request.
+    """
+    def get_tenant(self, domain_model, hostname):
+        tenant = tenant_registry.get_by_hostname(hostname)
+        if tenant is None:
+            raise domain_model.DoesNotExist()
+        return tenant
+
+
 class PublicSchemaMiddleware(MiddlewareMixin):
     """
     Middleware que detecta si estamos en el schema público y permite
@@ -146,12 +158,11 @@ class PublicSchemaMiddleware(MiddlewareMixin):
         if hasattr(request, 'session'):
             impersonated_tenant_id = request.session.get('impersonated_tenant_id')
             if impersonated_tenant_id:
-                try:
-                    with schema_context(get_public_schema_name()):
-                        tenant = Empresa.objects.get(id_empresa=impersonated_tenant_id)
-                        request.impersonated_tenant = tenant
-                        request.is_impersonating = True
-                except Empresa.DoesNotExist:
+                tenant = tenant_registry.get_by_id(impersonated_tenant_id)
+                if tenant:
+                    request.impersonated_tenant = tenant
+                    request.is_impersonating = True
+                else:
                     request.session.pop('impersonated_tenant_id', None)
                     request.is_impersonating = False
             else:
@@ -208,7 +219,7 @@ class PublicSchemaAuthMiddleware(MiddlewareMixin):
 class TenantThemeMiddleware(MiddlewareMixin):
     """
     Middleware que agrega información del tema del tenant al request
-    y lo establece en settings para que los loaders puedan accederlo.
+    y lo establece en el contexto (globalAdmin.tema) para que los loaders puedan accederlo.
     """
     def process_request(self, request):
         # Si estamos impersonando, usar el tema del tenant impersonado
@@ -216,20 +227,17 @@ class TenantThemeMiddleware(MiddlewareMixin):
             if hasattr(request, 'impersonated_tenant') and request.impersonated_tenant:
                 theme = getattr(request.impersonated_tenant, 'tema', 'default')
                 request.tenant_theme = theme
-                from django.conf import settings
-                settings.CURRENT_TENANT_THEME = theme
+                activar_tema(theme)
                 return None
         
         # Si no estamos impersonando, usar el tema del tenant actual
         if hasattr(request, 'tenant') and request.tenant:
             theme = getattr(request.tenant, 'tema', 'default')
             request.tenant_theme = theme
-            # Establecer el tema en settings para que los loaders puedan accederlo
-            from django.conf import settings
-            settings.CURRENT_TENANT_THEME = theme
+            # Establecer el tema en el contexto del request para que los loaders puedan accederlo
+            activar_tema(theme)
         else:
             request.tenant_theme = 'default'
-            from django.conf import settings
-            settings.CURRENT_TENANT_THEME = 'default'
+            activar_tema('default')
         return None
 
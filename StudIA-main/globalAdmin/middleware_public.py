@@ -1,10 +1,12 @@
 """
 Middleware para manejar peticiones cuando no se identifica un tenant.
 """
-import sys
+import logging
 from django.http import HttpResponseRedirect, HttpResponse
 from django.utils.deprecation import MiddlewareMixin
 
+logger = logging.getLogger(__name__)
+
 
 class PublicRootMiddleware(MiddlewareMixin):
     """
@@ -17,8 +19,7 @@ class PublicRootMiddleware(MiddlewareMixin):
     def process_request(self, request):
         # Log para verificar que el middleware se ejecuta
         if request.path == '/':
-            sys.stdout.write(f'[PUBLIC ROOT] process_request ejecutado para path: {request.path}\n')
-            sys.stdout.flush()
+            logger.debug('[PUBLIC ROOT] process_request ejecutado para path: %s', request.path)
         
         # Si estamos en la raíz, verificar si estamos en el schema público
         if request.path == '/' and not request.path.startswith('/global/'):
@@ -30,22 +31,18 @@ class PublicRootMiddleware(MiddlewareMixin):
                 # Verificar el tenant actual (debe estar establecido por TenantMainMiddleware)
                 if hasattr(request, 'tenant'):
                     tenant_schema = getattr(request.tenant, 'schema_name', None)
-                    sys.stdout.write(f'[PUBLIC ROOT] Tenant schema: {tenant_schema}, Path: {request.path}\n')
-                    sys.stdout.flush()
+                    logger.debug('[PUBLIC ROOT] Tenant schema: %s, Path: %s', tenant_schema, request.path)
                     
                     # Si estamos en el schema público o no hay tenant, redirigir inmediatamente
                     if tenant_schema == public_schema or tenant_schema is None:
-                        sys.stdout.write('[PUBLIC ROOT] Redirigiendo a /global/login/ (process_request)\n')
-                        sys.stdout.flush()
+                        logger.debug('[PUBLIC ROOT] Redirigiendo a /global/login/ (process_request)')
                         return HttpResponseRedirect('/global/login/')
                 else:
                     # No hay tenant, redirigir al panel global
-                    sys.stdout.write('[PUBLIC ROOT] No hay tenant, redirigiendo a /global/login/ (process_request)\n')
-                    sys.stdout.flush()
+                    logger.debug('[PUBLIC ROOT] No hay tenant, redirigiendo a /global/login/ (process_request)')
                     return HttpResponseRedirect('/global/login/')
             except Exception as e:
-                sys.stdout.write(f'[PUBLIC ROOT] ERROR en process_request: {str(e)}\n')
-                sys.stdout.flush()
+                logger.error('[PUBLIC ROOT] ERROR en process_request: %s', e)
                 # En caso de error, marcar para verificar después
                 request._check_public_root = True
         
@@ -55,9 +52,7 @@ class PublicRootMiddleware(MiddlewareMixin):
         # Si la respuesta es 404 o 500 en la raíz, verificar si es porque no hay tenant
         if (response.status_code in [404, 500] and request.path == '/' and 
             hasattr(request, '_check_public_root')):
-            import sys
-            sys.stdout.write(f'[PUBLIC ROOT] Detectado {response.status_code} en raíz\n')
-            sys.stdout.flush()
+            logger.debug('[PUBLIC ROOT] Detectado %s en raíz', response.status_code)
             
             # Verificar si no se identificó un tenant o si estamos en el schema público
             from django_tenants.utils import get_public_schema_name
@@ -67,21 +62,17 @@ class PublicRootMiddleware(MiddlewareMixin):
                 # Verificar el tenant actual
                 if hasattr(request, 'tenant'):
                     tenant_schema = getattr(request.tenant, 'schema_name', None)
-                    sys.stdout.write(f'[PUBLIC ROOT] Tenant schema: {tenant_schema}\n')
-                    sys.stdout.flush()
+                    logger.debug('[PUBLIC ROOT] Tenant schema: %s', tenant_schema)
                     
                     # Si estamos en el schema público o no hay tenant, redirigir
                     if tenant_schema == public_schema or tenant_schema is None:
-                        sys.stdout.write('[PUBLIC ROOT] Redirigiendo a /global/login/\n')
-                        sys.stdout.flush()
+                        logger.debug('[PUBLIC ROOT] Redirigiendo a /global/login/')
                         return HttpResponseRedirect('/global/login/')
                 else:
-                    sys.stdout.write('[PUBLIC ROOT] No hay tenant, redirigiendo a /global/login/\n')
-                    sys.stdout.flush()
+                    logger.debug('[PUBLIC ROOT] No hay tenant, redirigiendo a /global/login/')
                     return HttpResponseRedirect('/global/login/')
             except Exception as e:
-                sys.stdout.write(f'[PUBLIC ROOT] ERROR: {str(e)}\n')
-                sys.stdout.flush()
+                logger.error('[PUBLIC ROOT] ERROR: %s', e)
                 # En caso de error, intentar redirigir de todas formas
                 return HttpResponseRedirect('/global/login/')
         
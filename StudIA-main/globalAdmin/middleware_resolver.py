@@ -0,0 +1,201 @@
+"""
+Middleware único para resolver tenant, schema, tema e impersonación.
+
+Reemplaza la cadena ApiMobileTenantMiddleware -> ForcePublicSchemaMiddleware ->
+TenantParamMiddleware -> TenantMainMiddleware -> PublicRootMiddleware ->
+PublicSchemaMiddleware -> TenantThemeMiddleware -> PublicSchemaAuthMiddleware.
+Esa cadena cambiaba el schema de la conexión varias veces por request,
+reescribía HTTP_HOST y parchaba request.get_host para engañar a
+TenantMainMiddleware. Aquí se decide todo en una sola pasada, leyendo del
+registro en memoria, y se fija el search_path una única vez.
+
+Debe ejecutarse DESPUÉS de SessionMiddleware (lee tenant_schema_name e
+impersonated_tenant_id de la sesión) y ANTES de AuthenticationMiddleware.
+"""
+import logging
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponseRedirect, JsonResponse
+from django.urls import set_urlconf
+from django.utils.deprecation import MiddlewareMixin
+from django_tenants.postgresql_backend.base import DatabaseWrapper, FakeTenant
+from django_tenants.utils import get_public_schema_name, remove_www
+
+from clientManager.tenant_registry import tenant_registry
+from .tema import TEMA_POR_DEFECTO, activar_tema
+
+logger = logging.getLogger(__name__)
+
+
+# Hosts donde el tenant se identifica por ?tenant=, /tenant/<slug>/ o la sesión
+# en lugar de por subdominio (mismo criterio que TenantParamMiddleware)
+MAIN_HOST_PREFIXES = ('studia-8dmp.onrender.com', 'localhost')
+
+GLOBAL_ADMIN_BACKEND = 'globalAdmin.backends.AdministradorGlobalBackend'
+
+
+class TenantResolverMiddleware(MiddlewareMixin):
+    """
+    Decide en una pasada:
+    - request.tenant y el schema de la conexión
+    - request.urlconf (público o del tenant)
+    - request.is_public_schema, request.is_impersonating, request.impersonated_tenant
+    - request.tenant_theme
+    """
+
+    def _public_tenant(self):
+        public_schema = get_public_schema_name()
+        tenant = tenant_registry.get_by_schema(public_schema, case_sensitive=True)
+        if tenant is None:
+            tenant = FakeTenant(schema_name=public_schema)
+            tenant.auto_create_schema = False
+            tenant.auto_drop_schema = False
+        return tenant
+
+    def _hostname(self, request):
+        return remove_www(request.get_host().split(':')[0])
+
+    def _resolve_api_mobile(self, request):
+        """Header X-Tenant-Schema > ?tenant=/?schema= > hostname > tenant por defecto."""
+        tenant_schema = request.headers.get('X-Tenant-Schema')
+        if not tenant_schema:
+            tenant_schema = request.GET.get('tenant') or request.GET.get('schema')
+        if tenant_schema:
+            return tenant_schema, tenant_registry.get_by_schema(tenant_schema, case_sensitive=True)
+
+        tenant = tenant_registry.get_by_hostname(self._hostname(request))
+        if tenant is None:
+            tenant = tenant_registry.get_default()
+        return (tenant.schema_name if tenant else None), tenant
+
+    def _resolve_web(self, request):
+        """Subdominio del tenant o, en el host principal, parámetro/path/sesión."""
+        host = request.get_host()
+        if not host.startswith(MAIN_HOST_PREFIXES):
+            return tenant_registry.get_by_hostname(self._hostname(request))
+
+        tenant = None
+        tenant_param = request.GET.get('tenant')
+        if tenant_param:
+            tenant = tenant_registry.get_by_schema(tenant_param)
+        elif request.path.startswith('/tenant/'):
+            path_parts = request.path.split('/')
+            if len(path_parts) >= 3:
+                tenant = tenant_registry.get_by_slug(path_parts[2])
+        if tenant is None and hasattr(request, 'session'):
+            tenant = tenant_registry.get_by_schema(request.session.get('tenant_schema_name'))
+
+        if tenant is not None:
+            if hasattr(request, 'session') and request.session.get('tenant_schema_name') != tenant.schema_name:
+                request.session['tenant_schema_name'] = tenant.schema_name
+            return tenant
+
+        return tenant_registry.get_by_hostname(self._hostname(request))
+
+    def _clear_tenant_auth(self, request):
+        """En /global/ solo se aceptan sesiones del administrador global."""
+        if not hasattr(request, 'session'):
+            return
+        if 'tenant_schema_name' in request.session:
+            del request.session['tenant_schema_name']
+        user_backend = request.session.get('_auth_user_backend', '')
+        if user_backend and user_backend != GLOBAL_ADMIN_BACKEND:
+            request.session.pop('_auth_user_id', None)
+            request.session.pop('_auth_user_backend', None)
+            request.session.pop('_auth_user_hash', None)
+            if hasattr(request, '_cached_user'):
+                delattr(request, '_cached_user')
+
+    def _set_impersonation(self, request):
+        request.is_impersonating = False
+        if not hasattr(request, 'session'):
+            return
+        impersonated_tenant_id = request.session.get('impersonated_tenant_id')
+        if not impersonated_tenant_id:
+            return
+        tenant = tenant_registry.get_by_id(impersonated_tenant_id)
+        if tenant is None:
+            request.session.pop('impersonated_tenant_id', None)
+            return
+        request.impersonated_tenant = tenant
+        request.is_impersonating = True
+
+    def _set_theme(self, request):
+        if request.is_impersonating:
+            theme = getattr(request.impersonated_tenant, 'tema', 'default')
+        elif getattr(request, 'tenant', None) is not None:
+            theme = getattr(request.tenant, 'tema', 'default')
+        else:
+            theme = 'default'
+        request.tenant_theme = theme
+        # Los loaders de templates y estáticos leen el tema del contexto del
+        # request. Se fija en cada request, sin token: con ASGI process_request
+        # y process_response corren en copias distintas del contexto y
+        # ContextVar.reset() no acepta un token de otra copia
+        activar_tema(theme)
+
+    def _activate(self, request, tenant, force_public):
+        """Único punto donde se cambia el schema de la conexión y el urlconf."""
+        public_schema = get_public_schema_name()
+        if isinstance(connection, DatabaseWrapper):
+            if tenant is None or tenant.schema_name == public_schema:
+                connection.set_schema_to_public()
+            else:
+                connection.set_tenant(tenant)
+
+        if force_public or tenant is None or tenant.schema_name == public_schema:
+            if hasattr(settings, 'PUBLIC_SCHEMA_URLCONF'):
+                request.urlconf = settings.PUBLIC_SCHEMA_URLCONF
+                set_urlconf(request.urlconf)
+
+    def process_request(self, request):
+        path = request.path
+        public_schema = get_public_schema_name()
+
+        if path.startswith('/global/'):
+            tenant = self._public_tenant()
+            request.tenant = tenant
+            self._clear_tenant_auth(request)
+            self._activate(request, tenant, force_public=True)
+
+        elif path.startswith('/api/mobile/'):
+            tenant_schema, tenant = self._resolve_api_mobile(request)
+            if tenant is None and request.method != 'OPTIONS':
+                logger.error("[API Mobile] ERROR: Tenant '%s' no encontrado", tenant_schema)
+                return JsonResponse({
+                    'success': False,
+                    'error': f'Tenant con schema "{tenant_schema}" no encontrado'
+                }, status=404)
+            if tenant is not None:
+                tenant.domain_url = self._hostname(request)
+                request.tenant = tenant
+            # Las vistas de la API usan schema_context; el urlconf raíz ya incluye api/mobile/
+            self._activate(request, tenant, force_public=False)
+
+        else:
+            tenant = self._resolve_web(request)
+            if tenant is not None:
+                tenant.domain_url = self._hostname(request)
+                request.tenant = tenant
+            self._activate(request, tenant, force_public=tenant is None)
+
+            # Sin tenant (o en el público) la raíz va directo al panel global
+            if path == '/' and (tenant is None or tenant.schema_name == public_schema):
+                return HttpResponseRedirect('/global/login/')
+
+        request.is_public_schema = (
+            hasattr(request, 'tenant') and request.tenant.schema_name == public_schema
+        )
+        self._set_impersonation(request)
+        self._set_theme(request)
+        return None
+
+    def process_response(self, request, response):
+        # Que el hilo del worker no quede con el tema de este tenant
+        activar_tema(TEMA_POR_DEFECTO)
+
+        # Si la raíz responde 404 es porque no hay tenant: redirigir al panel global
+        if response.status_code == 404 and request.path == '/':
+            return HttpResponseRedirect('/global/login/')
+        return response
@@ -2,10 +2,13 @@
 Middleware para detectar el tenant desde un parámetro de URL.
 Útil cuando no se pueden usar subdominios (como en Render.com).
 """
-import sys
+import logging
 from django.utils.deprecation import MiddlewareMixin
 from django_tenants.utils import get_public_schema_name, schema_context
 from clientManager.models import Empresa, Dominio
+from clientManager.tenant_registry import tenant_registry
+
+logger = logging.getLogger(__name__)
 
 
 class TenantParamMiddleware(MiddlewareMixin):
@@ -43,12 +46,9 @@ class TenantParamMiddleware(MiddlewareMixin):
             if len(path_parts) >= 3 and path_parts[1] == 'tenant':
                 tenant_slug = path_parts[2]
                 # Buscar tenant por slug (nombre normalizado)
-                try:
-                    with schema_context(get_public_schema_name()):
-                        tenant = Empresa.objects.get(schema_name__iexact=tenant_slug.replace('-', ' '))
-                        tenant_param = tenant.schema_name
-                except (Empresa.DoesNotExist, Empresa.MultipleObjectsReturned):
-                    pass
+                tenant = tenant_registry.get_by_slug(tenant_slug)
+                if tenant:
+                    tenant_param = tenant.schema_name
         
         # 3. Intentar leer desde la sesión (si ya se estableció antes y la sesión está disponible)
         if not tenant_param and hasattr(request, 'session'):
@@ -56,109 +56,100 @@ class TenantParamMiddleware(MiddlewareMixin):
         
         if tenant_param:
             try:
-                with schema_context(get_public_schema_name()):
-                    # Buscar el tenant por schema_name (case-insensitive)
-                    try:
-                        tenant = Empresa.objects.get(schema_name__iexact=tenant_param)
-                    except Empresa.DoesNotExist:
-                        # Si no se encuentra con iexact, intentar exacto
-                        tenant = Empresa.objects.get(schema_name=tenant_param)
-                    
-                    # Lista de tenants que deben usar el método de parámetro de query (sin modificar hostname)
-                    # Estos tenants no tienen subdominios funcionales en Render.com
-                    # Normalizar a minúsculas para comparación case-insensitive
-                    tenants_con_parametro = ['duoc uc', 'inacap']
-                    schema_name_lower = tenant.schema_name.lower()
-                    nombre_empresa_lower = tenant.nombre_empresa.lower() if tenant.nombre_empresa else ''
-                    
-                    # Verificar si el tenant debe usar el método de parámetro de query (case-insensitive)
-                    usar_parametro = (
-                        schema_name_lower in tenants_con_parametro or 
-                        nombre_empresa_lower in tenants_con_parametro
-                    )
+                # Buscar el tenant por schema_name (exacto y luego case-insensitive)
+                tenant = tenant_registry.get_by_schema(tenant_param)
+                if tenant is None:
+                    raise Empresa.DoesNotExist
+                
+                # Lista de tenants que deben usar el método de parámetro de query (sin modificar hostname)
+                # Estos tenants no tienen subdominios funcionales en Render.com
+                # Normalizar a minúsculas para comparación case-insensitive
+                tenants_con_parametro = ['duoc uc', 'inacap']
+                schema_name_lower = tenant.schema_name.lower()
+                nombre_empresa_lower = tenant.nombre_empresa.lower() if tenant.nombre_empresa else ''
+                
+                # Verificar si el tenant debe usar el método de parámetro de query (case-insensitive)
+                usar_parametro = (
+                    schema_name_lower in tenants_con_parametro or 
+                    nombre_empresa_lower in tenants_con_parametro
+                )
+                
+                if usar_parametro:
+                    # Para estos tenants, necesitamos modificar el hostname para que TenantMainMiddleware lo reconozca
+                    # Primero intentar usar un dominio existente del tenant
+                    dominio = tenant_registry.get_primary_domain(tenant)
                     
-                    if usar_parametro:
-                        # Para estos tenants, necesitamos modificar el hostname para que TenantMainMiddleware lo reconozca
-                        # Primero intentar usar un dominio existente del tenant
-                        dominio = tenant.domains.filter(is_primary=True).first()
+                    if not dominio:
+                        # Si no hay dominio, crear uno temporal basado en el schema_name
+                        dominio_temporal = tenant.schema_name.lower().replace(' ', '-').replace('_', '-')
+                        dominio_domain = f"{dominio_temporal}.studia-8dmp.onrender.com"
                         
-                        if not dominio:
-                            # Si no hay dominio, crear uno temporal basado en el schema_name
-                            dominio_temporal = tenant.schema_name.lower().replace(' ', '-').replace('_', '-')
-                            dominio_domain = f"{dominio_temporal}.studia-8dmp.onrender.com"
-                            
-                            # Verificar si este dominio ya existe en la BD
-                            dominio_existente = tenant.domains.filter(domain__iexact=dominio_domain).first()
-                            
-                            if not dominio_existente:
-                                # Crear el dominio temporalmente en la BD para que TenantMainMiddleware lo reconozca
-                                # Esto es necesario porque TenantMainMiddleware busca dominios en la BD
-                                try:
-                                    dominio_existente = Dominio.objects.create(
+                        # Verificar si este dominio ya existe (el registro conoce todos los dominios)
+                        dominio_existente = tenant_registry.get_by_hostname(dominio_domain) is not None
+                        
+                        if not dominio_existente:
+                            # Crear el dominio temporalmente en la BD para que TenantMainMiddleware lo reconozca
+                            # Esto es necesario porque TenantMainMiddleware busca dominios en la BD
+                            try:
+                                with schema_context(get_public_schema_name()):
+                                    Dominio.objects.create(
                                         domain=dominio_domain,
                                         tenant=tenant,
                                         is_primary=True
                                     )
-                                    sys.stdout.write(f'[TENANT PARAM] Dominio temporal creado en BD: {dominio_domain}\n')
-                                    sys.stdout.flush()
-                                except Exception as e:
-                                    sys.stdout.write(f'[TENANT PARAM] Error al crear dominio temporal: {str(e)}\n')
-                                    sys.stdout.flush()
-                                    # Si falla, usar el dominio temporal de todas formas
-                            
-                            dominio_domain = dominio_existente.domain if dominio_existente else dominio_domain
-                        else:
-                            dominio_domain = dominio.domain
-                        
+                                # El registro debe ver el dominio nuevo en el siguiente request
+                                tenant_registry.invalidate()
+                                logger.debug('[TENANT PARAM] Dominio temporal creado en BD: %s', dominio_domain)
+                            except Exception as e:
+                                logger.error('[TENANT PARAM] Error al crear dominio temporal: %s', e)
+                                # Si falla, usar el dominio temporal de todas formas
+                    else:
+                        dominio_domain = dominio
+                    
+                    # Guardar el hostname original
+                    request._original_host = host
+                    
+                    # Modificar el hostname para que TenantMainMiddleware lo detecte
+                    # Aunque el dominio no sea funcional en DNS, TenantMainMiddleware lo reconocerá desde la BD
+                    request.META['HTTP_HOST'] = dominio_domain
+                    request.META['SERVER_NAME'] = dominio_domain.split(':')[0]  # Sin puerto
+                    
+                    # También establecer el tenant directamente para asegurar que esté disponible
+                    from django.db import connection
+                    request.tenant = tenant
+                    connection.set_tenant(tenant)
+                    
+                    # Guardar el tenant en la sesión para mantenerlo en requests posteriores
+                    if hasattr(request, 'session'):
+                        request.session['tenant_schema_name'] = tenant.schema_name
+                    
+                    logger.debug('[TENANT PARAM] Tenant detectado: %s via parámetro', tenant.schema_name)
+                    logger.debug('[TENANT PARAM] Hostname modificado a: %s (solo para TenantMainMiddleware)', dominio_domain)
+                else:
+                    # Para otros tenants, usar el método original con modificación de hostname
+                    dominio = tenant_registry.get_primary_domain(tenant)
+                    
+                    if dominio:
                         # Guardar el hostname original
                         request._original_host = host
                         
-                        # Modificar el hostname para que TenantMainMiddleware lo detecte
-                        # Aunque el dominio no sea funcional en DNS, TenantMainMiddleware lo reconocerá desde la BD
-                        request.META['HTTP_HOST'] = dominio_domain
-                        request.META['SERVER_NAME'] = dominio_domain.split(':')[0]  # Sin puerto
-                        
-                        # También establecer el tenant directamente para asegurar que esté disponible
-                        from django.db import connection
-                        request.tenant = tenant
-                        connection.set_tenant(tenant)
-                        
                         # Guardar el tenant en la sesión para mantenerlo en requests posteriores
                         if hasattr(request, 'session'):
                             request.session['tenant_schema_name'] = tenant.schema_name
                         
-                        sys.stdout.write(f'[TENANT PARAM] Tenant detectado: {tenant.schema_name} via parámetro\n')
-                        sys.stdout.write(f'[TENANT PARAM] Hostname modificado a: {dominio_domain} (solo para TenantMainMiddleware)\n')
-                        sys.stdout.flush()
-                    else:
-                        # Para otros tenants, usar el método original con modificación de hostname
-                        dominio = tenant.domains.filter(is_primary=True).first()
-                        
-                        if dominio:
-                            # Guardar el hostname original
-                            request._original_host = host
-                            
-                            # Guardar el tenant en la sesión para mantenerlo en requests posteriores
-                            if hasattr(request, 'session'):
-                                request.session['tenant_schema_name'] = tenant.schema_name
-                            
-                            # Modificar el hostname para que TenantMainMiddleware lo detecte
-                            request.META['HTTP_HOST'] = dominio.domain
-                            request.META['SERVER_NAME'] = dominio.domain.split(':')[0]  # Sin puerto
-                            
-                            sys.stdout.write(f'[TENANT PARAM] Tenant detectado: {tenant.schema_name} via parámetro/sesión\n')
-                            sys.stdout.write(f'[TENANT PARAM] Hostname modificado a: {dominio.domain}\n')
-                            sys.stdout.flush()
-                        else:
-                            sys.stdout.write(f'[TENANT PARAM] Tenant {tenant.schema_name} no tiene dominio configurado\n')
-                            sys.stdout.flush()
+                        # Modificar el hostname para que TenantMainMiddleware lo detecte
+                        request.META['HTTP_HOST'] = dominio
+                        request.META['SERVER_NAME'] = dominio.split(':')[0]  # Sin puerto
                         
+                        logger.debug('[TENANT PARAM] Tenant detectado: %s via parámetro/sesión', tenant.schema_name)
+                        logger.debug('[TENANT PARAM] Hostname modificado a: %s', dominio)
+                    else:
+                        logger.debug('[TENANT PARAM] Tenant %s no tiene dominio configurado', tenant.schema_name)
+                    
             except Empresa.DoesNotExist:
-                sys.stdout.write(f'[TENANT PARAM] Tenant no encontrado: {tenant_param}\n')
-                sys.stdout.flush()
+                logger.warning('[TENANT PARAM] Tenant no encontrado: %s', tenant_param)
             except Exception as e:
-                sys.stdout.write(f'[TENANT PARAM] Error: {str(e)}\n')
-                sys.stdout.flush()
+                logger.error('[TENANT PARAM] Error: %s', e)
         
         return None
 
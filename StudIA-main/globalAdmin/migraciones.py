@@ -0,0 +1,216 @@
+"""
+Cola de migraciones de tenants respaldada en la base de datos.
+
+El panel global encola una TareaMigracion por schema (encolar_migracion,
+encolar_todos) y responde de inmediato; el comando procesar_migraciones toma
+las tareas con SELECT ... FOR UPDATE SKIP LOCKED, así varios workers (o
+--procesos N) migran schemas distintos en paralelo sin tomar la misma tarea
+dos veces ni migrar el mismo schema a la vez.
+
+La salida de migrate_schemas se captura con la señal schema_migrate_message de
+django-tenants, sin reemplazar sys.stdout/sys.stderr (que es global al
+proceso y mezclaba la salida de los demás hilos).
+
+Una tarea en curso cuyo worker murió se vuelve a tomar después de
+settings.MIGRACIONES_TIMEOUT_MINUTOS.
+
+"Migrar todos" también migra el schema plantilla (globalAdmin/plantilla.py)
+desde el que se clonan los tenants nuevos.
+"""
+import contextlib
+import logging
+import os
+import socket
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import Q
+from django.utils import timezone
+from django_tenants.signals import schema_migrate_message
+from django_tenants.utils import get_public_schema_name, schema_context, schema_exists
+
+from clientManager.models import Empresa
+from .models import TareaMigracion
+
+logger = logging.getLogger(__name__)
+
+MIGRACIONES_TIMEOUT_MINUTOS = getattr(settings, 'MIGRACIONES_TIMEOUT_MINUTOS', 60)
+PLANTILLA_SCHEMA = getattr(settings, 'TENANT_PLANTILLA_SCHEMA', '')
+
+
+def nombre_worker():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def encolar_migracion(schema_name, lote='', solicitada_por=''):
+    """
+    Encola la migración de un schema. Si ya hay una pendiente para ese schema
+    la retorna en lugar de crear otra.
+    """
+    with schema_context(get_public_schema_name()):
+        pendiente = TareaMigracion.objects.filter(
+            schema_name=schema_name, estado=TareaMigracion.PENDIENTE
+        ).first()
+        if pendiente is not None:
+            return pendiente
+        return TareaMigracion.objects.create(
+            schema_name=schema_name, lote=lote, solicitada_por=solicitada_por
+        )
+
+
+def encolar_todos(solicitada_por=''):
+    """
+    Encola una migración por cada tenant (sin el público) y, primero, la de la
+    plantilla. Retorna el id del lote.
+    """
+    lote = uuid.uuid4().hex
+    with schema_context(get_public_schema_name()):
+        schemas = list(
+            Empresa.objects.exclude(schema_name=get_public_schema_name())
+            .order_by('pk').values_list('schema_name', flat=True)
+        )
+    if PLANTILLA_SCHEMA:
+        schemas.insert(0, PLANTILLA_SCHEMA)
+    for schema_name in schemas:
+        encolar_migracion(schema_name, lote=lote, solicitada_por=solicitada_por)
+    return lote
+
+
+def tomar_tarea(worker):
+    """
+    Marca como en curso la tarea pendiente más antigua (o una en curso cuyo
+    worker dejó de responder) y la retorna; None si no hay trabajo.
+    """
+    with schema_context(get_public_schema_name()):
+        limite = timezone.now() - timedelta(minutes=MIGRACIONES_TIMEOUT_MINUTOS)
+        with transaction.atomic():
+            en_curso = TareaMigracion.objects.filter(
+                estado=TareaMigracion.EN_CURSO, iniciada_at__gte=limite
+            ).values('schema_name')
+            tarea = (
+                TareaMigracion.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(estado=TareaMigracion.PENDIENTE)
+                    | Q(estado=TareaMigracion.EN_CURSO, iniciada_at__lt=limite)
+                )
+                # Un schema se migra de a uno
+                .exclude(schema_name__in=en_curso)
+                .order_by('creada_at')
+                .first()
+            )
+            if tarea is None:
+                return None
+            tarea.estado = TareaMigracion.EN_CURSO
+            tarea.worker = worker
+            tarea.iniciada_at = timezone.now()
+            tarea.terminada_at = None
+            tarea.save(update_fields=['estado', 'worker', 'iniciada_at', 'terminada_at'])
+            return tarea
+
+
+def migrar_schema(schema_name, lineas):
+    """
+    Crea el schema si no existe y ejecuta migrate_schemas --run-syncdb
+    (crea las tablas de apps sin migraciones y aplica las migraciones).
+    Agrega la salida del comando a `lineas`, también si falla.
+    """
+    from .plantilla import bloqueo_plantilla
+
+    def capturar(sender, message, **kwargs):
+        lineas.append(message)
+
+    # Nadie clona la plantilla mientras se migra
+    bloqueo = bloqueo_plantilla() if schema_name == PLANTILLA_SCHEMA else contextlib.nullcontext()
+    with bloqueo:
+        if not schema_exists(schema_name):
+            with connection.cursor() as cursor:
+                cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{schema_name}"')
+            lineas.append(f'Schema "{schema_name}" creado.')
+
+        schema_migrate_message.connect(capturar, weak=False)
+        try:
+            call_command('migrate_schemas', '--schema', schema_name, '--run-syncdb',
+                         interactive=False, verbosity=1)
+        finally:
+            schema_migrate_message.disconnect(capturar)
+            connection.set_schema_to_public()
+
+
+def migraciones_esperadas(app_names):
+    """
+    Migraciones en disco de las apps indicadas: ({(app_label, nombre)},
+    {squash: migraciones que reemplaza}).
+    """
+    labels = {config.label for config in apps.get_app_configs() if config.name in app_names}
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    esperadas = {clave for clave in loader.disk_migrations if clave[0] in labels}
+    squashes = {
+        clave: {tuple(reemplazada) for reemplazada in migracion.replaces}
+        for clave, migracion in loader.replacements.items() if clave in esperadas
+    }
+    return esperadas, squashes
+
+
+def _aplicadas(schema_name):
+    """Migraciones registradas en <schema>.django_migrations; None si la tabla no existe."""
+    nombre_tabla = connection.ops.quote_name(schema_name) + '.django_migrations'
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'SELECT app, name FROM {nombre_tabla}')
+            return set(cursor.fetchall())
+    except DatabaseError:
+        return None
+
+
+def migraciones_pendientes(schema_name, esperadas, squashes):
+    """Cantidad de migraciones sin aplicar en el schema (una query)."""
+    aplicadas = _aplicadas(schema_name)
+    if aplicadas is None:
+        return len(esperadas)
+    # Un squash equivale a todas las que reemplaza, y viceversa
+    for squash, reemplazadas in squashes.items():
+        if squash in aplicadas:
+            aplicadas |= reemplazadas
+        elif reemplazadas <= aplicadas:
+            aplicadas.add(squash)
+    return len(esperadas - aplicadas)
+
+
+def ejecutar_tarea(tarea):
+    """Ejecuta la migración de una tarea ya tomada y guarda el resultado."""
+    logger.info("Migrando schema %s (tarea %s)", tarea.schema_name, tarea.pk)
+    lineas = []
+    try:
+        migrar_schema(tarea.schema_name, lineas)
+        tarea.estado = TareaMigracion.COMPLETADA
+        tarea.error = ''
+    except Exception:
+        logger.exception("Error al migrar el schema %s", tarea.schema_name)
+        tarea.estado = TareaMigracion.ERROR
+        tarea.error = traceback.format_exc()
+    tarea.salida = '\n'.join(lineas)
+    tarea.terminada_at = timezone.now()
+    with schema_context(get_public_schema_name()):
+        tarea.save(update_fields=['salida', 'estado', 'error', 'terminada_at'])
+    return tarea
+
+
+def resumen(tareas):
+    """Conteo por estado para el panel (progreso de un lote)."""
+    conteo = {estado: 0 for estado, _ in TareaMigracion.ESTADOS}
+    for tarea in tareas:
+        conteo[tarea.estado] += 1
+    total = sum(conteo.values())
+    terminadas = conteo[TareaMigracion.COMPLETADA] + conteo[TareaMigracion.ERROR]
+    return {
+        'total': total,
+        'terminadas': terminadas,
+        'por_estado': conteo,
+        'finalizado': total > 0 and terminadas == total,
+    }
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.2 on 2026-10-18 19:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TareaMigracion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('schema_name', models.CharField(max_length=63)),
+                ('lote', models.CharField(blank=True, db_index=True, max_length=32)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_curso', 'En curso'), ('completada', 'Completada'), ('error', 'Error')], default='pendiente', max_length=12)),
+                ('solicitada_por', models.CharField(blank=True, max_length=254)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('salida', models.TextField(blank=True)),
+                ('error', models.TextField(blank=True)),
+                ('creada_at', models.DateTimeField(auto_now_add=True)),
+                ('iniciada_at', models.DateTimeField(blank=True, null=True)),
+                ('terminada_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Tarea de migración',
+                'verbose_name_plural': 'Tareas de migración',
+                'ordering': ['-creada_at'],
+                'indexes': [models.Index(fields=['estado', 'creada_at'], name='tareamigracion_estado_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.2 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('globalAdmin', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Feriado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(db_index=True)),
+                ('nombre', models.CharField(max_length=200)),
+                ('tipo', models.CharField(blank=True, max_length=50)),
+                ('inalienable', models.BooleanField(default=False)),
+                ('extra', models.CharField(blank=True, max_length=200)),
+                ('actualizado_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Feriado',
+                'verbose_name_plural': 'Feriados',
+                'ordering': ['fecha'],
+            },
+        ),
+    ]
@@ -1,3 +1,69 @@
 from django.db import models
 
-# Create your models here.
+
+class TareaMigracion(models.Model):
+    """
+    Migración de un schema encolada desde el panel global. La ejecuta el
+    comando procesar_migraciones (globalAdmin/migraciones.py), fuera del
+    request; el panel consulta el estado y la salida.
+    """
+    PENDIENTE = 'pendiente'
+    EN_CURSO = 'en_curso'
+    COMPLETADA = 'completada'
+    ERROR = 'error'
+    ESTADOS = [
+        (PENDIENTE, 'Pendiente'),
+        (EN_CURSO, 'En curso'),
+        (COMPLETADA, 'Completada'),
+        (ERROR, 'Error'),
+    ]
+
+    schema_name = models.CharField(max_length=63)
+    # Agrupa las tareas encoladas juntas con "Migrar todos"
+    lote = models.CharField(max_length=32, blank=True, db_index=True)
+    estado = models.CharField(max_length=12, choices=ESTADOS, default=PENDIENTE)
+    solicitada_por = models.CharField(max_length=254, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    salida = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    creada_at = models.DateTimeField(auto_now_add=True)
+    iniciada_at = models.DateTimeField(null=True, blank=True)
+    terminada_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Tarea de migración"
+        verbose_name_plural = "Tareas de migración"
+        ordering = ['-creada_at']
+        indexes = [
+            models.Index(fields=['estado', 'creada_at'], name='tareamigracion_estado_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.schema_name} ({self.get_estado_display()})"
+
+    @property
+    def duracion(self):
+        if self.iniciada_at and self.terminada_at:
+            return (self.terminada_at - self.iniciada_at).total_seconds()
+        return None
+
+
+class Feriado(models.Model):
+    """
+    Feriado nacional descargado de la API de feriados (globalAdmin/feriados.py).
+    Vive en el schema público y lo comparten todos los tenants.
+    """
+    fecha = models.DateField(db_index=True)
+    nombre = models.CharField(max_length=200)
+    tipo = models.CharField(max_length=50, blank=True)
+    inalienable = models.BooleanField(default=False)
+    extra = models.CharField(max_length=200, blank=True)
+    actualizado_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Feriado"
+        verbose_name_plural = "Feriados"
+        ordering = ['fecha']
+
+    def __str__(self):
+        return f"{self.fecha} {self.nombre}"
@@ -0,0 +1,105 @@
+"""
+Schema plantilla para crear tenants sin recorrer el historial de migraciones.
+
+settings.TENANT_PLANTILLA_SCHEMA es un schema que no pertenece a ninguna
+Empresa y se mantiene migrado a head: migrate_all_tenants y "migrar todos" del
+panel lo migran junto con los tenants. crear_schema_tenant() lo copia en el
+servidor con la función clone_schema de django-tenants (tablas, índices, FK,
+secuencias y las filas que dejan las migraciones, incluida django_migrations),
+así crear un tenant cuesta lo mismo tenga la app 10 o 200 migraciones.
+
+Antes de clonar se verifica con una query que la plantilla esté al día. Si no
+lo está (un deploy sin migrate_all_tenants) la plantilla no se migra dentro de
+la creación del tenant: se encola su migración (globalAdmin/migraciones.py) y
+ese tenant se migra desde cero. Un advisory lock de sesión impide clonar la
+plantilla mientras otro proceso la migra; la verificación y el clon corren en
+la misma sesión que tomó el lock.
+
+Con TENANT_PLANTILLA_SCHEMA vacío el schema del tenant se crea y se migra
+desde cero, como antes.
+"""
+import functools
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django_tenants.clone import CloneSchema
+from django_tenants.postgresql_backend.base import _check_schema_name
+
+from .migraciones import (
+    PLANTILLA_SCHEMA,
+    encolar_migracion,
+    migraciones_esperadas,
+    migraciones_pendientes,
+    migrar_schema,
+)
+
+# Clave del advisory lock de la plantilla ("STUDIA" + 1)
+_LOCK_PLANTILLA = 0x535455444941_0001
+
+
+@contextmanager
+def bloqueo_plantilla():
+    """
+    Serializa las migraciones y los clones de la plantilla entre procesos.
+
+    El lock es de la sesión: migrate_schemas cierra la conexión al terminar y
+    con ella se libera. En ese caso no se desbloquea en la sesión nueva.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_lock(%s)', [_LOCK_PLANTILLA])
+    sesion = connection.connection
+    try:
+        yield
+    finally:
+        if connection.connection is sesion:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [_LOCK_PLANTILLA])
+
+
+@functools.cache
+def _esperadas_tenant():
+    # Las migraciones en disco no cambian mientras vive el proceso
+    return migraciones_esperadas(settings.TENANT_APPS)
+
+
+def actualizar_plantilla(lineas):
+    """
+    Crea y migra la plantilla si le faltan migraciones. Retorna cuántas le
+    faltaban (0 si ya estaba al día).
+    """
+    pendientes = migraciones_pendientes(PLANTILLA_SCHEMA, *_esperadas_tenant())
+    if pendientes:
+        migrar_schema(PLANTILLA_SCHEMA, lineas)
+    return pendientes
+
+
+def crear_schema_tenant(schema_name, lineas):
+    """
+    Crea el schema de un tenant nuevo clonando la plantilla (o migrándolo desde
+    cero si no hay plantilla configurada o está atrasada). Agrega el detalle a
+    `lineas`.
+    """
+    _check_schema_name(schema_name)
+    if not PLANTILLA_SCHEMA:
+        migrar_schema(schema_name, lineas)
+        return
+
+    # Nada de lo que corre con el lock cierra la conexión
+    with bloqueo_plantilla():
+        pendientes = migraciones_pendientes(PLANTILLA_SCHEMA, *_esperadas_tenant())
+        if not pendientes:
+            try:
+                CloneSchema().clone_schema(PLANTILLA_SCHEMA, schema_name)
+            finally:
+                connection.set_schema_to_public()
+
+    if pendientes:
+        encolar_migracion(PLANTILLA_SCHEMA, solicitada_por='crear_schema_tenant')
+        lineas.append(
+            f'Plantilla "{PLANTILLA_SCHEMA}" atrasada ({pendientes} migraciones): '
+            f'se encoló su migración y el schema se migra desde cero.'
+        )
+        migrar_schema(schema_name, lineas)
+        return
+    lineas.append(f'Schema "{schema_name}" clonado desde "{PLANTILLA_SCHEMA}".')
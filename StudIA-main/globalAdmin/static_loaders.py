@@ -1,85 +1,158 @@
 """
 Sistema de carga de archivos estáticos por tenant.
+
+Los archivos de un tema viven en loginApp/static/tenants/{tema}/ y los
+templates los piden con el nombre lógico ({% static 'img/logo.png' %}). Las
+storages de este módulo traducen ese nombre a tenants/{tema}/img/logo.png (o
+tenants/default/..., o el archivo base) con un diccionario armado una vez:
+- en producción, desde staticfiles-temas.json, que collectstatic escribe junto
+  al manifest de WhiteNoise. Cada tema obtiene su propia URL con hash y sus
+  versiones .gz/.br, que WhiteNoise sirve con caché de largo plazo.
+- en desarrollo, recorriendo loginApp/static/tenants al iniciar.
+
+TenantStaticFinder mantiene la búsqueda por tema para las URLs sin prefijo
+(runserver), también sobre un índice en memoria.
 """
-from django.contrib.staticfiles.finders import BaseFinder
-from django.conf import settings
+import json
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.finders import BaseFinder
+from django.contrib.staticfiles.storage import StaticFilesStorage
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from .tema import TEMA_POR_DEFECTO, tema_actual
+
+TEMAS_MANIFEST_NAME = 'staticfiles-temas.json'
+
+
+def _base_static_dir():
+    return os.path.join(settings.BASE_DIR, 'loginApp', 'static')
+
+
+def _archivos(directorio):
+    """{ruta relativa con '/': ruta absoluta} de todos los archivos bajo `directorio`."""
+    archivos = {}
+    for root, dirs, filenames in os.walk(directorio):
+        for filename in filenames:
+            file_path = os.path.join(root, filename)
+            archivos[os.path.relpath(file_path, directorio).replace(os.sep, '/')] = file_path
+    return archivos
+
+
+def indice_temas(nombres):
+    """
+    Agrupa los nombres 'tenants/<tema>/<ruta>' por tema:
+    {tema: {ruta relativa al tema, ...}}. El resto de los nombres se ignora.
+    """
+    temas = {}
+    for nombre in nombres:
+        partes = nombre.split('/', 2)
+        if len(partes) == 3 and partes[0] == 'tenants':
+            temas.setdefault(partes[1], set()).add(partes[2])
+    return temas
+
 
 class TenantStaticFinder(BaseFinder):
     """
     Finder que busca archivos estáticos en directorios específicos del tenant.
     Estructura esperada:
     - loginApp/static/tenants/{tenant_theme}/...
-    - loginApp/static/default/... (fallback)
+    - loginApp/static/tenants/default/... (fallback)
+    - loginApp/static/... (compatibilidad)
     """
-    
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._archivos = _archivos(_base_static_dir())
+
+    def _candidatos(self, path):
+        tenant_theme = tema_actual()
+        yield f'tenants/{tenant_theme}/{path}'
+        if tenant_theme != TEMA_POR_DEFECTO:
+            yield f'tenants/{TEMA_POR_DEFECTO}/{path}'
+        yield path
+
     def find(self, path, all=False):
         """
         Busca archivos estáticos en los directorios del tema del tenant.
         """
-        tenant_theme = getattr(settings, 'CURRENT_TENANT_THEME', 'default')
         matches = []
-        
-        # Directorio base de static files
-        base_static_dir = os.path.join(settings.BASE_DIR, 'loginApp', 'static')
-        
-        # Buscar en el directorio del tema del tenant
-        theme_static_dir = os.path.join(base_static_dir, 'tenants', tenant_theme)
-        theme_path = os.path.join(theme_static_dir, path)
-        if os.path.exists(theme_path):
-            if all:
-                matches.append(theme_path)
-            else:
-                return theme_path
-        
-        # Buscar en el directorio default como fallback
-        default_static_dir = os.path.join(base_static_dir, 'tenants', 'default')
-        default_path = os.path.join(default_static_dir, path)
-        if os.path.exists(default_path):
-            if all:
-                matches.append(default_path)
-            else:
-                return default_path
-        
-        # Buscar en el directorio base (para compatibilidad)
-        base_path = os.path.join(base_static_dir, path)
-        if os.path.exists(base_path):
-            if all:
-                matches.append(base_path)
-            else:
-                return base_path
-        
+        for candidato in self._candidatos(path):
+            file_path = self._archivos.get(candidato)
+            if file_path:
+                if not all:
+                    return file_path
+                matches.append(file_path)
         return matches if all else None
-    
+
     def list(self, ignore_patterns):
         """
-        Lista todos los archivos estáticos disponibles en los directorios del tema.
+        Lista los archivos estáticos del tema del tenant y del tema default.
         """
-        tenant_theme = getattr(settings, 'CURRENT_TENANT_THEME', 'default')
-        files = []
-        
-        base_static_dir = os.path.join(settings.BASE_DIR, 'loginApp', 'static')
-        
-        # Listar archivos del tema del tenant
-        theme_static_dir = os.path.join(base_static_dir, 'tenants', tenant_theme)
-        if os.path.exists(theme_static_dir):
-            for root, dirs, filenames in os.walk(theme_static_dir):
-                for filename in filenames:
-                    file_path = os.path.join(root, filename)
-                    relative_path = os.path.relpath(file_path, theme_static_dir)
-                    files.append((relative_path, file_path))
-        
-        # Listar archivos del tema default
-        default_static_dir = os.path.join(base_static_dir, 'tenants', 'default')
-        if os.path.exists(default_static_dir):
-            for root, dirs, filenames in os.walk(default_static_dir):
-                for filename in filenames:
-                    file_path = os.path.join(root, filename)
-                    relative_path = os.path.relpath(file_path, default_static_dir)
-                    # Solo agregar si no existe en el tema del tenant
-                    if not any(f[0] == relative_path for f in files):
-                        files.append((relative_path, file_path))
-        
-        return files
+        tenant_theme = tema_actual()
+        files = {}
+        for tema in (tenant_theme, TEMA_POR_DEFECTO):
+            prefijo = f'tenants/{tema}/'
+            for relativo, file_path in self._archivos.items():
+                # El tema del tenant tiene prioridad sobre el default
+                if relativo.startswith(prefijo):
+                    files.setdefault(relativo[len(prefijo):], file_path)
+        return list(files.items())
+
+
+class TenantThemeStorageMixin:
+    """
+    Resuelve el nombre lógico de un estático al archivo del tema del request
+    antes de generar la URL. self.temas es {tema: {nombres}}.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.temas = self._cargar_temas()
+
+    def _cargar_temas(self):
+        return indice_temas(_archivos(_base_static_dir()))
+
+    def nombre_tema(self, name):
+        tenant_theme = tema_actual()
+        for tema in (tenant_theme, TEMA_POR_DEFECTO):
+            if name in self.temas.get(tema, ()):
+                return f'tenants/{tema}/{name}'
+        return name
+
+    def url(self, name, *args, **kwargs):
+        return super().url(self.nombre_tema(name), *args, **kwargs)
+
+
+class TenantThemeStaticFilesStorage(TenantThemeStorageMixin, StaticFilesStorage):
+    """Storage de desarrollo: sin hash, con el índice de temas leído del disco."""
+
+
+class TenantThemeManifestStaticFilesStorage(TenantThemeStorageMixin, CompressedManifestStaticFilesStorage):
+    """
+    Storage de producción: CompressedManifestStaticFilesStorage de WhiteNoise
+    más un manifest de temas que collectstatic escribe al terminar.
+    """
+
+    def _cargar_temas(self):
+        try:
+            with self.manifest_storage.open(TEMAS_MANIFEST_NAME) as manifest:
+                temas = json.loads(manifest.read().decode())
+            return {tema: set(nombres) for tema, nombres in temas.items()}
+        except (FileNotFoundError, ValueError):
+            # Antes del primer collectstatic (o con un manifest corrupto)
+            return indice_temas(self.hashed_files)
+
+    def post_process(self, *args, **kwargs):
+        yield from super().post_process(*args, **kwargs)
+        if not kwargs.get('dry_run'):
+            self.temas = indice_temas(self.hashed_files)
+            self.save_manifest_temas()
 
+    def save_manifest_temas(self):
+        contenido = json.dumps({tema: sorted(nombres) for tema, nombres in sorted(self.temas.items())})
+        if self.manifest_storage.exists(TEMAS_MANIFEST_NAME):
+            self.manifest_storage.delete(TEMAS_MANIFEST_NAME)
+        self.manifest_storage._save(TEMAS_MANIFEST_NAME, ContentFile(contenido.encode()))
@@ -0,0 +1,38 @@
+"""
+Tema del tenant para el request en curso.
+
+El middleware lo fija al resolver el tenant y los loaders de templates y de
+archivos estáticos lo leen. Se guarda en un ContextVar y no en settings: con
+workers con hilos (gthread) o ASGI cada request tiene su propio contexto, así
+que dos tenants atendidos a la vez no ven el tema del otro.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+TEMA_POR_DEFECTO = 'default'
+
+_tema = ContextVar('tenant_theme', default=TEMA_POR_DEFECTO)
+
+
+def tema_actual():
+    """Tema del request en curso ('default' fuera de un request)."""
+    return _tema.get()
+
+
+def activar_tema(tema):
+    """Fija el tema del contexto actual; retorna el token para restaurar_tema()."""
+    return _tema.set(tema or TEMA_POR_DEFECTO)
+
+
+def restaurar_tema(token):
+    _tema.reset(token)
+
+
+@contextmanager
+def usar_tema(tema):
+    """Para código fuera de un request (comandos, tests, benchmarks)."""
+    token = activar_tema(tema)
+    try:
+        yield
+    finally:
+        restaurar_tema(token)
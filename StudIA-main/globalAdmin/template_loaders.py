@@ -1,11 +1,25 @@
 """
-Template loader personalizado para cargar templates según el tema del tenant.
+Template loaders personalizados para cargar templates según el tema del tenant.
+
+TenantThemeLoader resuelve las rutas con un índice en memoria de los archivos
+de loginApp/templates (armado una vez al crear el loader), sin os.path.exists
+por directorio ni open() de prueba por candidato. TenantThemeCachedLoader
+envuelve los loaders y guarda cada template compilado por (tema, nombre), así
+cada template se lee y compila una sola vez por tema.
+
+En desarrollo, el autoreload de Django llama a reset() cuando cambia un
+template existente; para templates nuevos o cambios hechos fuera de runserver
+está invalidar_templates().
 """
-from django.template.loaders.filesystem import Loader as FilesystemLoader
-from django.template import TemplateDoesNotExist
-from django.conf import settings
 import os
 
+from django.conf import settings
+from django.template import Origin, TemplateDoesNotExist, engines
+from django.template.loaders.cached import Loader as CachedLoader
+from django.template.loaders.filesystem import Loader as FilesystemLoader
+
+from .tema import tema_actual
+
 
 class TenantThemeLoader(FilesystemLoader):
     """
@@ -14,60 +28,120 @@ class TenantThemeLoader(FilesystemLoader):
     - loginApp/templates/tenants/{tenant_theme}/...
     - loginApp/templates/tenants/default/... (fallback)
     - loginApp/templates/... (compatibilidad)
-    
+
     Si no encuentra el template, lanza TemplateDoesNotExist para que
     el siguiente loader (app_directories) lo intente.
     """
-    
-    def get_dirs(self):
+
+    def __init__(self, engine, dirs=None):
+        super().__init__(engine, dirs)
+        self.base_template_dir = os.path.join(settings.BASE_DIR, 'loginApp', 'templates')
+        self._construir_indice()
+
+    def _construir_indice(self):
         """
-        Retorna los directorios donde buscar templates, priorizando el tema del tenant.
+        Recorre loginApp/templates una vez y arma {directorio: {nombres de template}}
+        para el directorio base y cada tenants/<tema>.
         """
+        tenants_dir = os.path.join(self.base_template_dir, 'tenants')
+        indice = {self.base_template_dir: set()}
+        for raiz, _, archivos in os.walk(self.base_template_dir):
+            for archivo in archivos:
+                relativo = os.path.relpath(os.path.join(raiz, archivo), self.base_template_dir)
+                nombre = relativo.replace(os.sep, '/')
+                indice[self.base_template_dir].add(nombre)
+                partes = nombre.split('/', 2)
+                if len(partes) == 3 and partes[0] == 'tenants':
+                    indice.setdefault(os.path.join(tenants_dir, partes[1]), set()).add(partes[2])
+        self._indice = indice
+
+    def _dirs_tema(self, tenant_theme):
+        """Directorios del tema, en orden de prioridad, que existían al armar el índice."""
         dirs = []
-        
-        # Obtener el tema del tenant desde settings (establecido por el middleware)
-        tenant_theme = getattr(settings, 'CURRENT_TENANT_THEME', 'default')
-        
-        # Directorio base de templates
-        base_template_dir = os.path.join(settings.BASE_DIR, 'loginApp', 'templates')
-        
-        # Agregar directorio del tema del tenant si existe
-        theme_dir = os.path.join(base_template_dir, 'tenants', tenant_theme)
-        if os.path.exists(theme_dir):
+
+        theme_dir = os.path.join(self.base_template_dir, 'tenants', tenant_theme)
+        if theme_dir in self._indice:
             dirs.append(theme_dir)
-        
+
         # Agregar directorio default como fallback
-        default_dir = os.path.join(base_template_dir, 'tenants', 'default')
-        if os.path.exists(default_dir) and tenant_theme != 'default':
+        default_dir = os.path.join(self.base_template_dir, 'tenants', 'default')
+        if default_dir in self._indice and tenant_theme != 'default':
             dirs.append(default_dir)
-        
+
         # Agregar directorio base de templates (para compatibilidad)
-        if os.path.exists(base_template_dir):
-            dirs.append(base_template_dir)
-        
-        # Si no hay directorios, usar el directorio base por defecto
-        if not dirs:
-            dirs = [base_template_dir]
-        
+        dirs.append(self.base_template_dir)
         return dirs
-    
+
+    def get_dirs(self):
+        """
+        Retorna los directorios donde buscar templates, priorizando el tema del tenant.
+        """
+        return self._dirs_tema(tema_actual())
+
+    def get_template_sources(self, template_name):
+        """
+        Orígenes del template según el índice: solo rutas que existen, sin
+        tocar el disco. Un nombre con '..' o absoluto nunca está en el índice.
+        """
+        for template_dir in self.get_dirs():
+            if template_name in self._indice.get(template_dir, ()):
+                yield Origin(
+                    name=os.path.join(template_dir, template_name),
+                    template_name=template_name,
+                    loader=self,
+                )
+
     def load_template_source(self, template_name, template_dirs=None):
         """
         Intenta cargar el template. Si no lo encuentra, lanza TemplateDoesNotExist
         para que el siguiente loader lo intente.
         """
-        if template_dirs is None:
-            template_dirs = self.get_dirs()
-        
-        for template_dir in template_dirs:
-            template_path = os.path.join(template_dir, template_name)
-            if os.path.exists(template_path):
-                try:
-                    with open(template_path, encoding='utf-8') as f:
-                        return (f.read(), template_path)
-                except (IOError, OSError):
-                    pass
-        
+        for origin in self.get_template_sources(template_name):
+            try:
+                return (self.get_contents(origin), origin.name)
+            except TemplateDoesNotExist:
+                pass
+
         # Si no se encuentra, lanzar excepción para que el siguiente loader lo intente
         raise TemplateDoesNotExist(template_name)
 
+    def reset(self):
+        """Vuelve a armar el índice (templates agregados o eliminados)."""
+        self._construir_indice()
+
+
+class TenantThemeCachedLoader(CachedLoader):
+    """
+    Loader con caché de templates compilados por (tema, nombre). El cached
+    loader de Django usa solo el nombre como clave y serviría a un tenant el
+    base.html compilado para otro tema.
+
+    Uso en settings.TEMPLATES:
+        'loaders': [
+            ('globalAdmin.template_loaders.TenantThemeCachedLoader', [
+                'globalAdmin.template_loaders.TenantThemeLoader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ]
+    """
+
+    def cache_key(self, template_name, skip=None):
+        return f'{tema_actual()}:{super().cache_key(template_name, skip)}'
+
+    def reset(self):
+        """Vacía la caché de templates y vuelve a indexar los loaders internos."""
+        super().reset()
+        for loader in self.loaders:
+            if hasattr(loader, 'reset'):
+                loader.reset()
+
+
+def invalidar_templates():
+    """
+    Vacía la caché de templates de todos los engines Django (hook para
+    desarrollo: templates nuevos o editados fuera de runserver).
+    """
+    for engine in engines.all():
+        for loader in getattr(engine, 'engine', engine).template_loaders:
+            if hasattr(loader, 'reset'):
+                loader.reset()
@@ -1,3 +1,198 @@
-from django.test import TestCase
+import json
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django_tenants.postgresql_backend.base import FakeTenant
+
+from globalAdmin import feriados, plantilla
+from globalAdmin.feriados import Calendario, FeriadosError, descargar
+from globalAdmin.middleware_resolver import TenantResolverMiddleware
+from globalAdmin.models import Feriado
+from globalAdmin.tema import TEMA_POR_DEFECTO, tema_actual
+
+FERIADOS_API = {
+    'status': 'success',
+    'data': [
+        {'date': '2025-09-18', 'title': 'Independencia Nacional', 'type': 'Civil', 'inalienable': True, 'extra': 'Civil e Irrenunciable'},
+        {'date': '2025-01-01', 'title': 'Año Nuevo', 'type': 'Civil', 'inalienable': True, 'extra': 'Civil e Irrenunciable'},
+        {'date': '2025-04-18', 'title': 'Viernes Santo', 'type': 'Religioso', 'inalienable': False, 'extra': 'Religioso'},
+    ],
+}
+
+
+class _ServidorFeriados(BaseHTTPRequestHandler):
+    """Responde lo que diga la ruta: /ok, /error, /estado, /json-invalido, /lento."""
+
+    def do_GET(self):
+        if self.path == '/lento':
+            # No responde: el cliente corta por timeout
+            self.server.liberar.wait(5)
+            return
+        if self.path == '/error':
+            self.send_response(500)
+            self.end_headers()
+            return
+        cuerpos = {
+            '/ok': json.dumps(FERIADOS_API),
+            '/estado': json.dumps({'status': 'error', 'message': 'límite excedido'}),
+            '/json-invalido': '{"status": "succ',
+        }
+        cuerpo = cuerpos[self.path].encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class ServidorLocalMixin:
+    """Levanta una API de feriados falsa en 127.0.0.1 para toda la clase."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.servidor = ThreadingHTTPServer(('127.0.0.1', 0), _ServidorFeriados)
+        cls.servidor.liberar = threading.Event()
+        cls.hilo = threading.Thread(target=cls.servidor.serve_forever, daemon=True)
+        cls.hilo.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.liberar.set()
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+        super().tearDownClass()
+
+    def url(self, ruta):
+        return f'http://127.0.0.1:{self.servidor.server_address[1]}{ruta}'
+
+
+class DescargarFeriadosTest(ServidorLocalMixin, SimpleTestCase):
+
+    def test_descarga_y_convierte_fechas(self):
+        resultado = descargar(self.url('/ok'))
+        self.assertEqual(len(resultado), 3)
+        self.assertEqual(resultado[0]['date'], date(2025, 9, 18))
+        self.assertEqual(resultado[0]['title'], 'Independencia Nacional')
+        self.assertIs(resultado[2]['inalienable'], False)
+
+    def test_error_http(self):
+        with self.assertRaisesMessage(FeriadosError, 'Error al conectar'):
+            descargar(self.url('/error'))
+
+    def test_estado_inesperado(self):
+        with self.assertRaisesMessage(FeriadosError, 'estado inesperado: error'):
+            descargar(self.url('/estado'))
+
+    def test_json_invalido(self):
+        with self.assertRaisesMessage(FeriadosError, 'JSON'):
+            descargar(self.url('/json-invalido'))
+
+    def test_timeout(self):
+        with self.assertRaisesMessage(FeriadosError, 'tardó demasiado'):
+            descargar(self.url('/lento'), timeout=0.2)
+
+
+class CalendarioTest(SimpleTestCase):
+
+    def setUp(self):
+        self.calendario = Calendario([
+            {'date': date(2025, 9, 19), 'title': 'Glorias del Ejército', 'type': 'Civil', 'inalienable': True, 'extra': ''},
+            {'date': date(2025, 9, 18), 'title': 'Independencia Nacional', 'type': 'Civil', 'inalienable': True, 'extra': ''},
+            {'date': date(2025, 9, 19), 'title': 'Otro', 'type': 'Civil', 'inalienable': False, 'extra': ''},
+        ])
+
+    def test_ordenados_por_fecha(self):
+        self.assertEqual([f['date'].day for f in self.calendario.feriados], [18, 19, 19])
+
+    def test_consultas_por_fecha(self):
+        self.assertTrue(self.calendario.es_feriado(date(2025, 9, 18)))
+        self.assertFalse(self.calendario.es_feriado(date(2025, 9, 20)))
+        self.assertEqual([f['title'] for f in self.calendario.del_dia(date(2025, 9, 19))], ['Glorias del Ejército', 'Otro'])
+        self.assertEqual(self.calendario.del_dia(date(2025, 9, 20)), [])
+
+
+class ActualizarFeriadosTest(ServidorLocalMixin, TestCase):
+
+    def test_guarda_y_recarga_en_memoria(self):
+        calendario = feriados.actualizar(self.url('/ok'))
+        self.assertEqual(Feriado.objects.count(), 3)
+        self.assertTrue(calendario.es_feriado(date(2025, 1, 1)))
+        self.assertIsNotNone(calendario.actualizado)
+
+    def test_error_conserva_lo_guardado(self):
+        feriados.actualizar(self.url('/ok'))
+        with self.assertRaises(FeriadosError):
+            feriados.actualizar(self.url('/estado'))
+        self.assertEqual(Feriado.objects.count(), 3)
+        self.assertTrue(feriados.cargar().es_feriado(date(2025, 4, 18)))
+
+
+class TemaMiddlewareAsgiTest(SimpleTestCase):
+    """
+    Con ASGI, MiddlewareMixin corre process_request y process_response en
+    llamadas sync_to_async distintas, cada una con su copia del contexto.
+    """
+
+    def setUp(self):
+        tenant = FakeTenant(schema_name='duoc')
+        tenant.tema = 'duoc'
+        registro = mock.patch('globalAdmin.middleware_resolver.tenant_registry')
+        self.addCleanup(registro.stop)
+        registro.start().get_by_schema.return_value = tenant
+        self.addCleanup(connection.set_schema_to_public)
+
+    def test_tema_en_la_vista_y_sin_error_al_responder(self):
+        async def vista(request):
+            return HttpResponse(tema_actual())
+
+        middleware = TenantResolverMiddleware(vista)
+        request = RequestFactory().get('/api/mobile/sedes/', HTTP_X_TENANT_SCHEMA='duoc')
+
+        for _ in range(2):
+            respuesta = async_to_sync(middleware)(request)
+            self.assertEqual(respuesta.status_code, 200)
+            self.assertEqual(respuesta.content, b'duoc')
+        self.assertEqual(tema_actual(), TEMA_POR_DEFECTO)
+
+
+class CrearSchemaTenantTest(SimpleTestCase):
+    """crear_schema_tenant nunca migra la plantilla dentro de la creación del tenant."""
+
+    def setUp(self):
+        for nombre in ('bloqueo_plantilla', 'migraciones_pendientes', 'encolar_migracion',
+                       'migrar_schema', 'CloneSchema', '_esperadas_tenant'):
+            parche = mock.patch.object(plantilla, nombre)
+            self.addCleanup(parche.stop)
+            setattr(self, nombre, parche.start())
+        self._esperadas_tenant.return_value = (set(), {})
+        parche = mock.patch.object(plantilla, 'PLANTILLA_SCHEMA', 'plantilla_test')
+        self.addCleanup(parche.stop)
+        parche.start()
+        self.addCleanup(connection.set_schema_to_public)
+
+    def test_plantilla_al_dia_se_clona(self):
+        self.migraciones_pendientes.return_value = 0
+        plantilla.crear_schema_tenant('nuevo', [])
+        self.CloneSchema.return_value.clone_schema.assert_called_once_with('plantilla_test', 'nuevo')
+        self.migrar_schema.assert_not_called()
+        self.encolar_migracion.assert_not_called()
+
+    def test_plantilla_atrasada_se_encola_y_el_tenant_se_migra(self):
+        self.migraciones_pendientes.return_value = 2
+        lineas = []
+        plantilla.crear_schema_tenant('nuevo', lineas)
+        self.CloneSchema.return_value.clone_schema.assert_not_called()
+        self.encolar_migracion.assert_called_once_with('plantilla_test', solicitada_por='crear_schema_tenant')
+        self.migrar_schema.assert_called_once_with('nuevo', lineas)
+        self.assertIn('atrasada', lineas[0])
@@ -18,6 +18,9 @@ urlpatterns = [
     path('tenants/<int:tenant_id>/impersonate/', views.tenant_impersonate, name='tenant_impersonate'),
     path('tenants/<int:tenant_id>/create-admin-user/', views.tenant_create_admin_user, name='tenant_create_admin_user'),
     path('tenants/<int:tenant_id>/run-migrations/', views.tenant_run_migrations, name='tenant_run_migrations'),
+    path('tenants/run-migrations/', views.tenant_run_migrations_all, name='tenant_run_migrations_all'),
+    path('migraciones/', views.migraciones, name='migraciones'),
+    path('migraciones/estado/', views.migraciones_estado, name='migraciones_estado'),
     path('stop-impersonate/', views.tenant_stop_impersonate, name='stop_impersonate'),
 ]
 
@@ -6,9 +6,16 @@ from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db import connection
+from django.http import JsonResponse
+from django.urls import reverse
 from django_tenants.utils import schema_context, get_public_schema_name
 from django_tenants.models import TenantMixin
 from clientManager.models import Empresa, Dominio, AdministradorGlobal
+from clientManager.tenant_registry import tenant_registry
+from clientManager.tenant_cache import TenantCache
+from .migraciones import encolar_migracion, encolar_todos, resumen as resumen_migraciones
+from .plantilla import crear_schema_tenant
+from .models import TareaMigracion
 from functools import wraps
 
 
@@ -198,7 +205,6 @@ def tenant_create(request):
         if nombre_empresa and dominio:
             try:
                 with schema_context(get_public_schema_name()):
-                    # Crear el tenant con auto_create_schema para que se cree el schema automáticamente
                     schema_name = nombre_empresa.lower().replace(' ', '_').replace('-', '_')
                     
                     # Verificar que el schema_name no exista ya
@@ -213,7 +219,7 @@ def tenant_create(request):
                         tema=tema,
                         estado=estado,
                         schema_name=schema_name,
-                        auto_create_schema=True,  # Crear el schema automáticamente
+                        auto_create_schema=False,  # El schema se clona de la plantilla más abajo
                         auto_drop_schema=False
                     )
                     tenant.save()
@@ -227,26 +233,19 @@ def tenant_create(request):
                     )
                     dominio_obj.save()
                 
-                # Ejecutar las migraciones en el schema del tenant
-                from django.core.management import call_command
-                from io import StringIO
-                import sys
+                tenant_registry.invalidate()
                 
-                # Ejecutar migrate_schemas para el schema específico con --run-syncdb
-                # para asegurar que todas las tablas se creen correctamente
-                old_stdout = sys.stdout
-                sys.stdout = StringIO()
+                # Clonar el schema plantilla (ya migrado) en lugar de correr
+                # todas las migraciones desde cero (globalAdmin/plantilla.py)
                 try:
-                    call_command('migrate_schemas', '--schema', schema_name, '--run-syncdb', verbosity=0)
+                    crear_schema_tenant(schema_name, [])
                 except Exception as e:
-                    sys.stdout = old_stdout
-                    # Si hay error, intentar eliminar el tenant creado
+                    # Si hay error, eliminar el tenant creado
                     with schema_context(get_public_schema_name()):
                         tenant.delete()
-                    messages.error(request, f'Error al ejecutar migraciones: {str(e)}')
+                    tenant_registry.invalidate()
+                    messages.error(request, f'Error al crear el schema del tenant: {str(e)}')
                     return render(request, 'globalAdmin/tenant_create.html')
-                finally:
-                    sys.stdout = old_stdout
                 
                 messages.success(request, f'Tenant "{nombre_empresa}" creado exitosamente con todas las migraciones aplicadas.')
                 return redirect('global_admin:tenant_list')
@@ -259,69 +258,89 @@ def tenant_create(request):
     return render(request, 'globalAdmin/tenant_create.html')
 
 
+def _email_admin(request):
+    """Email del administrador global en sesión (para registrar quién encola)."""
+    with schema_context(get_public_schema_name()):
+        return AdministradorGlobal.objects.filter(
+            pk=request.session.get('_auth_user_id')
+        ).values_list('email', flat=True).first() or ''
+
+
 @global_admin_required
 def tenant_run_migrations(request, tenant_id):
     """
-    Ejecutar migraciones para un tenant específico.
+    Encolar las migraciones de un tenant específico. Las ejecuta el comando
+    procesar_migraciones fuera del request (globalAdmin/migraciones.py).
     """
     with schema_context(get_public_schema_name()):
         tenant = get_object_or_404(Empresa, id_empresa=tenant_id)
     
-    try:
-        from django.core.management import call_command
-        from io import StringIO
-        import sys
-        from django.db import connection
-        
-        # Verificar que el schema existe, y crearlo si no existe
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT schema_name FROM information_schema.schemata WHERE schema_name = %s", [tenant.schema_name])
-            schema_exists = cursor.fetchone() is not None
-        
-        if not schema_exists:
-            # El schema no existe, crearlo manualmente
-            try:
-                # Crear el schema
-                with connection.cursor() as cursor:
-                    cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{tenant.schema_name}"')
-                messages.info(request, f'Schema "{tenant.schema_name}" creado. Ejecutando migraciones...')
-            except Exception as e:
-                messages.error(request, f'Error al crear el schema: {str(e)}')
-                return redirect('global_admin:tenant_list')
-        
-        # Ejecutar migrate_schemas para el schema específico con --run-syncdb
-        # y --fake-initial para evitar problemas si las migraciones ya están marcadas como aplicadas
-        old_stdout = sys.stdout
-        old_stderr = sys.stderr
-        sys.stdout = StringIO()
-        sys.stderr = StringIO()
-        try:
-            # Primero intentar con --run-syncdb para crear todas las tablas
-            call_command('migrate_schemas', '--schema', tenant.schema_name, '--run-syncdb', verbosity=1)
-            
-            # Luego ejecutar las migraciones normalmente
-            call_command('migrate_schemas', '--schema', tenant.schema_name, verbosity=1)
-            
-            output = sys.stdout.getvalue()
-            error_output = sys.stderr.getvalue()
-            
-            if error_output:
-                messages.warning(request, f'Migraciones ejecutadas con advertencias para el tenant "{tenant.nombre_empresa}". Verifica los logs.')
-            else:
-                messages.success(request, f'Migraciones ejecutadas exitosamente para el tenant "{tenant.nombre_empresa}".')
-        except Exception as e:
-            sys.stdout = old_stdout
-            sys.stderr = old_stderr
-            error_msg = str(e)
-            messages.error(request, f'Error al ejecutar migraciones: {error_msg}')
-        finally:
-            sys.stdout = old_stdout
-            sys.stderr = old_stderr
-        
-        return redirect('global_admin:tenant_list')
-    except Exception as e:
-        messages.error(request, f'Error: {str(e)}')
-        return redirect('global_admin:tenant_list')
+    tarea = encolar_migracion(tenant.schema_name, solicitada_por=_email_admin(request))
+    messages.info(request, f'Migraciones encoladas para el tenant "{tenant.nombre_empresa}".')
+    return redirect(f"{reverse('global_admin:migraciones')}?tarea={tarea.pk}")
+
+
+@global_admin_required
+def tenant_run_migrations_all(request):
+    """
+    Encolar las migraciones de todos los tenants en un lote. Los workers
+    (procesar_migraciones --procesos N) las ejecutan en paralelo.
+    """
+    if request.method != 'POST':
+        return redirect('global_admin:migraciones')
+    
+    lote = encolar_todos(solicitada_por=_email_admin(request))
+    messages.info(request, 'Migraciones encoladas para todos los tenants.')
+    return redirect(f"{reverse('global_admin:migraciones')}?lote={lote}")
+
+
+def _tareas_migracion(request):
+    tareas = TareaMigracion.objects.all()
+    if request.GET.get('lote'):
+        tareas = tareas.filter(lote=request.GET['lote'])
+    elif request.GET.get('tarea'):
+        tareas = tareas.filter(pk=request.GET['tarea'])
+    else:
+        tareas = tareas[:50]
+    return list(tareas)
+
+
+@global_admin_required
+def migraciones(request):
+    """
+    Estado de las migraciones encoladas (las últimas, un lote o una tarea).
+    La página consulta migraciones_estado mientras queden tareas sin terminar.
+    """
+    with schema_context(get_public_schema_name()):
+        tareas = _tareas_migracion(request)
+    
+    return render(request, 'globalAdmin/migraciones.html', {
+        'tareas': tareas,
+        'resumen': resumen_migraciones(tareas),
+        'query': request.GET.urlencode(),
+    })
+
+
+@global_admin_required
+def migraciones_estado(request):
+    """JSON con el estado de las tareas para el polling del panel."""
+    with schema_context(get_public_schema_name()):
+        tareas = _tareas_migracion(request)
+    
+    return JsonResponse({
+        'resumen': resumen_migraciones(tareas),
+        'tareas': [{
+            'id': tarea.pk,
+            'schema_name': tarea.schema_name,
+            'estado': tarea.estado,
+            'estado_display': tarea.get_estado_display(),
+            'worker': tarea.worker,
+            'creada_at': tarea.creada_at.isoformat(),
+            'duracion': tarea.duracion,
+            'salida': tarea.salida,
+            'error': tarea.error,
+        } for tarea in tareas],
+    })
 
 
 @global_admin_required
@@ -358,6 +377,8 @@ def tenant_edit(request, tenant_id):
                 # Marcar otros dominios como no primarios
                 Dominio.objects.filter(tenant=tenant).exclude(domain=dominio_principal).update(is_primary=False)
         
+        tenant_registry.invalidate()
+        
         messages.success(request, f'Tenant "{tenant.nombre_empresa}" actualizado exitosamente.')
         return redirect('global_admin:tenant_list')
     
@@ -378,6 +399,9 @@ def tenant_suspend(request, tenant_id):
         tenant.estado = 'I'  # Inactivo
         tenant.save()
     
+    tenant_registry.invalidate()
+    TenantCache.invalidate_tenant(tenant.schema_name)
+    
     messages.success(request, f'Tenant "{tenant.nombre_empresa}" suspendido.')
     return redirect('global_admin:tenant_list')
 
@@ -392,6 +416,8 @@ def tenant_activate(request, tenant_id):
         tenant.estado = 'A'  # Activo
         tenant.save()
     
+    tenant_registry.invalidate()
+    
     messages.success(request, f'Tenant "{tenant.nombre_empresa}" activado.')
     return redirect('global_admin:tenant_list')
 
@@ -1,19 +1,19 @@
 """
 Vistas públicas para cuando no se identifica un tenant.
 """
-import sys
+import logging
 from django.shortcuts import render, redirect
 from django.http import HttpResponse
 
+logger = logging.getLogger(__name__)
+
 
 def public_index(request):
     """
     Vista pública para la raíz cuando no se identifica un tenant.
     Redirige al panel de administración global.
     """
-    import sys
-    sys.stdout.write('[PUBLIC INDEX] Vista ejecutada\n')
-    sys.stdout.flush()
+    logger.debug('[PUBLIC INDEX] Vista ejecutada')
     
     # Devolver una respuesta simple con un link al panel global
     return HttpResponse("""
@@ -0,0 +1,162 @@
+"""
+Servicio único de inscripción y cancelación en ayudantías.
+
+La vista web (estudiante_inscribirse) y la API móvil (AyudantiaViewSet.inscribirse
+e InscripcionViewSet.create) leían cupos_disponibles, creaban la Inscripcion y
+luego descontaban el cupo en Python con save(). Con peticiones concurrentes dos
+estudiantes podían leer el mismo cupo y se sobrevendía la ayudantía.
+
+Aquí el cupo se reserva con un UPDATE condicional:
+
+    UPDATE ... SET cupos_disponibles = cupos_disponibles - 1
+    WHERE id_ayudantia = %s AND cupos_disponibles > 0 AND ...
+
+dentro de la misma transacción que crea la Inscripcion. La base de datos
+serializa los UPDATE sobre la fila, así que nunca se descuenta un cupo que no
+existe, y el bloqueo de la fila se mantiene solo durante ese UPDATE y el commit.
+La inscripción duplicada la detecta el unique_together (estudiante, ayudantia)
+antes de tocar la fila de la ayudantía.
+
+Cada inscripción o cancelación confirmada cambia la versión de
+inscripciones_cache, que forma parte de los ETags de la API móvil.
+
+La asistencia (registrar_asistencia) se guarda con dos UPDATE por conjunto,
+presentes y ausentes, en una transacción: el costo no depende de cuántos
+estudiantes tenga la ayudantía.
+"""
+from datetime import date
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from clientManager.tenant_cache import inscripciones_cache
+from loginApp.models import Ayudantia, Inscripcion
+
+
+class InscripcionError(Exception):
+    """
+    La inscripción no se pudo realizar. `codigo` identifica el motivo:
+    no_disponible, cursada, pasada, sin_cupos o ya_inscrito.
+    """
+    MENSAJES = {
+        'no_disponible': 'Esta ayudantía ya no está disponible.',
+        'cursada': 'Esta ayudantía ya fue cursada.',
+        'pasada': 'Esta ayudantía ya pasó.',
+        'sin_cupos': 'No hay cupos disponibles para esta ayudantía.',
+        'ya_inscrito': 'Ya estás inscrito en esta ayudantía.',
+    }
+
+    def __init__(self, codigo):
+        self.codigo = codigo
+        self.mensaje = self.MENSAJES[codigo]
+        super().__init__(self.mensaje)
+
+
+def inscripciones_modificadas():
+    """
+    Cambia la versión de las inscripciones del tenant al confirmarse la
+    transacción: antes del commit un GET concurrente podría guardar los datos
+    viejos con la versión nueva.
+    """
+    schema_name = connection.schema_name
+    transaction.on_commit(lambda: inscripciones_cache.clear(schema_name=schema_name))
+
+
+def _motivo_rechazo(ayudantia_id, hoy):
+    """Determina por qué el UPDATE condicional no afectó ninguna fila."""
+    estado = Ayudantia.objects.filter(id_ayudantia=ayudantia_id).values(
+        'is_active', 'is_cursada', 'fecha'
+    ).first()
+    if estado is None or not estado['is_active']:
+        return 'no_disponible'
+    if estado['is_cursada']:
+        return 'cursada'
+    if estado['fecha'] < hoy:
+        return 'pasada'
+    return 'sin_cupos'
+
+
+def inscribir(estudiante, ayudantia):
+    """
+    Inscribe al estudiante en la ayudantía reservando un cupo de forma atómica.
+
+    `ayudantia` puede ser una instancia o su id. Si es una instancia, al
+    terminar su cupos_disponibles queda con el valor real de la base de datos.
+    Retorna la Inscripcion creada o lanza InscripcionError.
+    """
+    ayudantia_id = getattr(ayudantia, 'pk', ayudantia)
+    hoy = date.today()
+
+    try:
+        with transaction.atomic():
+            # Primero la inscripción: un duplicado falla por unique_together sin
+            # bloquear la fila de la ayudantía que comparten todos los estudiantes
+            try:
+                with transaction.atomic():
+                    inscripcion = Inscripcion.objects.create(
+                        estudiante=estudiante,
+                        ayudantia_id=ayudantia_id,
+                        estado='activa'
+                    )
+            except IntegrityError:
+                raise InscripcionError('ya_inscrito')
+
+            reservados = Ayudantia.objects.filter(
+                id_ayudantia=ayudantia_id,
+                is_active=True,
+                is_cursada=False,
+                fecha__gte=hoy,
+                cupos_disponibles__gt=0,
+            ).update(cupos_disponibles=F('cupos_disponibles') - 1, updated_at=timezone.now())
+
+            if not reservados:
+                # Deshace la inscripción creada arriba
+                raise InscripcionError(_motivo_rechazo(ayudantia_id, hoy))
+
+            inscripciones_modificadas()
+
+            if isinstance(ayudantia, Ayudantia):
+                ayudantia.refresh_from_db(fields=['cupos_disponibles'])
+                inscripcion.ayudantia = ayudantia
+    except IntegrityError:
+        # La ayudantía fue eliminada entre la validación de la vista y el INSERT
+        raise InscripcionError('no_disponible')
+
+    return inscripcion
+
+
+def cancelar(inscripcion):
+    """
+    Elimina la inscripción y devuelve el cupo en la misma transacción.
+    Si la inscripción ya había sido eliminada por otra petición no se devuelve
+    nada, así un doble clic no suma cupos de más.
+    """
+    with transaction.atomic():
+        eliminadas, _ = Inscripcion.objects.filter(pk=inscripcion.pk).delete()
+        if eliminadas:
+            inscripciones_modificadas()
+            Ayudantia.objects.filter(
+                id_ayudantia=inscripcion.ayudantia_id,
+                cupos_disponibles__lt=F('cupos_totales'),
+            ).update(cupos_disponibles=F('cupos_disponibles') + 1, updated_at=timezone.now())
+    return bool(eliminadas)
+
+
+def registrar_asistencia(ayudantia, asistieron):
+    """
+    Marca asistio=True en las inscripciones activas de la ayudantía cuyo id
+    está en `asistieron` y asistio=False en el resto. Los ids que no son
+    inscripciones activas de la ayudantía se ignoran. `ayudantia` puede ser una
+    instancia o su id. Retorna (presentes, ausentes).
+    """
+    ayudantia_id = getattr(ayudantia, 'pk', ayudantia)
+    asistieron = set(asistieron)
+    activas = Inscripcion.objects.filter(ayudantia_id=ayudantia_id, estado='activa')
+    # update() no aplica auto_now: updated_at lo usa la sincronización móvil
+    ahora = timezone.now()
+    with transaction.atomic():
+        presentes = activas.filter(pk__in=asistieron).update(asistio=True, updated_at=ahora)
+        ausentes = activas.exclude(pk__in=asistieron).update(asistio=False, updated_at=ahora)
+        inscripciones_modificadas()
+    return presentes, ausentes
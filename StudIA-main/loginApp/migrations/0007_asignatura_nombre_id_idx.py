@@ -0,0 +1,17 @@
+# Generated by Django 5.0.2 on 2026-10-18 18:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loginApp', '0006_sede'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asignatura',
+            index=models.Index(fields=['nombre', 'id_asignatura'], name='asignatura_nombre_id_idx'),
+        ),
+    ]
@@ -86,10 +86,14 @@ class Asignatura(models.Model):
     descripcion = models.TextField(verbose_name="Descripción", blank=True)
     is_active = models.BooleanField(default=True, verbose_name="Asignatura Activa")
     created_at = models.DateTimeField(auto_now_add=True)
+    # Sincronización incremental de la app móvil (api_mobile/sync.py)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         verbose_name = "Asignatura"
         verbose_name_plural = "Asignaturas"
+        # Orden de la paginación por cursor de la API móvil
+        indexes = [models.Index(fields=['nombre', 'id_asignatura'], name='asignatura_nombre_id_idx')]
     
     def __str__(self):
         return f"{self.codigo} - {self.nombre}"
@@ -110,6 +114,7 @@ class Ayudantia(models.Model):
     is_cursada = models.BooleanField(default=False, verbose_name="Ayudantía Cursada")
     fecha_cursada = models.DateTimeField(null=True, blank=True, verbose_name="Fecha en que se Cursó")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         verbose_name = "Ayudantía"
@@ -135,6 +140,7 @@ class Inscripcion(models.Model):
         ('completada', 'Completada')
     ], default='activa', verbose_name="Estado")
     asistio = models.BooleanField(default=False, verbose_name="Asistió a la Ayudantía")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         verbose_name = "Inscripción"
@@ -155,6 +161,7 @@ class Sede(models.Model):
     longitud = models.FloatField(verbose_name="Longitud")
     is_active = models.BooleanField(default=True, verbose_name="Sede Activa")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         verbose_name = "Sede"
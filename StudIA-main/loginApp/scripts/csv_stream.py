@@ -0,0 +1,9 @@
+"""
+Escritura de CSV por partes para StreamingHttpResponse.
+"""
+
+
+class Echo:
+    """Pseudo-buffer para csv.writer: retorna la línea en vez de guardarla."""
+    def write(self, value):
+        return value
@@ -0,0 +1,127 @@
+"""
+Exportación de los logs de asistencia (tutor y admin) con memoria acotada.
+
+Antes se armaba un Workbook completo de openpyxl en memoria y se consultaban
+las inscripciones de cada ayudantía por separado. Aquí:
+- las filas salen de un único iterador de ayudantías (iterator con chunk_size)
+  con los contadores anotados y las inscripciones activas precargadas por lote,
+  así nunca hay más de CHUNK_SIZE ayudantías en memoria;
+- XLSX usa el modo write-only de openpyxl, que vuelca cada fila a un archivo
+  temporal en disco, y el archivo final se envía por bloques con FileResponse;
+- CSV (?formato=csv) se genera fila a fila con StreamingHttpResponse, sin
+  archivo intermedio.
+"""
+import csv
+import tempfile
+
+from django.db.models import Prefetch
+from django.http import FileResponse, StreamingHttpResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill
+from openpyxl.utils import get_column_letter
+
+from loginApp.models import Inscripcion
+from .csv_stream import Echo
+
+CHUNK_SIZE = 200
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def encabezados(incluir_tutor):
+    columnas = ['ID', 'Título', 'Asignatura']
+    if incluir_tutor:
+        columnas.append('Tutor')
+    return columnas + [
+        'Fecha Ayudantía', 'Horario', 'Sala', 'Fecha Cursada',
+        'Total Inscritos', 'Total Asistieron', 'Total No Asistieron',
+        'Estudiante', 'Email', 'Asistió'
+    ]
+
+
+def filas_logs(ayudantias, incluir_tutor=False):
+    """
+    Genera una fila por inscripción activa (o una fila "Sin inscripciones").
+    `ayudantias` debe venir anotado con con_estadisticas_inscripciones().
+    """
+    ayudantias = ayudantias.prefetch_related(Prefetch(
+        'inscripciones',
+        queryset=Inscripcion.objects.filter(estado='activa').select_related('estudiante').order_by('id_inscripcion'),
+        to_attr='inscripciones_export',
+    ))
+
+    for ayudantia in ayudantias.iterator(chunk_size=CHUNK_SIZE):
+        base = [ayudantia.id_ayudantia, ayudantia.titulo, ayudantia.asignatura.nombre]
+        if incluir_tutor:
+            base.append(ayudantia.tutor.nombre_usuario)
+        base += [
+            ayudantia.fecha.strftime('%d/%m/%Y'),
+            ayudantia.horario.strftime('%H:%M'),
+            ayudantia.sala,
+            ayudantia.fecha_cursada.strftime('%d/%m/%Y %H:%M') if ayudantia.fecha_cursada else '',
+        ]
+
+        if ayudantia.inscripciones_export:
+            totales = [ayudantia.total_inscritos, ayudantia.total_asistieron, ayudantia.total_no_asistieron]
+            for inscripcion in ayudantia.inscripciones_export:
+                yield base + totales + [
+                    inscripcion.estudiante.nombre_usuario,
+                    inscripcion.estudiante.email,
+                    'Sí' if inscripcion.asistio else 'No',
+                ]
+        else:
+            yield base + [0, 0, 0, 'Sin inscripciones', '', '']
+
+
+def respuesta_csv(cabecera, filas, filename):
+    writer = csv.writer(Echo())
+
+    def contenido():
+        # BOM para que Excel abra el CSV como UTF-8 (tildes y ñ)
+        yield '\ufeff' + writer.writerow(cabecera)
+        for fila in filas:
+            yield writer.writerow(fila)
+
+    response = StreamingHttpResponse(contenido(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def respuesta_xlsx(cabecera, filas, filename, titulo):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(titulo)
+
+    # En modo write-only el ancho de columna se fija antes de escribir filas
+    for col_num in range(1, len(cabecera) + 1):
+        ws.column_dimensions[get_column_letter(col_num)].width = 20
+
+    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF")
+    center_alignment = Alignment(horizontal="center", vertical="center")
+    celdas = []
+    for header in cabecera:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = center_alignment
+        celdas.append(cell)
+    ws.append(celdas)
+
+    for fila in filas:
+        ws.append(fila)
+
+    archivo = tempfile.TemporaryFile()
+    wb.save(archivo)
+    archivo.seek(0)
+    # FileResponse envía el archivo por bloques y lo cierra al terminar
+    return FileResponse(archivo, as_attachment=True, filename=f'{filename}.xlsx', content_type=XLSX_CONTENT_TYPE)
+
+
+def exportar_logs(request, ayudantias, filename, incluir_tutor=False):
+    """Responde con CSV si ?formato=csv, si no con XLSX."""
+    cabecera = encabezados(incluir_tutor)
+    filas = filas_logs(ayudantias, incluir_tutor)
+    if request.GET.get('formato') == 'csv':
+        return respuesta_csv(cabecera, filas, filename)
+    return respuesta_xlsx(cabecera, filas, filename, "Logs de Ayudantías")
@@ -1,3 +1,5 @@
+from solicitudesManager.models import Solicitud
+
 def procesar_form(form, sol):
     if form.is_valid():
         sol.campos_sol = form.cleaned_data
@@ -21,17 +23,20 @@ def procesar_form(form, sol):
                 sol.campos_sol["ids_ruta"] = [id.strip() for id in sol.campos_sol["ids_ruta"].split(",")]
         return sol
     
-def revision_form(sol, lista_sol):
+def revision_form(sol):
     tipo_sol, campos_sol = sol.tipo_sol, sol.campos_sol
+    # Duplicados: una búsqueda por el índice parcial de clave_dedup entre las pendientes
+    clave = sol.calcular_clave_dedup()
+    if clave is not None:
+        pendientes = Solicitud.objects.filter(estado_sol="Pendiente", clave_dedup=clave)
+        if sol.pk:
+            pendientes = pendientes.exclude(pk=sol.pk)
+        if pendientes.exists():
+            return False
     #Cambiar a un switch a futuro si otros tipos de solicitudes requieren mas verificaciones
     match tipo_sol:
-            case "Servicio VPN":
-                for s in lista_sol:
-                    campos_sol_alojado = s.campos_sol
-                    if campos_sol["usuario"] == campos_sol_alojado["usuario"] and campos_sol["accion"] == campos_sol_alojado["accion"]:
-                        return False
             case "Cambio de Ruta":
                 if campos_sol["gateway"] == campos_sol["interfaz_salida"]:
                     return False
                 
-    return True
\ No newline at end of file
+    return True
@@ -1,41 +1,106 @@
 import csv
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from dateutil.relativedelta import relativedelta
-from loginApp.models import Usuario
 from solicitudesManager.models import Solicitud
+from .csv_stream import Echo
+from .pdf_simple import PDFIncremental
 
-now = timezone.now()
-last_24h = now - relativedelta(hours=24)
-last_7d = now - relativedelta(days=7)
-last_1m = now - relativedelta(months=1)
-
-def gen_informe(periodo, response, formato):
-    match periodo:
-        case "24h":
-            lista_solicitudes = Solicitud.objects.filter(created_at__gte=last_24h)
-        case "7d":
-            lista_solicitudes = Solicitud.objects.filter(created_at__gte=last_7d)
-        case "1m":
-            lista_solicitudes = Solicitud.objects.filter(created_at__gte=last_1m)
-    # hocus pocus crear el csv
+# Las ventanas se calculan en cada request (ver desde_periodo); antes se
+# calculaban al importar el módulo y quedaban fijas mientras viviera el worker
+PERIODOS = {
+    "24h": relativedelta(hours=24),
+    "7d": relativedelta(days=7),
+    "1m": relativedelta(months=1),
+}
+
+CHUNK_SIZE = 2000
+
+# Campos internos de Solicitud que no van en el informe
+CAMPOS_EXCLUIDOS = {"clave_dedup"}
+
+
+def desde_periodo(periodo):
+    return timezone.now() - PERIODOS[periodo]
+
+
+def campos_informe():
+    return [campo for campo in Solicitud._meta.fields if campo.name not in CAMPOS_EXCLUIDOS]
+
+
+def columnas_informe():
+    """
+    Encabezados y campos para values_list: los campos de Solicitud salvo
+    CAMPOS_EXCLUIDOS, con el usuario traído por JOIN como nombre_usuario en
+    vez de su id.
+    """
+    encabezados, campos = [], []
+    for campo in campos_informe():
+        encabezados.append(campo.verbose_name)
+        campos.append(f"{campo.name}__nombre_usuario" if campo.is_relation else campo.name)
+    return encabezados, campos
+
+
+def filas_informe(periodo):
+    _, campos = columnas_informe()
+    solicitudes = Solicitud.objects.filter(
+        created_at__gte=desde_periodo(periodo)
+    ).order_by('id_sol').values_list(*campos)
+    return solicitudes.iterator(chunk_size=CHUNK_SIZE)
+
+
+def gen_informe(periodo, formato):
+    """Retorna un StreamingHttpResponse con el informe del periodo en CSV o PDF."""
     if formato == "pdf":
-        to_pdf()
+        response = StreamingHttpResponse(to_pdf(periodo), content_type="application/pdf")
+        response['Content-Disposition'] = "attachment; filename=reporte.pdf"
     else:
-        to_csv(lista_solicitudes, response)
-    
-    # pendiente el crear un pdf cuando sea necesario, ver que libreria usar y procesar el formato requerido si fuera posible
-
-def to_csv(datos, response):
-    campos = [campo.verbose_name for campo in Solicitud._meta.fields]
-    archivo = csv.writer(response)
-    archivo.writerow(campos)
-    solicitudes = datos.values_list()
-    for solicitud in solicitudes:
-        solicitud = list(solicitud)
-        usuario = Usuario.objects.get(id_usuario = solicitud[-1])
-        solicitud[-1] = usuario.nombre_usuario
-        archivo.writerow(solicitud)
-
-def to_pdf():
-    print("pum, archivo pdf")
-    pass
\ No newline at end of file
+        response = StreamingHttpResponse(to_csv(periodo), content_type="text/csv")
+        response['Content-Disposition'] = "attachment; filename=reporte.csv"
+    return response
+
+
+def to_csv(periodo):
+    encabezados, _ = columnas_informe()
+    archivo = csv.writer(Echo())
+    yield archivo.writerow(encabezados)
+    for solicitud in filas_informe(periodo):
+        yield archivo.writerow(solicitud)
+
+
+# Ancho de cada columna en el PDF (mismo orden que columnas_informe); la última
+# columna (usuario) va después de los datos del formulario, que se recortan
+ANCHOS_PDF = {
+    "id_sol": 8,
+    "estado_sol": 14,
+    "tipo_sol": 30,
+    "campos_sol": 60,
+    "created_at": 18,
+    "adjunto_sol": 24,
+    "id_usuario": 25,
+}
+
+
+def _celda(valor, ancho):
+    if valor is None:
+        valor = ""
+    elif hasattr(valor, "strftime"):
+        valor = timezone.localtime(valor).strftime("%d/%m/%Y %H:%M") if timezone.is_aware(valor) else valor.strftime("%d/%m/%Y %H:%M")
+    texto = str(valor).replace("\n", " ")
+    if len(texto) > ancho - 1:
+        texto = texto[:ancho - 2] + "…"
+    return texto.ljust(ancho)
+
+
+def to_pdf(periodo):
+    encabezados, _ = columnas_informe()
+    anchos = [ANCHOS_PDF.get(campo.name, 15) for campo in campos_informe()]
+
+    def lineas():
+        yield "".join(_celda(e, a) for e, a in zip(encabezados, anchos))
+        yield "-" * sum(anchos)
+        for solicitud in filas_informe(periodo):
+            yield "".join(_celda(v, a) for v, a in zip(solicitud, anchos))
+
+    titulo = f"Informe de solicitudes ({periodo}) - generado {timezone.localtime().strftime('%d/%m/%Y %H:%M')}"
+    return PDFIncremental(titulo=titulo).generar(lineas())
@@ -0,0 +1,106 @@
+"""
+Generador de PDF de texto plano que se escribe de forma incremental.
+
+No hay librería de PDF entre las dependencias del proyecto y el informe solo
+necesita una tabla de texto, así que se arma el PDF a mano: cada página se
+emite (contenido + objeto página) en cuanto se llena y al final se escriben el
+árbol de páginas, la tabla xref y el trailer. En memoria solo queda la página
+en curso y los offsets de los objetos ya escritos.
+
+Usa Courier (monoespaciada, una de las 14 fuentes estándar que no se incrustan)
+con codificación WinAnsi para que las tildes y la ñ se vean bien.
+"""
+
+# A4 apaisado, en puntos
+ANCHO_PAGINA = 842
+ALTO_PAGINA = 595
+MARGEN = 30
+TAMANO_FUENTE = 7
+INTERLINEADO = 9
+# Courier: cada carácter mide 0.6 veces el tamaño de la fuente
+CARACTERES_POR_LINEA = int((ANCHO_PAGINA - 2 * MARGEN) / (TAMANO_FUENTE * 0.6))
+LINEAS_POR_PAGINA = int((ALTO_PAGINA - 2 * MARGEN) / INTERLINEADO)
+
+# Objetos fijos: 1 catálogo, 2 árbol de páginas, 3 fuente; las páginas desde el 4
+_CATALOGO, _PAGINAS, _FUENTE = 1, 2, 3
+
+
+def _escapar(texto):
+    texto = texto.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return texto.encode('cp1252', errors='replace')
+
+
+class PDFIncremental:
+    """
+    Uso:
+        pdf = PDFIncremental(titulo='Informe')
+        for chunk in pdf.generar(lineas):
+            ...  # bytes listos para enviar
+    `lineas` es cualquier iterable de str; las líneas largas se recortan.
+    """
+    def __init__(self, titulo=''):
+        self.titulo = titulo
+        self._offset = 0
+        self._offsets = {}
+        self._paginas = []
+        self._siguiente_objeto = _FUENTE + 1
+
+    def _objeto(self, numero, cuerpo):
+        self._offsets[numero] = self._offset
+        datos = b'%d 0 obj\n' % numero + cuerpo + b'\nendobj\n'
+        self._offset += len(datos)
+        return datos
+
+    def _emitir(self, datos):
+        self._offset += len(datos)
+        return datos
+
+    def _pagina(self, lineas, numero_pagina):
+        contenido = [b'BT', b'/F1 %d Tf' % TAMANO_FUENTE, b'%d TL' % INTERLINEADO,
+                     b'%d %d Td' % (MARGEN, ALTO_PAGINA - MARGEN)]
+        encabezado = f'{self.titulo} - Página {numero_pagina}' if self.titulo else f'Página {numero_pagina}'
+        for linea in [encabezado, ''] + lineas:
+            contenido.append(b'(' + _escapar(linea[:CARACTERES_POR_LINEA]) + b") '")
+        contenido.append(b'ET')
+        stream = b'\n'.join(contenido)
+
+        n_contenido = self._siguiente_objeto
+        n_pagina = n_contenido + 1
+        self._siguiente_objeto += 2
+        self._paginas.append(n_pagina)
+
+        datos = self._objeto(n_contenido, b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        datos += self._objeto(n_pagina, (
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] '
+            b'/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>'
+        ) % (_PAGINAS, ANCHO_PAGINA, ALTO_PAGINA, _FUENTE, n_contenido))
+        return datos
+
+    def generar(self, lineas):
+        yield self._emitir(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        yield self._objeto(_CATALOGO, b'<< /Type /Catalog /Pages %d 0 R >>' % _PAGINAS)
+        yield self._objeto(_FUENTE, b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>')
+
+        # Dos líneas de cada página son del encabezado
+        por_pagina = LINEAS_POR_PAGINA - 2
+        pendientes = []
+        for linea in lineas:
+            pendientes.append(linea)
+            if len(pendientes) == por_pagina:
+                yield self._pagina(pendientes, len(self._paginas) + 1)
+                pendientes = []
+        if pendientes or not self._paginas:
+            yield self._pagina(pendientes, len(self._paginas) + 1)
+
+        kids = b' '.join(b'%d 0 R' % n for n in self._paginas)
+        yield self._objeto(_PAGINAS, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self._paginas)))
+
+        total = self._siguiente_objeto
+        xref_offset = self._offset
+        xref = [b'xref', b'0 %d' % total, b'0000000000 65535 f ']
+        for numero in range(1, total):
+            xref.append(b'%010d 00000 n ' % self._offsets[numero])
+        yield self._emitir(b'\n'.join(xref) + b'\n')
+        yield self._emitir(
+            b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (total, _CATALOGO, xref_offset)
+        )
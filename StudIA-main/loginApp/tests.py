@@ -1,3 +1,323 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time, timedelta
+import threading
 
-# Create your tests here.
+from django.db import connection, connections
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django_tenants.test.cases import TenantTestCase
+from django_tenants.test.client import TenantClient
+from rest_framework.test import APIClient
+
+from clientManager.models import Empresa
+from clientManager.tenant_registry import tenant_registry
+from loginApp.inscripciones import inscribir, cancelar, InscripcionError, registrar_asistencia
+from loginApp.models import Usuario, Asignatura, Ayudantia, Inscripcion
+
+
+class InscripcionConcurrenteTest(TransactionTestCase):
+    """
+    Prueba de estrés del servicio de inscripción: cientos de inscripciones en
+    paralelo contra una ayudantía con pocos cupos. Cada hilo usa su propia
+    conexión, así que se necesita TransactionTestCase (los datos deben estar
+    confirmados para que los vean los demás hilos) y un tenant real.
+    """
+    CUPOS = 5
+    ESTUDIANTES = 300
+    HILOS = 50
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tenant = Empresa(
+            schema_name='test_inscripciones',
+            nombre_empresa='Test Inscripciones',
+            estado='A',
+            nombre_sn='test',
+        )
+        cls.tenant.save(verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        connection.set_schema_to_public()
+        cls.tenant.delete(force_drop=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        connection.set_tenant(self.tenant)
+        tutor = Usuario.objects.create_user(
+            'tutor', 'tutor@test.cl', 'clave', telefono=1, cargo='Tutor', horario_atencion=1, is_tutor=True
+        )
+        asignatura = Asignatura.objects.create(nombre='Cálculo', codigo='MAT100', carrera='Ingeniería')
+        self.ayudantia = Ayudantia.objects.create(
+            tutor=tutor,
+            asignatura=asignatura,
+            titulo='Repaso',
+            descripcion='Repaso prueba 1',
+            sala='A-101',
+            fecha=date.today() + timedelta(days=1),
+            horario=time(10, 0),
+            cupos_totales=self.CUPOS,
+        )
+        self.estudiantes = Usuario.objects.bulk_create([
+            Usuario(
+                nombre_usuario=f'est{i}', email=f'est{i}@test.cl',
+                telefono=i, cargo='Estudiante', horario_atencion=0,
+            )
+            for i in range(self.ESTUDIANTES)
+        ])
+
+    def tearDown(self):
+        connection.set_tenant(self.tenant)
+        Inscripcion.objects.all().delete()
+        Ayudantia.objects.all().delete()
+        Asignatura.objects.all().delete()
+        Usuario.objects.all().delete()
+        connection.set_schema_to_public()
+
+    def _inscribir_en_paralelo(self, estudiantes):
+        """Lanza una inscripción por estudiante desde HILOS hilos; retorna (exitos, codigos_error)."""
+        barrera = threading.Barrier(min(self.HILOS, len(estudiantes)))
+        ayudantia_id = self.ayudantia.pk
+
+        def tarea(estudiante):
+            connection.set_tenant(self.tenant)
+            try:
+                try:
+                    barrera.wait(timeout=5)
+                except threading.BrokenBarrierError:
+                    pass
+                inscribir(estudiante, ayudantia_id)
+                return None
+            except InscripcionError as e:
+                return e.codigo
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=self.HILOS) as pool:
+            resultados = list(pool.map(tarea, estudiantes))
+
+        exitos = sum(1 for r in resultados if r is None)
+        return exitos, [r for r in resultados if r is not None]
+
+    def test_no_sobrevende_cupos(self):
+        exitos, errores = self._inscribir_en_paralelo(self.estudiantes)
+
+        self.assertEqual(exitos, self.CUPOS)
+        self.assertEqual(set(errores), {'sin_cupos'})
+        self.ayudantia.refresh_from_db()
+        self.assertEqual(self.ayudantia.cupos_disponibles, 0)
+        self.assertEqual(Inscripcion.objects.filter(ayudantia=self.ayudantia).count(), self.CUPOS)
+
+    def test_mismo_estudiante_en_paralelo_solo_una_inscripcion(self):
+        exitos, errores = self._inscribir_en_paralelo([self.estudiantes[0]] * self.HILOS)
+
+        self.assertEqual(exitos, 1)
+        self.assertEqual(set(errores), {'ya_inscrito'})
+        self.ayudantia.refresh_from_db()
+        self.assertEqual(self.ayudantia.cupos_disponibles, self.CUPOS - 1)
+
+    def test_cancelar_devuelve_un_solo_cupo(self):
+        inscripcion = inscribir(self.estudiantes[0], self.ayudantia)
+        self.assertEqual(self.ayudantia.cupos_disponibles, self.CUPOS - 1)
+
+        self.assertTrue(cancelar(inscripcion))
+        self.assertFalse(cancelar(inscripcion))
+        self.ayudantia.refresh_from_db()
+        self.assertEqual(self.ayudantia.cupos_disponibles, self.CUPOS)
+
+    def test_ayudantia_pasada(self):
+        Ayudantia.objects.filter(pk=self.ayudantia.pk).update(fecha=date.today() - timedelta(days=1))
+        with self.assertRaises(InscripcionError) as ctx:
+            inscribir(self.estudiantes[0], self.ayudantia.pk)
+        self.assertEqual(ctx.exception.codigo, 'pasada')
+        self.assertFalse(Inscripcion.objects.exists())
+
+
+class EstadisticasAyudantiasQueriesTest(TenantTestCase):
+    """
+    Las vistas de logs y listados de ayudantías deben ejecutar la misma cantidad
+    de queries sin importar cuántas ayudantías (e inscripciones) existan.
+    """
+    VISTAS = ['tutor_mis_ayudantias', 'tutor_logs', 'admin_ayudantias', 'admin_logs']
+
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.nombre_empresa = 'Test Queries'
+        tenant.estado = 'A'
+        tenant.nombre_sn = 'test'
+
+    def setUp(self):
+        tenant_registry.invalidate()
+        self.client = TenantClient(self.tenant)
+        self.tutor = Usuario.objects.create_user(
+            'tutor', 'tutor@test.cl', 'clave', telefono=1, cargo='Tutor',
+            horario_atencion=1, is_tutor=True, is_staff=True,
+        )
+        self.asignatura = Asignatura.objects.create(nombre='Cálculo', codigo='MAT100', carrera='Ingeniería')
+        self.client.force_login(self.tutor, backend='loginApp.backend.UsuarioBackend')
+        self.creadas = 0
+
+    def _crear_ayudantias(self, cantidad):
+        for _ in range(cantidad):
+            i = self.creadas
+            self.creadas += 1
+            for cursada in (False, True):
+                ayudantia = Ayudantia.objects.create(
+                    tutor=self.tutor,
+                    asignatura=self.asignatura,
+                    titulo=f'Ayudantía {i}',
+                    descripcion='Repaso',
+                    sala='A-101',
+                    fecha=date.today() + timedelta(days=1),
+                    horario=time(10, 0),
+                    cupos_totales=10,
+                    is_cursada=cursada,
+                    fecha_cursada=timezone.now() if cursada else None,
+                )
+                for j in range(3):
+                    estudiante = Usuario.objects.create_user(
+                        f'est{i}{cursada:d}{j}', f'e{i}{cursada:d}{j}@test.cl', 'clave',
+                        telefono=j, cargo='Estudiante', horario_atencion=0,
+                    )
+                    Inscripcion.objects.create(estudiante=estudiante, ayudantia=ayudantia, asistio=bool(j % 2))
+
+    def _contar_queries(self, vista):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(vista))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_queries_constantes(self):
+        self._crear_ayudantias(1)
+        iniciales = {vista: self._contar_queries(vista) for vista in self.VISTAS}
+
+        self._crear_ayudantias(9)
+        for vista in self.VISTAS:
+            with self.subTest(vista=vista):
+                self.assertEqual(self._contar_queries(vista), iniciales[vista])
+
+    def test_contadores_anotados(self):
+        self._crear_ayudantias(1)
+        response = self.client.get(reverse('tutor_logs'))
+        ayudantia = response.context['ayudantias_cursadas'][0]
+        self.assertEqual(ayudantia.total_inscritos, 3)
+        self.assertEqual(ayudantia.total_asistieron, 1)
+        self.assertEqual(ayudantia.total_no_asistieron, 2)
+
+
+class AsistenciaTest(TenantTestCase):
+    """registrar_asistencia y los endpoints de tutor de la API móvil."""
+
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.nombre_empresa = 'Test Asistencia'
+        tenant.estado = 'A'
+        tenant.nombre_sn = 'test'
+
+    def setUp(self):
+        tenant_registry.invalidate()
+        self.tutor = self._usuario('tutor', is_tutor=True)
+        self.otro_tutor = self._usuario('otrotutor', is_tutor=True)
+        asignatura = Asignatura.objects.create(nombre='Cálculo', codigo='MAT100', carrera='Ingeniería')
+        self.ayudantia = self._ayudantia(self.tutor, asignatura)
+        ayudantia_ajena = self._ayudantia(self.otro_tutor, asignatura)
+
+        self.estudiantes = [self._usuario(f'est{i}') for i in range(4)]
+        self.inscripciones = [
+            Inscripcion.objects.create(estudiante=estudiante, ayudantia=self.ayudantia)
+            for estudiante in self.estudiantes[:3]
+        ]
+        self.cancelada = Inscripcion.objects.create(
+            estudiante=self.estudiantes[3], ayudantia=self.ayudantia, estado='cancelada'
+        )
+        self.ajena = Inscripcion.objects.create(estudiante=self.estudiantes[0], ayudantia=ayudantia_ajena)
+        self.url = reverse('api_tutor_asistencia', args=[self.ayudantia.pk])
+        self.api = APIClient(HTTP_X_TENANT_SCHEMA=self.tenant.schema_name)
+
+    def _usuario(self, nombre, is_tutor=False):
+        return Usuario.objects.create_user(
+            nombre, f'{nombre}@test.cl', 'clave', telefono=1,
+            cargo='Tutor' if is_tutor else 'Estudiante', horario_atencion=0, is_tutor=is_tutor,
+        )
+
+    def _ayudantia(self, tutor, asignatura):
+        return Ayudantia.objects.create(
+            tutor=tutor,
+            asignatura=asignatura,
+            titulo='Repaso',
+            descripcion='Repaso prueba 1',
+            sala='A-101',
+            fecha=date.today() + timedelta(days=1),
+            horario=time(10, 0),
+            cupos_totales=10,
+        )
+
+    def _login(self, usuario, ruta='api_login_tutor'):
+        """Inicia sesión por la API y deja el access token en el cliente."""
+        response = self.api.post(reverse(ruta), {'email': usuario.email, 'password': 'clave'}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.api.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['tokens']['access']}")
+
+    def test_cuenta_presentes_y_ausentes(self):
+        hace_un_dia = timezone.now() - timedelta(days=1)
+        Inscripcion.objects.update(updated_at=hace_un_dia)
+
+        presentes, ausentes = registrar_asistencia(self.ayudantia, [self.inscripciones[0].pk])
+
+        self.assertEqual((presentes, ausentes), (1, 2))
+        asistencia = dict(Inscripcion.objects.filter(
+            pk__in=[i.pk for i in self.inscripciones]
+        ).values_list('pk', 'asistio'))
+        self.assertEqual(asistencia, {
+            self.inscripciones[0].pk: True,
+            self.inscripciones[1].pk: False,
+            self.inscripciones[2].pk: False,
+        })
+        for inscripcion in self.inscripciones:
+            inscripcion.refresh_from_db()
+            self.assertGreater(inscripcion.updated_at, hace_un_dia)
+
+    def test_ignora_ids_ajenos(self):
+        ids = [self.inscripciones[0].pk, self.ajena.pk, self.cancelada.pk, 999999]
+
+        self.assertEqual(registrar_asistencia(self.ayudantia.pk, ids), (1, 2))
+        self.ajena.refresh_from_db()
+        self.cancelada.refresh_from_db()
+        self.assertFalse(self.ajena.asistio)
+        self.assertFalse(self.cancelada.asistio)
+
+    def test_tutor_registra_por_la_api(self):
+        self._login(self.tutor)
+
+        response = self.api.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['data']), 3)
+
+        response = self.api.post(self.url, {'asistieron': [self.inscripciones[1].pk]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['asistieron'], response.data['no_asistieron']), (1, 2))
+
+    def test_otro_tutor_recibe_404(self):
+        Inscripcion.objects.filter(pk=self.inscripciones[0].pk).update(asistio=True)
+        self._login(self.otro_tutor)
+
+        self.assertEqual(self.api.get(self.url).status_code, 404)
+        # Con la lista vacía marcaría a todos ausentes si llegara a guardarse
+        response = self.api.post(self.url, {'asistieron': []}, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Inscripcion.objects.get(pk=self.inscripciones[0].pk).asistio)
+
+    def test_estudiante_recibe_403(self):
+        self._login(self.estudiantes[0], ruta='api_login')
+        self.assertEqual(self.api.get(self.url).status_code, 403)
+        self.assertEqual(self.api.post(self.url, {'asistieron': []}, format='json').status_code, 403)
+
+    def test_login_tutor_rechaza_estudiantes(self):
+        response = self.api.post(
+            reverse('api_login_tutor'), {'email': self.estudiantes[0].email, 'password': 'clave'}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('tokens', response.data)
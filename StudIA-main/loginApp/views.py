@@ -6,19 +6,21 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
 from django.urls import reverse_lazy, reverse
 from django.db import models
+from django.db.models import Count, Prefetch, Q
 from django.utils import timezone
 from functools import wraps
 from datetime import date, datetime, timedelta
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
-from openpyxl.utils import get_column_letter
-import requests
 import json
 from clientManager.models import Empresa
-from .scripts.informe import gen_informe
+from .scripts.informe import gen_informe, PERIODOS
 from .scripts.formularios import procesar_form, revision_form
+from .scripts.exportar_logs import exportar_logs
 from loginApp.forms import CrearUsuarioForm, EditarUsuarioForm, CambioClaveAdminForm, ReporteriaForm, FiltrodeFormulariosForm, form_dict, AsignaturaForm, AyudantiaForm
 from loginApp.models import Usuario, Asignatura, Ayudantia, Inscripcion, Sede
+from loginApp.inscripciones import inscribir, cancelar as cancelar_inscripcion, InscripcionError, registrar_asistencia
+from api_mobile.usuarios_cache import invalidar_usuario
+from clientManager.tenant_cache import catalogo_cache
+from globalAdmin.feriados import FERIADOS_API_URL, calendario as calendario_feriados, feriados_del_dia
 from solicitudesManager.models import Solicitud
 
 def tutor_required(view_func):
@@ -36,6 +38,20 @@ def tutor_required(view_func):
         return view_func(request, *args, **kwargs)
     return _wrapped_view
 
+def con_estadisticas_inscripciones(ayudantias):
+    """
+    Anota en una sola query los contadores de inscripciones de cada ayudantía:
+    total_inscritos (inscripciones activas), total_asistieron, total_no_asistieron
+    y total_inscripciones (todas, sin importar el estado).
+    """
+    activas = Q(inscripciones__estado='activa')
+    return ayudantias.annotate(
+        total_inscripciones=Count('inscripciones'),
+        total_inscritos=Count('inscripciones', filter=activas),
+        total_asistieron=Count('inscripciones', filter=activas & Q(inscripciones__asistio=True)),
+        total_no_asistieron=Count('inscripciones', filter=activas & Q(inscripciones__asistio=False)),
+    )
+
 def tenant_user_required(view_func):
     """
     Decorador que verifica que el usuario es del tipo Usuario (tenant) y no AdministradorGlobal.
@@ -154,8 +170,7 @@ def home(request):
             if form.is_valid():
                 sol = Solicitud(tipo_sol=tipo_form, id_usuario=usuario)
                 sol = procesar_form(form, sol)
-                lista_sol = Solicitud.objects.filter(estado_sol="Pendiente", tipo_sol=tipo_form)
-                if revision_form(sol, lista_sol):
+                if revision_form(sol):
                     sol.save()
                     messages.success(request, "Solicitud guardada con éxito")
                     return redirect("home")
@@ -254,6 +269,7 @@ def editarUsuario(request, pk):
             if not form.cleaned_data.get('is_active', False):
                 usuario_actualizado.is_active = False
             usuario_actualizado.save()
+            invalidar_usuario(usuario_actualizado.pk, revocar=not usuario_actualizado.is_active)
             return redirect("usuarios")
         else:
             return render(request, "editarUsuario.html", {"formulario": form})
@@ -270,6 +286,7 @@ def editarClaveAdmin(request, pk):
         nueva_contraseña = form.cleaned_data['nueva_contraseña']
         usuario.set_password(nueva_contraseña)
         usuario.save()
+        invalidar_usuario(usuario.pk, revocar=not usuario.is_active)
         update_session_auth_hash(request, usuario)  
         messages.success(request, 'La contraseña ha sido actualizada exitosamente.')
         return render(request, "editarClaveAdmin.html", {"usuario": usuario, "formulario": form})
@@ -284,7 +301,9 @@ def borrarUsuario(request, pk):
     usuario = Usuario.objects.get(id_usuario = pk)
     if request.user.id_usuario == usuario.id_usuario:
         return redirect("usuarios")
+    usuario_id = usuario.id_usuario
     usuario.delete()
+    invalidar_usuario(usuario_id, revocar=True)
     return redirect("usuarios")
 
 @staff_member_required(redirect_field_name=None, login_url=reverse_lazy("home"))
@@ -300,8 +319,7 @@ def editarSolicitud(request, pk):
             if form.is_valid():
                 sol.estado_sol = estado_sol
                 sol = procesar_form(form, sol)
-                lista_sol = Solicitud.objects.filter(estado_sol="Pendiente", tipo_sol=tipo_form).exclude(id_sol=pk)
-                if revision_form(sol, lista_sol):
+                if revision_form(sol):
                     sol.save()
                     messages.success(request, "Solicitud actualizada con éxito")
                     return redirect("solicitudes_empresa")
@@ -339,14 +357,12 @@ def casosDeUso(request):
 @staff_member_required(redirect_field_name=None, login_url=reverse_lazy("home"))
 def reportes(request):
     if request.method == "POST":
-        form, response = request.POST, HttpResponse()
-        periodo, formato = form["periodo_reportes"], form["formato_reportes"]
-        if formato == "pdf":
-            response['Content-Disposition'] = "attachment; filename=reporte.pdf"
-        else:
-            response['Content-Disposition'] = "attachment; filename=reporte.csv"
-        gen_informe(periodo, response, formato)
-        return response
+        form = request.POST
+        periodo, formato = form.get("periodo_reportes"), form.get("formato_reportes")
+        if periodo not in PERIODOS:
+            return HttpResponseBadRequest("Periodo de reporte inválido")
+        # El informe se genera fila a fila mientras se envía (CSV o PDF)
+        return gen_informe(periodo, formato)
     
     formulario = ReporteriaForm()
     return render(request, "reporteria.html", {"formulario":formulario})
@@ -559,36 +575,15 @@ def estudiante_inscribirse(request, ayudantia_id):
         messages.error(request, 'Esta ayudantía ya no está disponible o fue cursada.')
         return redirect('estudiante_asignaturas')
     
-    # Verificar si ya está inscrito
-    if Inscripcion.objects.filter(estudiante=request.user, ayudantia=ayudantia).exists():
-        messages.warning(request, 'Ya estás inscrito en esta ayudantía.')
-        return redirect('estudiante_ayudantias_asignatura', asignatura_id=ayudantia.asignatura.id_asignatura)
-    
-    # Verificar si hay cupos disponibles
-    if ayudantia.cupos_disponibles <= 0:
-        messages.error(request, 'No hay cupos disponibles para esta ayudantía.')
-        return redirect('estudiante_ayudantias_asignatura', asignatura_id=ayudantia.asignatura.id_asignatura)
-    
-    # Verificar que la ayudantía sea futura
-    if ayudantia.fecha < date.today():
-        messages.error(request, 'Esta ayudantía ya pasó.')
-        return redirect('estudiante_ayudantias_asignatura', asignatura_id=ayudantia.asignatura.id_asignatura)
-    
-    # Verificar que la ayudantía no esté cursada
-    if ayudantia.is_cursada:
-        messages.error(request, 'Esta ayudantía ya fue cursada.')
-        return redirect('estudiante_ayudantias_asignatura', asignatura_id=ayudantia.asignatura.id_asignatura)
-    
-    # Crear la inscripción
-    inscripcion = Inscripcion.objects.create(
-        estudiante=request.user,
-        ayudantia=ayudantia,
-        estado='activa'
-    )
-    
-    # Actualizar cupos disponibles
-    ayudantia.cupos_disponibles -= 1
-    ayudantia.save()
+    # El servicio valida duplicado, fecha y cupos y reserva el cupo de forma atómica
+    try:
+        inscribir(request.user, ayudantia)
+    except InscripcionError as e:
+        if e.codigo == 'ya_inscrito':
+            messages.warning(request, e.mensaje)
+        else:
+            messages.error(request, e.mensaje)
+        return redirect('estudiante_ayudantias_asignatura', asignatura_id=ayudantia.asignatura_id)
     
     messages.success(request, f'Te has inscrito exitosamente en la ayudantía: {ayudantia.titulo}')
     return redirect('estudiante_mis_ayudantias')
@@ -625,18 +620,8 @@ def estudiante_cancelar_inscripcion(request, inscripcion_id):
         messages.error(request, 'No puedes cancelar una inscripción que no está activa.')
         return redirect('estudiante_mis_ayudantias')
     
-    # Verificar que la ayudantía aún existe
-    try:
-        ayudantia = inscripcion.ayudantia
-        # Devolver cupo a la ayudantía solo si aún existe
-        ayudantia.cupos_disponibles += 1
-        ayudantia.save()
-    except Ayudantia.DoesNotExist:
-        # La ayudantía fue eliminada, no hay que devolver cupos
-        pass
-    
-    # Eliminar la inscripción completamente para permitir reinscripción
-    inscripcion.delete()
+    # Elimina la inscripción y devuelve el cupo (si la ayudantía aún existe) en una transacción
+    cancelar_inscripcion(inscripcion)
     
     messages.success(request, 'Has cancelado tu inscripción exitosamente.')
     return redirect('estudiante_mis_ayudantias')
@@ -649,19 +634,17 @@ def tutor_mis_ayudantias(request):
     Vista para que los tutores vean sus ayudantías.
     Solo muestra ayudantías no cursadas.
     """
-    ayudantias = Ayudantia.objects.filter(
+    ayudantias = list(con_estadisticas_inscripciones(Ayudantia.objects.filter(
         tutor=request.user, 
         is_active=True,
         is_cursada=False,  # Solo ayudantías no cursadas
         fecha__gte=date.today()  # Solo ayudantías futuras
-    ).prefetch_related('inscripciones').order_by('fecha', 'horario')
-    
-    # Calcular inscripciones activas para cada ayudantía
-    for ayudantia in ayudantias:
-        ayudantia.inscripciones_activas = ayudantia.inscripciones.filter(estado='activa').count()
+    ).select_related('asignatura')).order_by('fecha', 'horario'))
     
     context = {
         'ayudantias': ayudantias,
+        'total_inscripciones': sum(a.total_inscripciones for a in ayudantias),
+        'total_cupos_disponibles': sum(a.cupos_disponibles for a in ayudantias),
     }
     return render(request, 'tutor/mis_ayudantias.html', context)
 
@@ -716,13 +699,8 @@ def tutor_registrar_asistencia(request, ayudantia_id):
         asistencias = request.POST.getlist('asistencia')
         asistio_ids = [int(aid) for aid in asistencias if aid.isdigit()]
         
-        # Actualizar las asistencias
-        for inscripcion in inscripciones:
-            if inscripcion.id_inscripcion in asistio_ids:
-                inscripcion.asistio = True
-            else:
-                inscripcion.asistio = False
-            inscripcion.save()
+        # Presentes y ausentes en dos UPDATE, sin importar cuántos inscritos haya
+        registrar_asistencia(ayudantia, asistio_ids)
         
         messages.success(request, 'Asistencia registrada exitosamente. Ahora puedes marcar la ayudantía como cursada.')
         return redirect('tutor_detalle_ayudantia', ayudantia_id=ayudantia_id)
@@ -760,6 +738,7 @@ def tutor_marcar_cursada(request, ayudantia_id):
         ayudantia.is_cursada = True
         ayudantia.fecha_cursada = timezone.now()
         ayudantia.save()
+        catalogo_cache.clear()
         
         messages.success(request, f'Ayudantía "{ayudantia.titulo}" marcada como cursada exitosamente.')
         return redirect('tutor_mis_ayudantias')
@@ -797,7 +776,9 @@ def tutor_logs(request):
     ayudantias_cursadas = Ayudantia.objects.filter(
         tutor=request.user,
         is_cursada=True
-    ).select_related('asignatura').prefetch_related('inscripciones').order_by('-fecha_cursada')
+    ).select_related('asignatura').prefetch_related(
+        Prefetch('inscripciones', queryset=Inscripcion.objects.select_related('estudiante'))
+    ).order_by('-fecha_cursada')
     
     # Aplicar filtros de fecha si existen
     if fecha_inicio:
@@ -814,12 +795,8 @@ def tutor_logs(request):
         except ValueError:
             messages.error(request, 'Fecha de fin inválida.')
     
-    # Calcular estadísticas para cada ayudantía
-    for ayudantia in ayudantias_cursadas:
-        inscripciones = ayudantia.inscripciones.filter(estado='activa')
-        ayudantia.total_inscritos = inscripciones.count()
-        ayudantia.total_asistieron = inscripciones.filter(asistio=True).count()
-        ayudantia.total_no_asistieron = inscripciones.filter(asistio=False).count()
+    # Estadísticas de inscripciones calculadas por la BD en la misma query
+    ayudantias_cursadas = con_estadisticas_inscripciones(ayudantias_cursadas)
     
     context = {
         'ayudantias_cursadas': ayudantias_cursadas,
@@ -841,7 +818,7 @@ def tutor_exportar_logs_excel(request):
     ayudantias_cursadas = Ayudantia.objects.filter(
         tutor=request.user,
         is_cursada=True
-    ).select_related('asignatura').prefetch_related('inscripciones').order_by('-fecha_cursada')
+    ).select_related('asignatura').order_by('-fecha_cursada')
     
     # Aplicar filtros de fecha si existen
     if fecha_inicio:
@@ -858,86 +835,10 @@ def tutor_exportar_logs_excel(request):
         except ValueError:
             pass
     
-    # Crear el libro de trabajo de Excel
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Logs de Ayudantías"
-    
-    # Estilos
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF")
-    center_alignment = Alignment(horizontal="center", vertical="center")
-    
-    # Encabezados
-    headers = [
-        'ID', 'Título', 'Asignatura', 'Fecha Ayudantía', 'Horario', 'Sala',
-        'Fecha Cursada', 'Total Inscritos', 'Total Asistieron', 'Total No Asistieron',
-        'Estudiante', 'Email', 'Asistió'
-    ]
-    
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_num)
-        cell.value = header
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = center_alignment
-    
-    # Datos
-    row_num = 2
-    for ayudantia in ayudantias_cursadas:
-        inscripciones = ayudantia.inscripciones.filter(estado='activa')
-        total_inscritos = inscripciones.count()
-        total_asistieron = inscripciones.filter(asistio=True).count()
-        total_no_asistieron = inscripciones.filter(asistio=False).count()
-        
-        if inscripciones.exists():
-            # Una fila por cada inscripción
-            for inscripcion in inscripciones:
-                ws.cell(row=row_num, column=1).value = ayudantia.id_ayudantia
-                ws.cell(row=row_num, column=2).value = ayudantia.titulo
-                ws.cell(row=row_num, column=3).value = ayudantia.asignatura.nombre
-                ws.cell(row=row_num, column=4).value = ayudantia.fecha.strftime('%d/%m/%Y')
-                ws.cell(row=row_num, column=5).value = ayudantia.horario.strftime('%H:%M')
-                ws.cell(row=row_num, column=6).value = ayudantia.sala
-                ws.cell(row=row_num, column=7).value = ayudantia.fecha_cursada.strftime('%d/%m/%Y %H:%M') if ayudantia.fecha_cursada else ''
-                ws.cell(row=row_num, column=8).value = total_inscritos
-                ws.cell(row=row_num, column=9).value = total_asistieron
-                ws.cell(row=row_num, column=10).value = total_no_asistieron
-                ws.cell(row=row_num, column=11).value = inscripcion.estudiante.nombre_usuario
-                ws.cell(row=row_num, column=12).value = inscripcion.estudiante.email
-                ws.cell(row=row_num, column=13).value = 'Sí' if inscripcion.asistio else 'No'
-                row_num += 1
-        else:
-            # Si no hay inscripciones, mostrar solo la información de la ayudantía
-            ws.cell(row=row_num, column=1).value = ayudantia.id_ayudantia
-            ws.cell(row=row_num, column=2).value = ayudantia.titulo
-            ws.cell(row=row_num, column=3).value = ayudantia.asignatura.nombre
-            ws.cell(row=row_num, column=4).value = ayudantia.fecha.strftime('%d/%m/%Y')
-            ws.cell(row=row_num, column=5).value = ayudantia.horario.strftime('%H:%M')
-            ws.cell(row=row_num, column=6).value = ayudantia.sala
-            ws.cell(row=row_num, column=7).value = ayudantia.fecha_cursada.strftime('%d/%m/%Y %H:%M') if ayudantia.fecha_cursada else ''
-            ws.cell(row=row_num, column=8).value = 0
-            ws.cell(row=row_num, column=9).value = 0
-            ws.cell(row=row_num, column=10).value = 0
-            ws.cell(row=row_num, column=11).value = 'Sin inscripciones'
-            ws.cell(row=row_num, column=12).value = ''
-            ws.cell(row=row_num, column=13).value = ''
-            row_num += 1
-    
-    # Ajustar ancho de columnas
-    for col_num in range(1, len(headers) + 1):
-        column_letter = get_column_letter(col_num)
-        ws.column_dimensions[column_letter].width = 20
-    
-    # Crear la respuesta HTTP
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    filename = f'logs_ayudantias_tutor_{request.user.id_usuario}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
-    wb.save(response)
-    return response
+    # Filas generadas por lotes desde un único iterador; ?formato=csv para CSV
+    ayudantias_cursadas = con_estadisticas_inscripciones(ayudantias_cursadas)
+    filename = f'logs_ayudantias_tutor_{request.user.id_usuario}_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
+    return exportar_logs(request, ayudantias_cursadas, filename, incluir_tutor=False)
 
 # ========== VISTAS PARA ADMINISTRADORES ==========
 
@@ -980,6 +881,7 @@ def admin_asignaturas(request):
     
     if request.method == "POST" and form.is_valid():
         form.save()
+        catalogo_cache.clear()
         messages.success(request, 'Asignatura creada exitosamente.')
         return redirect('admin_asignaturas')
     
@@ -1003,6 +905,7 @@ def admin_editar_asignatura(request, asignatura_id):
         form = AsignaturaForm(request.POST, instance=asignatura)
         if form.is_valid():
             form.save()
+            catalogo_cache.clear()
             messages.success(request, 'Asignatura actualizada exitosamente.')
             return redirect('admin_asignaturas')
     else:
@@ -1038,6 +941,7 @@ def admin_eliminar_asignatura(request, asignatura_id):
         # Eliminar la asignatura (esto eliminará automáticamente todas las ayudantías
         # y sus inscripciones debido a on_delete=CASCADE en los modelos)
         asignatura.delete()
+        catalogo_cache.clear()
         
         # Mensaje de éxito con información sobre lo que se eliminó
         mensaje = f'Asignatura "{nombre_asignatura}" eliminada exitosamente.'
@@ -1075,7 +979,13 @@ def admin_crear_ayudantia(request):
     
     if request.method == "POST" and form.is_valid():
         ayudantia = form.save()
+        catalogo_cache.clear()
         messages.success(request, 'Ayudantía creada exitosamente.')
+        # Calendario en memoria: sin consultar la API de feriados
+        feriados = feriados_del_dia(ayudantia.fecha)
+        if feriados:
+            nombres = ', '.join(f['title'] for f in feriados)
+            messages.warning(request, f'La fecha {ayudantia.fecha:%d-%m-%Y} es feriado ({nombres}).')
         return redirect('admin_ayudantias')
     
     context = {
@@ -1089,13 +999,9 @@ def admin_ayudantias(request):
     Vista para que los administradores vean todas las ayudantías.
     Solo muestra ayudantías no cursadas.
     """
-    ayudantias = Ayudantia.objects.filter(
+    ayudantias = con_estadisticas_inscripciones(Ayudantia.objects.filter(
         is_cursada=False  # Solo ayudantías no cursadas
-    ).select_related('tutor', 'asignatura').prefetch_related('inscripciones').order_by('-created_at')
-    
-    # Calcular inscripciones activas para cada ayudantía
-    for ayudantia in ayudantias:
-        ayudantia.inscripciones_activas = ayudantia.inscripciones.filter(estado='activa').count()
+    ).select_related('tutor', 'asignatura')).order_by('-created_at')
     
     context = {
         'ayudantias': ayudantias,
@@ -1116,6 +1022,7 @@ def admin_editar_ayudantia(request, ayudantia_id):
         
         if form.is_valid():
             form.save()
+            catalogo_cache.clear()
             messages.success(request, 'Ayudantía actualizada exitosamente.')
             return redirect('admin_ayudantias')
     else:
@@ -1152,6 +1059,7 @@ def admin_eliminar_ayudantia(request, ayudantia_id):
         
         # Eliminar la ayudantía
         ayudantia.delete()
+        catalogo_cache.clear()
         
         # Mensaje de éxito con información sobre inscripciones eliminadas
         if inscripciones_activas > 0:
@@ -1176,7 +1084,9 @@ def admin_logs(request):
     # Filtrar todas las ayudantías cursadas
     ayudantias_cursadas = Ayudantia.objects.filter(
         is_cursada=True
-    ).select_related('tutor', 'asignatura').prefetch_related('inscripciones').order_by('-fecha_cursada')
+    ).select_related('tutor', 'asignatura').prefetch_related(
+        Prefetch('inscripciones', queryset=Inscripcion.objects.select_related('estudiante'))
+    ).order_by('-fecha_cursada')
     
     # Aplicar filtros de fecha si existen
     if fecha_inicio:
@@ -1193,12 +1103,8 @@ def admin_logs(request):
         except ValueError:
             messages.error(request, 'Fecha de fin inválida.')
     
-    # Calcular estadísticas para cada ayudantía
-    for ayudantia in ayudantias_cursadas:
-        inscripciones = ayudantia.inscripciones.filter(estado='activa')
-        ayudantia.total_inscritos = inscripciones.count()
-        ayudantia.total_asistieron = inscripciones.filter(asistio=True).count()
-        ayudantia.total_no_asistieron = inscripciones.filter(asistio=False).count()
+    # Estadísticas de inscripciones calculadas por la BD en la misma query
+    ayudantias_cursadas = con_estadisticas_inscripciones(ayudantias_cursadas)
     
     context = {
         'ayudantias_cursadas': ayudantias_cursadas,
@@ -1219,7 +1125,7 @@ def admin_exportar_logs_excel(request):
     # Filtrar todas las ayudantías cursadas
     ayudantias_cursadas = Ayudantia.objects.filter(
         is_cursada=True
-    ).select_related('tutor', 'asignatura').prefetch_related('inscripciones').order_by('-fecha_cursada')
+    ).select_related('tutor', 'asignatura').order_by('-fecha_cursada')
     
     # Aplicar filtros de fecha si existen
     if fecha_inicio:
@@ -1236,132 +1142,31 @@ def admin_exportar_logs_excel(request):
         except ValueError:
             pass
     
-    # Crear el libro de trabajo de Excel
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Logs de Ayudantías"
-    
-    # Estilos
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF")
-    center_alignment = Alignment(horizontal="center", vertical="center")
-    
-    # Encabezados
-    headers = [
-        'ID', 'Título', 'Asignatura', 'Tutor', 'Fecha Ayudantía', 'Horario', 'Sala',
-        'Fecha Cursada', 'Total Inscritos', 'Total Asistieron', 'Total No Asistieron',
-        'Estudiante', 'Email', 'Asistió'
-    ]
-    
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_num)
-        cell.value = header
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = center_alignment
-    
-    # Datos
-    row_num = 2
-    for ayudantia in ayudantias_cursadas:
-        inscripciones = ayudantia.inscripciones.filter(estado='activa')
-        total_inscritos = inscripciones.count()
-        total_asistieron = inscripciones.filter(asistio=True).count()
-        total_no_asistieron = inscripciones.filter(asistio=False).count()
-        
-        if inscripciones.exists():
-            # Una fila por cada inscripción
-            for inscripcion in inscripciones:
-                ws.cell(row=row_num, column=1).value = ayudantia.id_ayudantia
-                ws.cell(row=row_num, column=2).value = ayudantia.titulo
-                ws.cell(row=row_num, column=3).value = ayudantia.asignatura.nombre
-                ws.cell(row=row_num, column=4).value = ayudantia.tutor.nombre_usuario
-                ws.cell(row=row_num, column=5).value = ayudantia.fecha.strftime('%d/%m/%Y')
-                ws.cell(row=row_num, column=6).value = ayudantia.horario.strftime('%H:%M')
-                ws.cell(row=row_num, column=7).value = ayudantia.sala
-                ws.cell(row=row_num, column=8).value = ayudantia.fecha_cursada.strftime('%d/%m/%Y %H:%M') if ayudantia.fecha_cursada else ''
-                ws.cell(row=row_num, column=9).value = total_inscritos
-                ws.cell(row=row_num, column=10).value = total_asistieron
-                ws.cell(row=row_num, column=11).value = total_no_asistieron
-                ws.cell(row=row_num, column=12).value = inscripcion.estudiante.nombre_usuario
-                ws.cell(row=row_num, column=13).value = inscripcion.estudiante.email
-                ws.cell(row=row_num, column=14).value = 'Sí' if inscripcion.asistio else 'No'
-                row_num += 1
-        else:
-            # Si no hay inscripciones, mostrar solo la información de la ayudantía
-            ws.cell(row=row_num, column=1).value = ayudantia.id_ayudantia
-            ws.cell(row=row_num, column=2).value = ayudantia.titulo
-            ws.cell(row=row_num, column=3).value = ayudantia.asignatura.nombre
-            ws.cell(row=row_num, column=4).value = ayudantia.tutor.nombre_usuario
-            ws.cell(row=row_num, column=5).value = ayudantia.fecha.strftime('%d/%m/%Y')
-            ws.cell(row=row_num, column=6).value = ayudantia.horario.strftime('%H:%M')
-            ws.cell(row=row_num, column=7).value = ayudantia.sala
-            ws.cell(row=row_num, column=8).value = ayudantia.fecha_cursada.strftime('%d/%m/%Y %H:%M') if ayudantia.fecha_cursada else ''
-            ws.cell(row=row_num, column=9).value = 0
-            ws.cell(row=row_num, column=10).value = 0
-            ws.cell(row=row_num, column=11).value = 0
-            ws.cell(row=row_num, column=12).value = 'Sin inscripciones'
-            ws.cell(row=row_num, column=13).value = ''
-            ws.cell(row=row_num, column=14).value = ''
-            row_num += 1
-    
-    # Ajustar ancho de columnas
-    for col_num in range(1, len(headers) + 1):
-        column_letter = get_column_letter(col_num)
-        ws.column_dimensions[column_letter].width = 20
-    
-    # Crear la respuesta HTTP
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    filename = f'logs_ayudantias_admin_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
-    wb.save(response)
-    return response
+    # Filas generadas por lotes desde un único iterador; ?formato=csv para CSV
+    ayudantias_cursadas = con_estadisticas_inscripciones(ayudantias_cursadas)
+    filename = f'logs_ayudantias_admin_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
+    return exportar_logs(request, ayudantias_cursadas, filename, incluir_tutor=True)
 
 # ========== VISTA DE TEST PARA API DE FERIADOS ==========
 
 @login_required
 def test_api_feriados(request):
     """
-    Vista de prueba para consumir la API de feriados de Boostr.
+    Vista de prueba con los feriados de la API de Boostr. Los lee del
+    calendario en memoria (globalAdmin/feriados.py), que se actualiza en
+    segundo plano: la vista no consulta la API.
     """
-    api_url = "https://api.boostr.cl/holidays.json"
-    feriados = []
+    calendario = calendario_feriados()
+    feriados = calendario.feriados
     error = None
-    status_api = None
+    if not feriados:
+        error = "Todavía no hay feriados descargados; se actualizan en segundo plano."
     
-    try:
-        # Realizar petición a la API
-        response = requests.get(api_url, timeout=10)
-        response.raise_for_status()  # Lanza excepción si hay error HTTP
-        
-        # Parsear la respuesta JSON
-        data = response.json()
-        status_api = data.get('status', 'unknown')
-        
-        if status_api == 'success' and 'data' in data:
-            feriados = data['data']
-        else:
-            error = f"La API retornó un estado inesperado: {status_api}"
-            
-    except requests.exceptions.Timeout:
-        error = "La petición a la API tardó demasiado tiempo."
-    except requests.exceptions.RequestException as e:
-        error = f"Error al conectar con la API: {str(e)}"
-    except json.JSONDecodeError:
-        error = "Error al parsear la respuesta JSON de la API."
-    except Exception as e:
-        error = f"Error inesperado: {str(e)}"
-    
-    # Separar feriados por tipo para mejor visualización
+    # Separar feriados por tipo para mejor visualización (ya vienen ordenados por fecha)
     feriados_civiles = [f for f in feriados if f.get('type') == 'Civil']
     feriados_religiosos = [f for f in feriados if f.get('type') == 'Religioso']
     feriados_inalienables = [f for f in feriados if f.get('inalienable') == True]
     
-    # Ordenar feriados por fecha
-    feriados.sort(key=lambda x: x.get('date', ''))
-    
     context = {
         'feriados': feriados,
         'feriados_civiles': feriados_civiles,
@@ -1369,8 +1174,10 @@ def test_api_feriados(request):
         'feriados_inalienables': feriados_inalienables,
         'total_feriados': len(feriados),
         'error': error,
-        'status_api': status_api,
-        'api_url': api_url,
+        'status_api': 'success' if feriados else None,
+        'api_url': FERIADOS_API_URL,
+        'actualizado': calendario.actualizado,
+        'hoy': date.today(),
     }
     
     return render(request, 'test_api_feriados.html', context)
@@ -1382,19 +1189,17 @@ def test_mapa_sedes(request):
     """
     Vista para mostrar un mapa con las sedes de la institución usando Leaflet.
     """
-    # Obtener todas las sedes activas
-    sedes = Sede.objects.filter(is_active=True)
-    
-    # Crear una lista de diccionarios con los datos de las sedes
-    lista_sedes = []
-    for sede in sedes:
-        lista_sedes.append({
+    # Sedes activas como lista de diccionarios, cacheada por tenant
+    lista_sedes = catalogo_cache.get_or_set('mapa_sedes', lambda: [
+        {
             'id': sede.id_sede,
             'nombre': sede.nombre,
             'lat': sede.latitud,
             'lng': sede.longitud,
             'direccion': sede.direccion
-        })
+        }
+        for sede in Sede.objects.filter(is_active=True)
+    ])
     
     # Convertir a JSON para enviarlo al template
     sedes_json = json.dumps(lista_sedes, ensure_ascii=False)
@@ -1402,7 +1207,7 @@ def test_mapa_sedes(request):
     context = {
         'sedes_json': sedes_json,
         'total_sedes': len(lista_sedes),
-        'sedes': sedes,  # También pasamos el queryset por si lo necesitamos
+        'sedes': lista_sedes,
     }
     
     return render(request, 'test_mapa_sedes.html', context)
\ No newline at end of file
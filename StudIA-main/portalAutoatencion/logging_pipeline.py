@@ -0,0 +1,126 @@
+"""
+Pipeline de logging no bloqueante para el camino caliente de los requests.
+
+Los middlewares y vistas antes escribían con sys.stdout.write() seguido de
+sys.stdout.flush(), y bajo gunicorn cada flush es una syscall bloqueante dentro
+del request. Aquí el request solo encola el LogRecord y un hilo de fondo es el
+único que formatea y escribe a stdout, por lotes.
+
+Se configura desde settings.LOGGING:
+- NonBlockingQueueHandler: encola sin bloquear; si la cola está llena descarta
+  el registro y lleva la cuenta en `dropped`.
+- SamplingFilter: deja pasar solo una fracción de los registros bajo WARNING
+  de los loggers indicados (por defecto la API móvil).
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler cuyo escritor vacía la cola en un hilo separado.
+
+    El hilo despierta con el primer registro pendiente, escribe todo lo que haya
+    en la cola y luego duerme `flush_interval` segundos. Así no compite por el
+    GIL con el request en cada registro, que es lo que pasa con QueueListener.
+
+    El hilo se inicia perezosamente en el primer registro para no crear hilos
+    antes de que gunicorn haga fork de los workers.
+    """
+    _sentinel = None
+
+    def __init__(self, maxsize=10000, flush_interval=0.2, stream=None, format=None):
+        super().__init__(queue.SimpleQueue())
+        self.maxsize = maxsize
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._target = logging.StreamHandler(stream or sys.stdout)
+        self._target.setFormatter(logging.Formatter(
+            format or '%(asctime)s %(levelname)s [%(name)s] %(message)s'
+        ))
+        self._thread = None
+        self._stopping = threading.Event()
+        self._thread_lock = threading.Lock()
+
+    def _start_writer(self):
+        with self._thread_lock:
+            if self._thread is not None:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._writer, name='log-writer', daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def _writer(self):
+        while True:
+            record = self.queue.get()
+            stop = record is self._sentinel
+            if not stop:
+                self._target.handle(record)
+            # Vaciar lo acumulado mientras se escribía el primer registro
+            while not stop:
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is self._sentinel:
+                    stop = True
+                else:
+                    self._target.handle(record)
+            self._target.flush()
+            if stop:
+                return
+            self._stopping.wait(self.flush_interval)
+
+    def stop(self):
+        """Escribe lo pendiente y detiene el hilo de escritura."""
+        with self._thread_lock:
+            if self._thread is None:
+                return
+            self._stopping.set()
+            self.queue.put(self._sentinel)
+            self._thread.join()
+            self._thread = None
+
+    def prepare(self, record):
+        # QueueHandler.prepare formatea y copia el registro en el hilo del request.
+        # La cola es en memoria y del mismo proceso, así que el formateo se deja
+        # al hilo de escritura; solo se resuelve la excepción mientras sigue viva.
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        return record
+
+    def enqueue(self, record):
+        # SimpleQueue no tiene límite: el tope se controla aquí (qsize es aproximado)
+        if self.queue.qsize() >= self.maxsize:
+            self.dropped += 1
+            return
+        self.queue.put(record)
+
+    def emit(self, record):
+        if self._thread is None:
+            self._start_writer()
+        super().emit(record)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Muestrea los registros bajo WARNING cuyo logger empiece con alguno de los
+    prefijos dados. WARNING y superiores siempre pasan.
+    """
+    def __init__(self, rate=1.0, prefixes=('api_mobile',)):
+        super().__init__()
+        self.rate = float(rate)
+        self.prefixes = tuple(prefixes)
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        if not record.name.startswith(self.prefixes):
+            return True
+        return random.random() < self.rate
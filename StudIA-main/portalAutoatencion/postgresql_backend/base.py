@@ -0,0 +1,74 @@
+"""
+Backend de django-tenants apto para conexiones persistentes (CONN_MAX_AGE > 0).
+
+django-tenants ejecuta SET search_path en cada cursor, o solo cuando cambia el
+schema si TENANT_LIMIT_SET_CALLS está activo. Lo segundo no es seguro: un SET
+hecho dentro de una transacción que termina en rollback lo revierte
+PostgreSQL, pero django-tenants sigue creyendo que está aplicado. Con
+conexiones persistentes ese error además pasa al siguiente request (y a otro
+tenant).
+
+Este backend lleva la cuenta del search_path que realmente tiene la conexión:
+- se fija al ejecutar el SET y se olvida al abrir una conexión nueva, al
+  cerrarla y tras cualquier ROLLBACK o ROLLBACK TO SAVEPOINT;
+- set_tenant() ya no lo olvida: solo cambia el schema deseado. Si los
+  middlewares fijan varias veces el mismo tenant no se repite el SET, y al
+  pasar a otro tenant el siguiente cursor lo aplica siempre.
+"""
+import django.db.utils
+from django.core.exceptions import ImproperlyConfigured
+from django_tenants.postgresql_backend import base as tenant_base
+from django_tenants.postgresql_backend.base import DatabaseWrapper as TenantDatabaseWrapper
+
+
+class DatabaseWrapper(TenantDatabaseWrapper):
+
+    def set_tenant(self, tenant, include_public=True):
+        aplicado = self.search_path_set_schemas
+        super().set_tenant(tenant, include_public)
+        self.search_path_set_schemas = aplicado
+
+    def init_connection_state(self):
+        self.search_path_set_schemas = None
+        super().init_connection_state()
+
+    def _rollback(self):
+        try:
+            return super()._rollback()
+        finally:
+            self.search_path_set_schemas = None
+
+    def _savepoint_rollback(self, sid):
+        try:
+            super()._savepoint_rollback(sid)
+        finally:
+            self.search_path_set_schemas = None
+
+    def _cursor(self, name=None):
+        # Se salta el _cursor de django-tenants (que aplica su propio criterio)
+        cursor = super(TenantDatabaseWrapper, self)._cursor(name=name) if name else super(TenantDatabaseWrapper, self)._cursor()
+
+        if not self.schema_name:
+            raise ImproperlyConfigured("Database schema not set. Did you forget "
+                                       "to call set_schema() or set_tenant()?")
+
+        search_paths = self._get_cursor_search_paths()
+        if search_paths == self.search_path_set_schemas:
+            return cursor
+
+        if name or tenant_base.is_psycopg3:
+            cursor_for_search_path = self.connection.cursor()
+        else:
+            cursor_for_search_path = cursor
+
+        try:
+            formatted_search_paths = ["'{}'".format(s) for s in search_paths]
+            cursor_for_search_path.execute('SET search_path = {0}'.format(','.join(formatted_search_paths)))
+        except (django.db.utils.DatabaseError, tenant_base.psycopg.InternalError):
+            # Transacción abortada: el próximo comando debería ser un rollback
+            self.search_path_set_schemas = None
+        else:
+            self.search_path_set_schemas = search_paths
+        if name or tenant_base.is_psycopg3:
+            cursor_for_search_path.close()
+        return cursor
@@ -108,17 +108,10 @@ INSTALLED_APPS = SHARED_APPS + [app for app in TENANT_APPS if app not in SHARED_
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # Debe ir al principio
-    'api_mobile.middleware.ApiMobileTenantMiddleware',  # Para identificar tenant en API móvil
-    'globalAdmin.middleware.ForcePublicSchemaMiddleware',  # Debe ir ANTES de TenantMainMiddleware
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Para servir archivos estáticos en producción
     'django.contrib.sessions.middleware.SessionMiddleware',  # Debe ejecutarse ANTES de acceder a request.session
-    'globalAdmin.middleware_tenant_param.TenantParamMiddleware',  # Detectar tenant desde parámetro (DESPUÉS de SessionMiddleware, ANTES de TenantMainMiddleware)
-    'django_tenants.middleware.main.TenantMainMiddleware',
-    'globalAdmin.middleware_public.PublicRootMiddleware',  # Capturar 404 en raíz cuando no hay tenant
-    'globalAdmin.middleware.PublicSchemaMiddleware',
-    'globalAdmin.middleware.TenantThemeMiddleware',
-    'globalAdmin.middleware.PublicSchemaAuthMiddleware',  # ANTES de AuthenticationMiddleware, DESPUÉS de SessionMiddleware
+    'globalAdmin.middleware_resolver.TenantResolverMiddleware',  # Tenant, schema, tema e impersonación en una pasada (DESPUÉS de SessionMiddleware, ANTES de AuthenticationMiddleware)
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -140,9 +133,12 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Templates compilados en caché por (tema, nombre); ver globalAdmin/template_loaders.py
             'loaders': [
-                'globalAdmin.template_loaders.TenantThemeLoader',
-                'django.template.loaders.app_directories.Loader',
+                ('globalAdmin.template_loaders.TenantThemeCachedLoader', [
+                    'globalAdmin.template_loaders.TenantThemeLoader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
             ],
         },
     },
@@ -176,6 +172,13 @@ _is_build_process = 'collectstatic' in sys.argv
 # Intentar usar DATABASE_URL primero (para Render, Railway, etc.)
 database_url = os.getenv('DATABASE_URL')
 
+# Backend de django-tenants que sabe qué search_path tiene aplicada cada conexión
+# (ver portalAutoatencion/postgresql_backend), necesario para reutilizarlas
+DB_ENGINE = 'portalAutoatencion.postgresql_backend'
+# Segundos que se reutiliza una conexión entre requests (0 = una conexión nueva
+# por request). Antes de reutilizarla Django verifica que siga viva.
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '600'))
+
 # Logging para debug (solo en producción)
 if os.getenv('RENDER') or os.getenv('DATABASE_URL'):
     import sys
@@ -225,11 +228,11 @@ elif database_url:
             sys.stdout.flush()
         db_config = dj_database_url.config(
             default=database_url,
-            conn_max_age=600,
+            conn_max_age=DB_CONN_MAX_AGE,
             conn_health_checks=True,
         )
         # Forzar el engine de django-tenants
-        db_config['ENGINE'] = 'django_tenants.postgresql_backend'
+        db_config['ENGINE'] = DB_ENGINE
         db_config.setdefault('OPTIONS', {})['client_encoding'] = 'utf8'
         DATABASES = {
             'default': db_config
@@ -252,7 +255,7 @@ elif database_url:
         db_name = parsed.path[1:] if parsed.path else 'postgres'  # Remover el / inicial
         DATABASES = {
             'default': {
-                'ENGINE': 'django_tenants.postgresql_backend',
+                'ENGINE': DB_ENGINE,
                 'NAME': db_name,
                 'USER': parsed.username or 'postgres',
                 'PASSWORD': parsed.password or '',
@@ -260,7 +263,9 @@ elif database_url:
                 'PORT': str(db_port),
                 'OPTIONS': {
                     'client_encoding': 'utf8'
-                }
+                },
+                'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+                'CONN_HEALTH_CHECKS': True,
             }
         }
         if os.getenv('RENDER') or os.getenv('DATABASE_URL'):
@@ -293,7 +298,7 @@ else:
     # Usar las variables si están disponibles, de lo contrario usar valores por defecto
     DATABASES = {
         'default': {
-            'ENGINE': 'django_tenants.postgresql_backend',
+            'ENGINE': DB_ENGINE,
             'NAME': db_name or 'postgres',
             'USER': db_user or 'postgres',
             'PASSWORD': db_password or 'postgres',
@@ -301,7 +306,9 @@ else:
             'PORT': db_port or '5432',
             'OPTIONS': {
                 'client_encoding': 'utf8'
-            }
+            },
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
         }
     }
     
@@ -359,9 +366,15 @@ STATICFILES_DIRS = (os.path.join(BASE_DIR, 'loginApp/static'),)
 
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
-# Configuración de WhiteNoise para servir archivos estáticos en producción
+# Storages que resuelven {% static %} al archivo del tema del tenant
+# (globalAdmin/static_loaders.py). En producción: manifest de WhiteNoise con hash
+# y .gz/.br por archivo (brotli requiere el paquete Brotli), más el manifest de
+# temas que escribe collectstatic; WhiteNoise sirve los archivos con hash con
+# caché de largo plazo (immutable).
 if not DEBUG:
-    STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+    STATICFILES_STORAGE = 'globalAdmin.static_loaders.TenantThemeManifestStaticFilesStorage'
+else:
+    STATICFILES_STORAGE = 'globalAdmin.static_loaders.TenantThemeStaticFilesStorage'
 
 # Static files finders para theming por tenant
 STATICFILES_FINDERS = [
@@ -370,8 +383,8 @@ STATICFILES_FINDERS = [
     'django.contrib.staticfiles.finders.AppDirectoriesFinder',
 ]
 
-# Tema por defecto del tenant (se actualiza dinámicamente por el middleware)
-CURRENT_TENANT_THEME = 'default'
+# El tema del tenant de cada request lo fija el middleware en globalAdmin.tema
+# (ContextVar), no en settings, para que sea seguro con workers con hilos o ASGI
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
@@ -382,6 +395,31 @@ TENANT_MODEL = 'clientManager.Empresa'
 
 TENANT_DOMAIN_MODEL = 'clientManager.Dominio'
 
+# TENANT_LIMIT_SET_CALLS no se usa: portalAutoatencion.postgresql_backend ejecuta
+# SET search_path solo cuando el de la conexión no coincide con el tenant actual
+# y lo vuelve a aplicar tras un rollback o al abrir una conexión nueva.
+
+# Segundos que el registro en memoria de tenants (clientManager.tenant_registry)
+# mantiene la foto de Empresa/Dominio antes de recargarla desde el schema público
+TENANT_REGISTRY_TTL = int(os.getenv('TENANT_REGISTRY_TTL', '60'))
+
+# ========== CACHÉ ==========
+# LocMemCache por defecto (una copia por worker). Para compartirla entre workers
+# basta con apuntar CACHE_BACKEND/CACHE_LOCATION a otro backend, por ejemplo
+# django.core.cache.backends.redis.RedisCache y redis://host:6379/0.
+# Las claves por tenant se arman con clientManager.tenant_cache.TenantCache.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'studia'),
+        'TIMEOUT': int(os.getenv('CACHE_TIMEOUT', '300')),
+        'KEY_PREFIX': 'studia',
+    }
+}
+
+# Segundos que se cachean sedes y asignaturas de la API móvil y del mapa de sedes
+CATALOGO_CACHE_TTL = int(os.getenv('CATALOGO_CACHE_TTL', '60'))
+
 # Configuración para forzar schema público en ciertas URLs
 # Las URLs que empiezan con /global/ siempre se procesan en el schema público
 SHOW_PUBLIC_IF_NO_TENANT_FOUND = True
@@ -390,6 +428,62 @@ SHOW_PUBLIC_IF_NO_TENANT_FOUND = True
 # Cuando no se identifica un tenant, usar estas URLs
 PUBLIC_SCHEMA_URLCONF = 'globalAdmin.urls_public'
 
+# ========== CONFIGURACIÓN DE LOGGING ==========
+# Los registros se encolan en el request y un hilo de fondo los escribe a stdout
+# (ver portalAutoatencion/logging_pipeline.py). En producción los módulos de la
+# aplicación solo registran WARNING o superior salvo que se suba el nivel por
+# variable de entorno, p. ej. LOG_LEVEL_API_MOBILE=DEBUG.
+LOG_LEVEL_DEFAULT = os.getenv('LOG_LEVEL', 'WARNING' if is_production else 'DEBUG')
+
+# Fracción de los registros DEBUG/INFO de la API móvil que se conservan (0.0 - 1.0)
+LOG_SAMPLE_RATE_API_MOBILE = float(os.getenv('LOG_SAMPLE_RATE_API_MOBILE', '0.1' if is_production else '1.0'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'sampling': {
+            '()': 'portalAutoatencion.logging_pipeline.SamplingFilter',
+            'rate': LOG_SAMPLE_RATE_API_MOBILE,
+            'prefixes': ['api_mobile'],
+        },
+    },
+    'handlers': {
+        'queue': {
+            'class': 'portalAutoatencion.logging_pipeline.NonBlockingQueueHandler',
+            'maxsize': 10000,
+            'filters': ['sampling'],
+        },
+    },
+    'loggers': {
+        'api_mobile': {
+            'handlers': ['queue'],
+            'level': os.getenv('LOG_LEVEL_API_MOBILE', LOG_LEVEL_DEFAULT),
+            'propagate': False,
+        },
+        'globalAdmin': {
+            'handlers': ['queue'],
+            'level': os.getenv('LOG_LEVEL_GLOBAL_ADMIN', LOG_LEVEL_DEFAULT),
+            'propagate': False,
+        },
+        'clientManager': {
+            'handlers': ['queue'],
+            'level': os.getenv('LOG_LEVEL_CLIENT_MANAGER', LOG_LEVEL_DEFAULT),
+            'propagate': False,
+        },
+        'loginApp': {
+            'handlers': ['queue'],
+            'level': os.getenv('LOG_LEVEL_LOGIN_APP', LOG_LEVEL_DEFAULT),
+            'propagate': False,
+        },
+        'django': {
+            'handlers': ['queue'],
+            'level': os.getenv('LOG_LEVEL_DJANGO', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 # ========== CONFIGURACIÓN DE REST FRAMEWORK PARA API MÓVIL ==========
 
 REST_FRAMEWORK = {
@@ -429,6 +523,33 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
 }
 
+# Segundos que el usuario autenticado por JWT queda en caché (api_mobile/usuarios_cache.py)
+API_MOBILE_USER_CACHE_TTL = int(os.getenv('API_MOBILE_USER_CACHE_TTL', '60'))
+# Los GET de las vistas con usuario_desde_token arman el usuario desde los claims
+# del token sin consultar la base de datos. La revocación de usuarios
+# desactivados depende de la caché: habilitar solo con una caché compartida.
+API_MOBILE_USUARIO_DESDE_TOKEN = os.getenv('API_MOBILE_USUARIO_DESDE_TOKEN', 'False') == 'True'
+
+# Sincronización incremental (/api/mobile/sync/, api_mobile/sync.py):
+# segundos que cada consulta retrocede desde el cursor y días que se guardan las
+# lápidas de registros eliminados (un cursor más viejo recibe la foto completa)
+SYNC_SOLAPE = int(os.getenv('SYNC_SOLAPE', '30'))
+SYNC_RETENCION_DIAS = int(os.getenv('SYNC_RETENCION_DIAS', '30'))
+
+# Minutos tras los cuales una migración en curso (globalAdmin/migraciones.py) se
+# considera abandonada por su worker y otro worker la vuelve a tomar
+MIGRACIONES_TIMEOUT_MINUTOS = int(os.getenv('MIGRACIONES_TIMEOUT_MINUTOS', '60'))
+
+# Schema plantilla (sin Empresa) que se mantiene migrado y se clona al crear un
+# tenant (globalAdmin/plantilla.py). Vacío: cada tenant se migra desde cero
+TENANT_PLANTILLA_SCHEMA = os.getenv('TENANT_PLANTILLA_SCHEMA', 'plantilla')
+
+# Calendario de feriados (globalAdmin/feriados.py): la API se consulta en segundo
+# plano cada FERIADOS_INTERVALO_HORAS y los requests leen la copia en memoria
+FERIADOS_API_URL = os.getenv('FERIADOS_API_URL', 'https://api.boostr.cl/holidays.json')
+FERIADOS_INTERVALO_HORAS = int(os.getenv('FERIADOS_INTERVALO_HORAS', '24'))
+FERIADOS_TIMEOUT = int(os.getenv('FERIADOS_TIMEOUT', '10'))
+
 # ========== CONFIGURACIÓN DE CORS PARA API MÓVIL ==========
 
 CORS_ALLOWED_ORIGINS = [
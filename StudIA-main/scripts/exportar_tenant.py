@@ -1,11 +1,15 @@
 """
 Script para exportar datos de un tenant específico.
-Uso: python scripts/exportar_tenant.py "DUOC UC" datos_duoc.json
+Uso: python scripts/exportar_tenant.py "duoc" datos_duoc.sql.gz
+
+Genera un snapshot comprimido con COPY de PostgreSQL de todas las tablas del
+schema (ver clientManager/snapshot.py). Con "-" como archivo escribe el
+snapshot en la salida estándar, por ejemplo para enviarlo por ssh.
 """
 import os
 import sys
+import time
 import django
-import json
 from pathlib import Path
 
 # Agregar el directorio raíz del proyecto al PYTHONPATH
@@ -16,10 +20,13 @@ sys.path.insert(0, str(BASE_DIR))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portalAutoatencion.settings')
 django.setup()
 
-from django.core.management import call_command
-from django_tenants.utils import schema_context
 from clientManager.models import Empresa
-from io import StringIO
+from clientManager.snapshot import exportar
+
+
+def log(mensaje):
+    # A stderr: la salida estándar puede ser el snapshot
+    print(mensaje, file=sys.stderr)
 
 
 def exportar_tenant(schema_name, output_file):
@@ -29,38 +36,26 @@ def exportar_tenant(schema_name, output_file):
     try:
         # Verificar que el tenant existe
         tenant = Empresa.objects.get(schema_name=schema_name)
-        print(f"[EXPORT] Exportando datos del tenant: {schema_name}")
+        log(f"[EXPORT] Exportando datos del tenant: {schema_name}")
         
-        # Exportar datos dentro del schema del tenant
-        with schema_context(schema_name):
-            # Capturar la salida del comando dumpdata
-            output = StringIO()
-            call_command(
-                'dumpdata',
-                'loginApp.Usuario',
-                'loginApp.Asignatura',
-                'loginApp.Ayudantia',
-                'loginApp.Inscripcion',
-                'loginApp.Sede',
-                stdout=output,
-                indent=2
-            )
-            
-            # Guardar en archivo
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(output.getvalue())
-            
-            print(f"[EXPORT] ✓ Datos exportados exitosamente a: {output_file}")
-            return True
+        inicio = time.perf_counter()
+        destino = sys.stdout.buffer if output_file == '-' else output_file
+        filas = exportar(schema_name, destino)
+        
+        for tabla, cantidad in filas.items():
+            log(f"[EXPORT]   {tabla}: {cantidad} filas")
+        log(f"[EXPORT] ✓ Datos exportados exitosamente a: {output_file} "
+            f"({time.perf_counter() - inicio:.1f} s)")
+        return True
             
     except Empresa.DoesNotExist:
-        print(f"[EXPORT] ✗ Error: No se encontró el tenant '{schema_name}'")
-        print(f"[EXPORT] Tenants disponibles:")
+        log(f"[EXPORT] ✗ Error: No se encontró el tenant '{schema_name}'")
+        log(f"[EXPORT] Tenants disponibles:")
         for tenant in Empresa.objects.all():
-            print(f"  - {tenant.schema_name}")
+            log(f"  - {tenant.schema_name}")
         return False
     except Exception as e:
-        print(f"[EXPORT] ✗ Error: {str(e)}")
+        log(f"[EXPORT] ✗ Error: {str(e)}")
         return False
 
 
@@ -68,7 +63,7 @@ if __name__ == '__main__':
     if len(sys.argv) < 3:
         print("Uso: python scripts/exportar_tenant.py <schema_name> <output_file>")
         print("\nEjemplo:")
-        print('  python scripts/exportar_tenant.py "DUOC UC" datos_duoc.json')
+        print('  python scripts/exportar_tenant.py "duoc" datos_duoc.sql.gz')
         print("\nTenants disponibles:")
         for tenant in Empresa.objects.all():
             print(f"  - {tenant.schema_name}")
@@ -77,5 +72,5 @@ if __name__ == '__main__':
     schema_name = sys.argv[1]
     output_file = sys.argv[2]
     
-    exportar_tenant(schema_name, output_file)
-
+    if not exportar_tenant(schema_name, output_file):
+        sys.exit(1)
@@ -1,9 +1,16 @@
 """
 Script para importar datos de un tenant específico.
-Uso: python scripts/importar_tenant.py "DUOC UC" datos_duoc.json
+Uso: python scripts/importar_tenant.py "duoc" datos_duoc.sql.gz
+
+Restaura un snapshot de exportar_tenant.py con COPY de PostgreSQL en una sola
+transacción (ver clientManager/snapshot.py). Las tablas del tenant se vacían
+antes de cargar el snapshot. Con "-" como archivo lee el snapshot de la
+entrada estándar. Los fixtures .json de exportaciones anteriores se siguen
+cargando con loaddata.
 """
 import os
 import sys
+import time
 import django
 from pathlib import Path
 
@@ -19,11 +26,12 @@ from django.core.management import call_command
 from django_tenants.utils import schema_context
 from django.db import connection
 from clientManager.models import Empresa
+from clientManager.snapshot import restaurar
 
 
 def importar_tenant(schema_name, fixture_file):
     """
-    Importa datos de un fixture JSON en un tenant específico.
+    Importa un snapshot (o un fixture JSON) en un tenant específico.
     """
     try:
         # Verificar que el tenant existe
@@ -31,7 +39,7 @@ def importar_tenant(schema_name, fixture_file):
         print(f"[IMPORT] Importando datos al tenant: {schema_name}")
         
         # Verificar que el archivo existe
-        if not os.path.exists(fixture_file):
+        if fixture_file != '-' and not os.path.exists(fixture_file):
             print(f"[IMPORT] ✗ Error: El archivo '{fixture_file}' no existe")
             return False
         
@@ -78,11 +86,22 @@ def importar_tenant(schema_name, fixture_file):
             print(f"[IMPORT] Continuando con la importación de datos...")
         
         # 2. Importar datos dentro del schema del tenant
-        with schema_context(schema_name):
-            print(f"[IMPORT] Ejecutando loaddata dentro del schema '{schema_name}'...")
-            call_command('loaddata', fixture_file, verbosity=2)
-            print(f"[IMPORT] ✓ Datos importados exitosamente al tenant: {schema_name}")
-            return True
+        if fixture_file.endswith('.json'):
+            with schema_context(schema_name):
+                print(f"[IMPORT] Ejecutando loaddata dentro del schema '{schema_name}'...")
+                call_command('loaddata', fixture_file, verbosity=2)
+                print(f"[IMPORT] ✓ Datos importados exitosamente al tenant: {schema_name}")
+                return True
+        
+        print(f"[IMPORT] Restaurando snapshot con COPY en el schema '{schema_name}'...")
+        inicio = time.perf_counter()
+        origen = sys.stdin.buffer if fixture_file == '-' else fixture_file
+        filas = restaurar(schema_name, origen)
+        for tabla, cantidad in filas.items():
+            print(f"[IMPORT]   {tabla}: {cantidad} filas")
+        print(f"[IMPORT] ✓ Datos importados exitosamente al tenant: {schema_name} "
+              f"({time.perf_counter() - inicio:.1f} s)")
+        return True
             
     except Empresa.DoesNotExist:
         print(f"[IMPORT] ✗ Error: No se encontró el tenant '{schema_name}'")
@@ -99,13 +118,14 @@ def importar_tenant(schema_name, fixture_file):
 
 if __name__ == '__main__':
     if len(sys.argv) < 3:
-        print("Uso: python scripts/importar_tenant.py <schema_name> <fixture_file>")
+        print("Uso: python scripts/importar_tenant.py <schema_name> <snapshot_file>")
         print("\nEjemplo:")
-        print('  python scripts/importar_tenant.py "DUOC UC" datos_duoc.json')
+        print('  python scripts/importar_tenant.py "duoc" datos_duoc.sql.gz')
         sys.exit(1)
     
     schema_name = sys.argv[1]
     fixture_file = sys.argv[2]
     
-    importar_tenant(schema_name, fixture_file)
+    if not importar_tenant(schema_name, fixture_file):
+        sys.exit(1)
 
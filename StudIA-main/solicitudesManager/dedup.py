@@ -0,0 +1,29 @@
+"""
+Clave de deduplicación de solicitudes.
+
+Se calcula a partir de los campos del formulario que definen si dos solicitudes
+pendientes son "la misma" y se guarda en Solicitud.clave_dedup, que tiene un
+índice parcial sobre las pendientes. Así revision_form resuelve el conflicto
+con una sola búsqueda por índice en vez de recorrer todas las pendientes del
+mismo tipo en Python.
+
+Esta función la usan también las migraciones (backfill), por eso vive fuera de
+models.py y no depende de ningún modelo.
+"""
+import hashlib
+import json
+
+# Campos de campos_sol que identifican una solicitud duplicada, por tipo
+CAMPOS_DEDUP = {
+    "Servicio VPN": ("usuario", "accion"),
+}
+
+
+def calcular_clave_dedup(tipo_sol, campos_sol):
+    """Retorna el sha256 (hex) de tipo + campos relevantes, o None si el tipo no se deduplica."""
+    campos = CAMPOS_DEDUP.get(tipo_sol)
+    if campos is None or not isinstance(campos_sol, dict):
+        return None
+    valores = [tipo_sol] + [campos_sol.get(campo) for campo in campos]
+    contenido = json.dumps(valores, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
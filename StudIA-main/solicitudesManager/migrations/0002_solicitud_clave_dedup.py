@@ -0,0 +1,42 @@
+# Generated by Django 5.0.2 on 2026-10-18 18:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+from solicitudesManager.dedup import CAMPOS_DEDUP, calcular_clave_dedup
+
+
+def backfill_clave_dedup(apps, schema_editor):
+    """Calcula clave_dedup para las solicitudes existentes de los tipos deduplicados."""
+    Solicitud = apps.get_model('solicitudesManager', 'Solicitud')
+    pendientes = []
+    solicitudes = Solicitud.objects.filter(tipo_sol__in=list(CAMPOS_DEDUP)).only('id_sol', 'tipo_sol', 'campos_sol')
+    for solicitud in solicitudes.iterator(chunk_size=1000):
+        solicitud.clave_dedup = calcular_clave_dedup(solicitud.tipo_sol, solicitud.campos_sol)
+        pendientes.append(solicitud)
+        if len(pendientes) >= 1000:
+            Solicitud.objects.bulk_update(pendientes, ['clave_dedup'])
+            pendientes = []
+    if pendientes:
+        Solicitud.objects.bulk_update(pendientes, ['clave_dedup'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudesManager', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solicitud',
+            name='clave_dedup',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, verbose_name='Clave de Duplicado'),
+        ),
+        migrations.RunPython(backfill_clave_dedup, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(condition=models.Q(('clave_dedup__isnull', False), ('estado_sol', 'Pendiente')), fields=['clave_dedup'], name='solicitud_dedup_pend_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from loginApp.models import Usuario
+from .dedup import calcular_clave_dedup
 
 class Solicitud(models.Model):
     id_sol = models.AutoField(primary_key=True, verbose_name="ID de la Solicitud")
@@ -13,11 +14,31 @@ class Solicitud(models.Model):
     
     id_usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, verbose_name = "Usuario")
 
+    # Hash de los campos que identifican una solicitud duplicada (ver dedup.py)
+    clave_dedup = models.CharField(max_length=64, null=True, blank=True, editable=False, verbose_name="Clave de Duplicado")
+
     class Meta:
         verbose_name = "Solicitud"
         verbose_name_plural = "Solicitudes"
+        indexes = [
+            models.Index(
+                fields=["clave_dedup"],
+                name="solicitud_dedup_pend_idx",
+                condition=models.Q(estado_sol="Pendiente", clave_dedup__isnull=False),
+            ),
+        ]
         
     def __str__(self):
         return str(self.id_sol)
+
+    def calcular_clave_dedup(self):
+        return calcular_clave_dedup(self.tipo_sol, self.campos_sol)
+
+    def save(self, *args, **kwargs):
+        self.clave_dedup = self.calcular_clave_dedup()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "campos_sol" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"clave_dedup"}
+        super().save(*args, **kwargs)
     
 # Create your models here.
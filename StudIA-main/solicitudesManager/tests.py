@@ -1,3 +1,21 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from loginApp.scripts.informe import ANCHOS_PDF, columnas_informe
+
+
+class ColumnasInformeTest(SimpleTestCase):
+
+    def test_sin_clave_dedup(self):
+        encabezados, campos = columnas_informe()
+        self.assertNotIn("clave_dedup", campos)
+        self.assertNotIn("Clave de Duplicado", encabezados)
+
+    def test_columnas_del_informe(self):
+        encabezados, campos = columnas_informe()
+        self.assertEqual(len(encabezados), len(campos))
+        self.assertEqual(campos[-1], "id_usuario__nombre_usuario")
+        # Todas las columnas tienen ancho propio en el PDF
+        self.assertEqual(
+            [c.removesuffix("__nombre_usuario") for c in campos],
+            list(ANCHOS_PDF),
+        )